@@ -0,0 +1,37 @@
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException
+from app import dtos
+from app.async_use_cases import AsyncLeadDistributionUseCase
+from api.dependencies import get_async_lead_distribution_use_case
+from api.responses import json_response
+
+contacts_router = APIRouter()
+
+@contacts_router.post("/contacts/", response_model=dtos.ContactResponse)
+async def create_contact(
+    contact_data: dtos.ContactCreate,
+    use_case: AsyncLeadDistributionUseCase = Depends(get_async_lead_distribution_use_case)
+):
+    try:
+        contact = await use_case.create_contact(
+            lead_external_id=contact_data.lead_external_id,
+            source_id=contact_data.source_id,
+            message=contact_data.message,
+            idempotency_key=contact_data.idempotency_key
+        )
+        return json_response(dtos.ContactResponse.row(contact))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@contacts_router.post("/contacts/batch", response_model=List[dtos.ContactResponse])
+async def create_contacts_batch(
+    batch_data: dtos.ContactBatchCreate,
+    use_case: AsyncLeadDistributionUseCase = Depends(get_async_lead_distribution_use_case)
+):
+    try:
+        contacts = await use_case.create_contacts([
+            (item.lead_external_id, item.source_id, item.message) for item in batch_data.contacts
+        ], [item.idempotency_key for item in batch_data.contacts])
+        return json_response([dtos.ContactResponse.row(contact) for contact in contacts])
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
@@ -1,26 +1,268 @@
-from data.database import get_db
-from data.repository import *
-from app.use_cases import LeadDistributionUseCase, OperatorManagementUseCase, SourceManagementUseCase
+from fastapi import Depends
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from config import settings
+from core import entities
+from data import models
+from data.database import get_db, get_async_db, SessionLocal, async_pool_metrics, pool_metrics
+from data.repository import SQLContactStatsRepository
+if settings.fast_repositories:
+    from data.core_repository import (
+        CoreSQLContactRepository as SQLContactRepository,
+        CoreSQLLeadRepository as SQLLeadRepository,
+        CoreSQLOperatorRepository as SQLOperatorRepository,
+        CoreSQLOperatorSourceWeightRepository as SQLOperatorSourceWeightRepository,
+        CoreSQLSourceRepository as SQLSourceRepository
+    )
+else:
+    from data.repository import (
+        SQLContactRepository, SQLLeadRepository, SQLOperatorRepository, SQLOperatorSourceWeightRepository,
+        SQLSourceRepository
+    )
+if settings.async_mode:
+    from data.async_repository import AsyncSQLContactRepository, AsyncSQLLeadRepository, AsyncSQLOperatorSourceWeightRepository
+    from app.async_use_cases import AsyncLeadDistributionUseCase
+if settings.write_behind:
+    from data.write_behind import AsyncWriteBehindContactRepository, ContactWriter, WriteBehindContactRepository
+from data.cache import (
+    AsyncCachedLeadRepository, AsyncCachedOperatorSourceWeightRepository, CachedLeadRepository,
+    CachedOperatorRepository, CachedOperatorSourceWeightRepository, LeadCache, SourceWeightCache
+)
+from shared_state import OPERATOR_LOAD, WEIGHT_GENERATIONS, LocalCounterStore, SharedMemoryCounterStore, segment_name
+from app.affinity import LeadAffinityIndex
+from app.dedupe import ContactDedupeIndex
+from app.load_tracker import LOAD_FIELDS, OperatorLoadTracker
+from app.redistribution import RedistributionWorker
+from app.sampler import SamplerRegistry
+from app.use_cases import (
+    ContactQueryUseCase, ContactStatsUseCase, ContactStatusUseCase, LeadDistributionUseCase, OperatorManagementUseCase,
+    SourceManagementUseCase
+)
+
+if settings.write_behind and settings.shared_state != "local":
+    raise ValueError("Write-behind contact persistence supports a single worker only")
+
+def _contact_dropped(contact):
+    if load_tracker is not None:
+        load_tracker.on_status_change(contact.operator_id, contact.status, entities.ContactStatus.CLOSED)
+
+contact_writer = ContactWriter(
+    SessionLocal,
+    journal_path=settings.write_behind_journal,
+    durability=settings.write_behind_durability,
+    flush_interval=settings.write_behind_flush_ms / 1000,
+    batch_size=settings.write_behind_batch_size,
+    max_pending=settings.write_behind_max_pending,
+    on_drop=_contact_dropped
+) if settings.write_behind else None
+
+def _load_active_contacts_counts():
+    pending = contact_writer.pending_counts() if contact_writer is not None else {}
+    db = SessionLocal()
+    try:
+        counts = SQLContactRepository(db).get_active_contacts_counts()
+    finally:
+        db.close()
+    for operator_id, count in pending.items():
+        counts[operator_id] = counts.get(operator_id, 0) + count
+    return counts
+
+def _counter_store(kind: str, fields: int = 1):
+    if settings.shared_state == "shared_memory":
+        return SharedMemoryCounterStore(
+            segment_name(settings.shared_state_name, kind), settings.shared_state_slots, fields=fields
+        )
+    if settings.shared_state != "local":
+        raise ValueError(f"Unknown shared state backend: {settings.shared_state}")
+    return LocalCounterStore(fields)
+
+def check_shared_state_slots() -> None:
+    if settings.shared_state != "shared_memory":
+        return
+    db = SessionLocal()
+    try:
+        largest = max(
+            db.execute(select(func.max(models.OperatorModel.id))).scalar() or 0,
+            db.execute(select(func.max(models.SourceModel.id))).scalar() or 0
+        )
+    finally:
+        db.close()
+    if largest >= settings.shared_state_slots:
+        raise ValueError(
+            f"Operator and source ids must be below CRM_SHARED_STATE_SLOTS={settings.shared_state_slots}, found {largest}"
+        )
+
+load_tracker = OperatorLoadTracker(
+    _load_active_contacts_counts,
+    reconcile_interval=settings.load_reconcile_interval,
+    store=_counter_store(OPERATOR_LOAD, LOAD_FIELDS)
+) if settings.load_tracking else None
+
+samplers = SamplerRegistry()
+
+weight_cache = SourceWeightCache(
+    ttl=settings.weight_cache_ttl,
+    max_sources=settings.weight_cache_max_sources,
+    generations=_counter_store(WEIGHT_GENERATIONS) if settings.shared_state != "local" else None
+) if settings.weight_cache else None
+
+lead_cache = LeadCache(max_size=settings.lead_cache_size) if settings.lead_cache_size > 0 else None
+
+lead_affinity = LeadAffinityIndex(
+    ttl=settings.lead_affinity_ttl,
+    max_size=settings.lead_affinity_max_size
+) if settings.lead_affinity else None
+
+contact_dedupe = ContactDedupeIndex(
+    window=settings.contact_dedupe_window,
+    max_size=settings.contact_dedupe_max_size
+) if settings.contact_dedupe else None
+
+def _redistribute_unassigned(after_id, limit):
+    db = SessionLocal()
+    try:
+        return LeadDistributionUseCase(
+            lead_repo=SQLLeadRepository(db),
+            operator_repo=_operator_repo(db),
+            source_repo=SQLSourceRepository(db),
+            weight_repo=_weight_repo(db),
+            contact_repo=SQLContactRepository(db),
+            load_tracker=load_tracker,
+            samplers=samplers,
+            affinity=lead_affinity
+        ).redistribute_unassigned(after_id, limit)
+    finally:
+        db.close()
+
+def _count_unassigned_contacts():
+    db = SessionLocal()
+    try:
+        return SQLContactRepository(db).count_unassigned()
+    finally:
+        db.close()
+
+def _lead_repo(db):
+    repo = SQLLeadRepository(db)
+    if lead_cache is None:
+        return repo
+    return CachedLeadRepository(repo, lead_cache)
+
+def _async_lead_repo(db):
+    repo = AsyncSQLLeadRepository(db)
+    if lead_cache is None:
+        return repo
+    return AsyncCachedLeadRepository(repo, lead_cache)
+
+def _contact_repo(db):
+    repo = SQLContactRepository(db)
+    if contact_writer is None:
+        return repo
+    return WriteBehindContactRepository(repo, contact_writer, db.commit)
+
+def _async_contact_repo(db):
+    repo = AsyncSQLContactRepository(db)
+    if contact_writer is None:
+        return repo
+    return AsyncWriteBehindContactRepository(repo, contact_writer, db.commit)
 
-def get_lead_distribution_use_case():
-    db = next(get_db())
+def _operator_repo(db):
+    repo = SQLOperatorRepository(db)
+    if weight_cache is None:
+        return repo
+    return CachedOperatorRepository(repo, weight_cache)
+
+def _weight_repo(db):
+    repo = SQLOperatorSourceWeightRepository(db)
+    if weight_cache is None:
+        return repo
+    return CachedOperatorSourceWeightRepository(repo, weight_cache)
+
+def _async_weight_repo(db):
+    repo = AsyncSQLOperatorSourceWeightRepository(db)
+    if weight_cache is None:
+        return repo
+    return AsyncCachedOperatorSourceWeightRepository(repo, weight_cache)
+
+def get_weight_cache():
+    return weight_cache
+
+def get_lead_affinity():
+    return lead_affinity
+
+def get_contact_dedupe():
+    return contact_dedupe
+
+redistributor = RedistributionWorker(
+    _redistribute_unassigned,
+    _count_unassigned_contacts,
+    interval=settings.redistribution_interval,
+    batch_size=settings.redistribution_batch_size
+) if settings.redistribution else None
+
+def get_contact_writer():
+    return contact_writer
+
+def get_redistributor():
+    return redistributor
+
+def get_pool_metrics():
+    return {"sync": pool_metrics, "async": async_pool_metrics}
+
+def get_lead_distribution_use_case(db: Session = Depends(get_db)):
     return LeadDistributionUseCase(
-        lead_repo=SQLLeadRepository(db),
-        operator_repo=SQLOperatorRepository(db),
+        lead_repo=_lead_repo(db),
+        operator_repo=_operator_repo(db),
         source_repo=SQLSourceRepository(db),
-        weight_repo=SQLOperatorSourceWeightRepository(db),
-        contact_repo=SQLContactRepository(db)
+        weight_repo=_weight_repo(db),
+        contact_repo=_contact_repo(db),
+        load_tracker=load_tracker,
+        samplers=samplers,
+        affinity=lead_affinity,
+        dedupe=contact_dedupe
     )
 
-def get_operator_management_use_case():
-    db = next(get_db())
+def get_operator_management_use_case(db: Session = Depends(get_db)):
     return OperatorManagementUseCase(
-        operator_repo=SQLOperatorRepository(db)
+        operator_repo=_operator_repo(db),
+        redistributor=redistributor
     )
 
-def get_source_management_use_case():
-    db = next(get_db())
+def get_source_management_use_case(db: Session = Depends(get_db)):
     return SourceManagementUseCase(
         source_repo=SQLSourceRepository(db),
-        weight_repo=SQLOperatorSourceWeightRepository(db)
+        weight_repo=_weight_repo(db),
+        samplers=samplers,
+        redistributor=redistributor
+    )
+
+def get_contact_query_use_case(db: Session = Depends(get_db)):
+    return ContactQueryUseCase(
+        contact_repo=_contact_repo(db),
+        lead_repo=SQLLeadRepository(db)
+    )
+
+def get_contact_stats_use_case(db: Session = Depends(get_db)):
+    return ContactStatsUseCase(
+        stats_repo=SQLContactStatsRepository(db),
+        operator_repo=SQLOperatorRepository(db),
+        weight_repo=_weight_repo(db)
+    )
+
+def get_contact_status_use_case(db: Session = Depends(get_db)):
+    return ContactStatusUseCase(
+        contact_repo=_contact_repo(db),
+        load_tracker=load_tracker,
+        redistributor=redistributor,
+        affinity=lead_affinity
+    )
+
+def get_async_lead_distribution_use_case(db = Depends(get_async_db)):
+    return AsyncLeadDistributionUseCase(
+        lead_repo=_async_lead_repo(db),
+        weight_repo=_async_weight_repo(db),
+        contact_repo=_async_contact_repo(db),
+        load_tracker=load_tracker,
+        samplers=samplers,
+        affinity=lead_affinity,
+        dedupe=contact_dedupe
     )
\ No newline at end of file
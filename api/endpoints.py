@@ -1,12 +1,56 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from pydantic_core import to_json
 from app import dtos
-from app.use_cases import LeadDistributionUseCase, OperatorManagementUseCase, SourceManagementUseCase
+from app.use_cases import (
+    ContactQueryUseCase, ContactStatsUseCase, ContactStatusUseCase, LeadDistributionUseCase, OperatorManagementUseCase,
+    SourceManagementUseCase
+)
 from core import entities
-from api.dependencies import get_lead_distribution_use_case, get_operator_management_use_case, get_source_management_use_case
+from api.responses import json_response
+from api.dependencies import (
+    get_contact_query_use_case, get_contact_stats_use_case, get_contact_status_use_case, get_lead_distribution_use_case,
+    get_operator_management_use_case, get_source_management_use_case, get_weight_cache, get_pool_metrics, get_redistributor,
+    get_contact_writer, get_lead_affinity, get_contact_dedupe
+)
+
+EXPORT_CHUNK_SIZE = 1000
+ROLLUP_PERIOD = (
+    "Counts come from hourly rollups. created_from is rounded down and created_to up to a whole hour, "
+    "so every hour that overlaps the period is counted in full."
+)
 
 router = APIRouter()
+contacts_router = APIRouter()
+
+def _ndjson(items, to_row):
+    lines = []
+    for item in items:
+        lines.append(to_json(to_row(item)))
+        if len(lines) >= EXPORT_CHUNK_SIZE:
+            yield b"\n".join(lines) + b"\n"
+            lines = []
+    if lines:
+        yield b"\n".join(lines) + b"\n"
+
+def _contact_filter(
+    operator_id: Optional[int] = None,
+    source_id: Optional[int] = None,
+    status: Optional[entities.ContactStatus] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None
+) -> entities.ContactFilter:
+    return entities.ContactFilter(
+        operator_id=operator_id,
+        source_id=source_id,
+        status=status,
+        created_from=created_from,
+        created_to=created_to
+    )
 
-@router.post("/contacts/", response_model=dtos.ContactResponse)
+@contacts_router.post("/contacts/", response_model=dtos.ContactResponse)
 def create_contact(
     contact_data: dtos.ContactCreate,
     use_case: LeadDistributionUseCase = Depends(get_lead_distribution_use_case)
@@ -15,20 +59,115 @@ def create_contact(
         contact = use_case.create_contact(
             lead_external_id=contact_data.lead_external_id,
             source_id=contact_data.source_id,
-            message=contact_data.message
-        )
-        return dtos.ContactResponse(
-            id=contact.id,
-            lead_id=contact.lead_id,
-            source_id=contact.source_id,
-            operator_id=contact.operator_id,
-            message=contact.message,
-            status=contact.status.value,
-            created_at=contact.created_at
+            message=contact_data.message,
+            idempotency_key=contact_data.idempotency_key
         )
+        return json_response(dtos.ContactResponse.row(contact))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@contacts_router.post("/contacts/batch", response_model=List[dtos.ContactResponse])
+def create_contacts_batch(
+    batch_data: dtos.ContactBatchCreate,
+    use_case: LeadDistributionUseCase = Depends(get_lead_distribution_use_case)
+):
+    try:
+        contacts = use_case.create_contacts([
+            (item.lead_external_id, item.source_id, item.message) for item in batch_data.contacts
+        ], [item.idempotency_key for item in batch_data.contacts])
+        return json_response([dtos.ContactResponse.row(contact) for contact in contacts])
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@router.get("/contacts/", response_model=dtos.ContactPage)
+def list_contacts(
+    filters: entities.ContactFilter = Depends(_contact_filter),
+    after: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=1000),
+    use_case: ContactQueryUseCase = Depends(get_contact_query_use_case)
+):
+    page = use_case.list_contacts(filters, after, limit)
+    return json_response({
+        "items": [dtos.ContactResponse.row(contact) for contact in page.items],
+        "next_cursor": page.next_cursor
+    })
+
+@router.get("/contacts/export")
+def export_contacts(
+    filters: entities.ContactFilter = Depends(_contact_filter),
+    use_case: ContactQueryUseCase = Depends(get_contact_query_use_case)
+):
+    return StreamingResponse(
+        _ndjson(use_case.export_contacts(filters), dtos.ContactResponse.row),
+        media_type="application/x-ndjson"
+    )
+
+def _contact_status(status: str) -> entities.ContactStatus:
+    try:
+        return entities.ContactStatus(status)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid status")
+
+@router.put("/contacts/status", response_model=List[dtos.ContactResponse])
+def update_contacts_status(
+    update: dtos.ContactBatchStatusUpdate,
+    use_case: ContactStatusUseCase = Depends(get_contact_status_use_case)
+):
+    contact_status = _contact_status(update.status)
+    try:
+        contacts = use_case.update_statuses(update.contact_ids, contact_status)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if contacts is None:
+        raise HTTPException(status_code=404, detail="Contact not found")
+    return json_response([dtos.ContactResponse.row(contact) for contact in contacts])
+
+@router.put("/contacts/{contact_id}/status", response_model=dtos.ContactResponse)
+def update_contact_status(
+    contact_id: int,
+    status: str,
+    use_case: ContactStatusUseCase = Depends(get_contact_status_use_case)
+):
+    contact_status = _contact_status(status)
+    try:
+        contact = use_case.update_status(contact_id, contact_status)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if contact is None:
+        raise HTTPException(status_code=404, detail="Contact not found")
+    return json_response(dtos.ContactResponse.row(contact))
+
+@router.get("/leads/", response_model=dtos.LeadPage)
+def list_leads(
+    after: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=1000),
+    use_case: ContactQueryUseCase = Depends(get_contact_query_use_case)
+):
+    page = use_case.list_leads(after, limit)
+    return json_response({
+        "items": [dtos.LeadSummaryResponse.row(lead) for lead in page.items],
+        "next_cursor": page.next_cursor
+    })
+
+@router.get("/leads/export")
+def export_leads(use_case: ContactQueryUseCase = Depends(get_contact_query_use_case)):
+    return StreamingResponse(
+        _ndjson(use_case.export_leads(), dtos.LeadSummaryResponse.row),
+        media_type="application/x-ndjson"
+    )
+
+@router.get("/operators/", response_model=dtos.OperatorPage)
+def list_operators(
+    after: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=1000),
+    use_case: OperatorManagementUseCase = Depends(get_operator_management_use_case)
+):
+    page = use_case.list_operators(after, limit)
+    return json_response({
+        "items": [dtos.OperatorResponse.row(operator) for operator in page.items],
+        "next_cursor": page.next_cursor
+    })
+
 @router.post("/operators/")
 def create_operator(
     operator_data: dtos.OperatorCreate,
@@ -70,4 +209,64 @@ def update_source_weights(
     ]
     
     updated_weights = use_case.update_source_weights(source_id, weights)
-    return {"updated_weights": len(updated_weights)}
\ No newline at end of file
+    return {"updated_weights": len(updated_weights)}
+
+@router.get("/stats/contacts/hourly", response_model=List[dtos.HourlyContactStats], description=ROLLUP_PERIOD)
+def get_hourly_contact_stats(
+    filters: entities.ContactFilter = Depends(_contact_filter),
+    use_case: ContactStatsUseCase = Depends(get_contact_stats_use_case)
+):
+    return use_case.hourly(filters)
+
+@router.get("/stats/sources/{source_id}", response_model=dtos.SourceDistributionStats, description=ROLLUP_PERIOD)
+def get_source_distribution_stats(
+    source_id: int,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    use_case: ContactStatsUseCase = Depends(get_contact_stats_use_case)
+):
+    return use_case.source_distribution(
+        source_id, entities.ContactFilter(created_from=created_from, created_to=created_to)
+    )
+
+@router.get("/stats/operators", response_model=List[dtos.OperatorLoadStats], description=ROLLUP_PERIOD)
+def get_operator_load_stats(
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    use_case: ContactStatsUseCase = Depends(get_contact_stats_use_case)
+):
+    return use_case.operator_load(entities.ContactFilter(created_from=created_from, created_to=created_to))
+
+@router.get("/stats/weights-cache")
+def get_weights_cache_stats(cache = Depends(get_weight_cache)):
+    if cache is None:
+        raise HTTPException(status_code=404, detail="Weight cache is disabled")
+    return cache.stats()
+
+@router.get("/stats/lead-affinity")
+def get_lead_affinity_stats(affinity = Depends(get_lead_affinity)):
+    if affinity is None:
+        raise HTTPException(status_code=404, detail="Lead affinity is disabled")
+    return affinity.stats()
+
+@router.get("/stats/contact-dedupe")
+def get_contact_dedupe_stats(dedupe = Depends(get_contact_dedupe)):
+    if dedupe is None:
+        raise HTTPException(status_code=404, detail="Contact dedupe is disabled")
+    return dedupe.stats()
+
+@router.get("/stats/redistribution")
+def get_redistribution_stats(redistributor = Depends(get_redistributor)):
+    if redistributor is None:
+        raise HTTPException(status_code=404, detail="Redistribution is disabled")
+    return redistributor.stats()
+
+@router.get("/stats/write-behind")
+def get_write_behind_stats(writer = Depends(get_contact_writer)):
+    if writer is None:
+        raise HTTPException(status_code=404, detail="Write-behind is disabled")
+    return writer.stats()
+
+@router.get("/stats/db-pool")
+def get_db_pool_stats(metrics = Depends(get_pool_metrics)):
+    return {name: pool.snapshot() for name, pool in metrics.items() if pool is not None}
\ No newline at end of file
@@ -0,0 +1,65 @@
+import logging
+import time
+from collections import defaultdict
+from typing import Dict, Optional
+import metrics
+
+logger = logging.getLogger(__name__)
+
+class MetricsMiddleware:
+    def __init__(self, app, slow_request_threshold_ms: float = 0.0):
+        self.app = app
+        self.slow_request_threshold = slow_request_threshold_ms / 1000
+        self._handlers: Optional[Dict[object, str]] = None
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        stats = metrics.RequestStats()
+        token = metrics.current_request.set(stats)
+        status_code = 500
+        
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+        
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            duration = time.perf_counter() - started
+            metrics.current_request.reset(token)
+            method = scope["method"]
+            handler = self._handler(scope)
+            metrics.http_requests.inc(method, handler, str(status_code))
+            metrics.http_request_duration.observe(duration, method, handler)
+            metrics.http_request_statements.observe(stats.statement_count, method, handler)
+            if self.slow_request_threshold and duration >= self.slow_request_threshold:
+                self._log_slow_request(method, scope["path"], duration, stats)
+    
+    def _handler(self, scope) -> str:
+        if self._handlers is None:
+            self._handlers = {
+                route.endpoint: route.path
+                for route in scope["app"].routes if hasattr(route, "endpoint")
+            }
+        return self._handlers.get(scope.get("endpoint"), "unmatched")
+    
+    def _log_slow_request(self, method: str, path: str, duration: float, stats: metrics.RequestStats) -> None:
+        breakdown = defaultdict(lambda: [0, 0.0])
+        for statement, statement_duration in stats.statements:
+            breakdown[statement][0] += 1
+            breakdown[statement][1] += statement_duration
+        lines = [
+            f"{count}x {total * 1000:.2f}ms {' '.join(statement.split())[:300]}"
+            for statement, (count, total) in sorted(breakdown.items(), key=lambda item: -item[1][1])
+        ]
+        spans = ", ".join(f"{name}={span_duration * 1000:.2f}ms" for name, span_duration in stats.spans)
+        logger.warning(
+            "Slow request %s %s took %.2fms with %d statements (%s)\n%s",
+            method, path, duration * 1000, stats.statement_count, spans, "\n".join(lines)
+        )
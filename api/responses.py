@@ -0,0 +1,6 @@
+from typing import Any
+from fastapi.responses import Response
+from pydantic_core import to_json
+
+def json_response(content: Any, status_code: int = 200) -> Response:
+    return Response(to_json(content), status_code=status_code, media_type="application/json")
\ No newline at end of file
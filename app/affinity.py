@@ -0,0 +1,87 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Optional
+from core import entities
+
+@dataclass(slots=True)
+class _Affinity:
+    operator_id: int
+    contact_id: int
+    expires_at: float
+
+class LeadAffinityIndex:
+    def __init__(
+        self,
+        ttl: float = 86400.0,
+        max_size: int = 100000,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._clock = clock
+        self._entries: "OrderedDict[int, _Affinity]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.switches = 0
+        self.expirations = 0
+        self.evictions = 0
+    
+    def get(self, lead_id: int) -> Optional[int]:
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(lead_id)
+            if entry is not None and entry.expires_at <= now:
+                del self._entries[lead_id]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry.operator_id
+    
+    def get_many(self, lead_ids: Iterable[int]) -> Dict[int, int]:
+        found = {}
+        for lead_id in set(lead_ids):
+            operator_id = self.get(lead_id)
+            if operator_id is not None:
+                found[lead_id] = operator_id
+        return found
+    
+    def remember(self, contacts: Iterable[entities.Contact]) -> None:
+        expires_at = self._clock() + self.ttl
+        with self._lock:
+            for contact in contacts:
+                if contact.operator_id is None or contact.id is None or contact.status == entities.ContactStatus.CLOSED:
+                    continue
+                entry = self._entries.get(contact.lead_id)
+                if entry is not None and entry.contact_id > contact.id:
+                    continue
+                if entry is not None and entry.operator_id != contact.operator_id:
+                    self.switches += 1
+                self._entries[contact.lead_id] = _Affinity(contact.operator_id, contact.id, expires_at)
+                self._entries.move_to_end(contact.lead_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def forget(self, contacts: Iterable[entities.Contact]) -> None:
+        with self._lock:
+            for contact in contacts:
+                entry = self._entries.get(contact.lead_id)
+                if entry is not None and entry.contact_id == contact.id:
+                    del self._entries[contact.lead_id]
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "switches": self.switches,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "size": len(self._entries)
+            }
\ No newline at end of file
@@ -0,0 +1,148 @@
+from typing import Dict, List, Optional, Tuple
+from core import entities, repositories
+from metrics import span
+from app import distribution
+from app.affinity import LeadAffinityIndex
+from app.dedupe import ContactDedupeIndex, dedupe_key
+from app.load_tracker import OperatorLoadTracker
+from app.sampler import SamplerRegistry, WeightedSampler
+from app.use_cases import BaseLeadDistributionUseCase
+
+class AsyncLeadDistributionUseCase(BaseLeadDistributionUseCase):
+    def __init__(
+        self,
+        lead_repo: repositories.AsyncLeadRepository,
+        weight_repo: repositories.AsyncOperatorSourceWeightRepository,
+        contact_repo: repositories.AsyncContactRepository,
+        load_tracker: Optional[OperatorLoadTracker] = None,
+        samplers: Optional[SamplerRegistry] = None,
+        affinity: Optional[LeadAffinityIndex] = None,
+        dedupe: Optional[ContactDedupeIndex] = None
+    ):
+        super().__init__(load_tracker, samplers, affinity, dedupe)
+        self.lead_repo = lead_repo
+        self.weight_repo = weight_repo
+        self.contact_repo = contact_repo
+    
+    async def create_contact(
+        self,
+        lead_external_id: str,
+        source_id: int,
+        message: str = None,
+        idempotency_key: Optional[str] = None
+    ) -> entities.Contact:
+        if self.dedupe is None:
+            return await self._create_contact(lead_external_id, source_id, message)
+        key = dedupe_key(lead_external_id, source_id, message, idempotency_key)
+        async with self.dedupe.claim_async(key):
+            with span("dedupe_lookup"):
+                original = (await self._find_duplicates([key])).get(key)
+            if original is not None:
+                return original
+            contact = await self._create_contact(lead_external_id, source_id, message, key)
+            self.dedupe.remember([contact])
+        await self._purge_dedupe_keys()
+        return contact
+    
+    async def create_contacts(
+        self,
+        items: List[Tuple[str, int, Optional[str]]],
+        idempotency_keys: Optional[List[Optional[str]]] = None
+    ) -> List[entities.Contact]:
+        if self.dedupe is None:
+            return await self._create_contacts(items)
+        keys = self._dedupe_keys(items, idempotency_keys)
+        async with self.dedupe.claim_many_async(keys):
+            found = await self._find_duplicates(keys)
+            fresh = self._fresh_items(keys, items, found)
+            if fresh:
+                self._remember_created(found, list(fresh), await self._create_contacts(list(fresh.values()), list(fresh)))
+        await self._purge_dedupe_keys()
+        return [found[key] for key in keys]
+    
+    async def _create_contact(
+        self,
+        lead_external_id: str,
+        source_id: int,
+        message: Optional[str],
+        key: Optional[str] = None
+    ) -> entities.Contact:
+        with span("lead_upsert"):
+            lead = await self.lead_repo.get_or_create(lead_external_id)
+        
+        with span("available_operators"):
+            available_operators = await self._get_available_operators(source_id)
+        operator_id = None
+        if available_operators:
+            with span("select_operator"):
+                operator_id = self._reserve_operator(
+                    source_id, available_operators, await self._get_sampler(source_id), self._preferred_operator(lead.id)
+                )
+        
+        contact = entities.Contact(
+            lead_id=lead.id,
+            source_id=source_id,
+            operator_id=operator_id,
+            message=message,
+            dedupe_key=key
+        )
+        try:
+            with span("contact_commit"):
+                contact = await self.contact_repo.create(contact)
+        except Exception:
+            self._release([operator_id])
+            raise
+        self._created([contact], [operator_id])
+        return contact
+    
+    async def _create_contacts(
+        self,
+        items: List[Tuple[str, int, Optional[str]]],
+        keys: Optional[List[str]] = None
+    ) -> List[entities.Contact]:
+        leads = await self.lead_repo.get_by_external_ids(external_id for external_id, _, _ in items)
+        new_leads = distribution.collect_new_leads((external_id for external_id, _, _ in items), leads)
+        await self.lead_repo.create_many(new_leads, commit=False)
+        
+        source_ids = [source_id for _, source_id, _ in items]
+        available_by_source = {}
+        samplers_by_source = {}
+        for source_id in set(source_ids):
+            available_by_source[source_id] = await self._get_available_operators(source_id)
+            if available_by_source[source_id]:
+                samplers_by_source[source_id] = await self._get_sampler(source_id)
+        operator_ids = self._distribute(
+            source_ids, available_by_source, samplers_by_source, [leads[external_id].id for external_id, _, _ in items]
+        )
+        
+        try:
+            contacts = await self.contact_repo.create_many(self._new_contacts(items, leads, operator_ids, keys))
+        except Exception:
+            self._release(operator_ids)
+            raise
+        self._created(contacts, operator_ids)
+        return contacts
+    
+    async def _find_duplicates(self, keys: List[str]) -> Dict[str, entities.Contact]:
+        found, missing = self._indexed_duplicates(keys)
+        if missing:
+            return self._stored_duplicates(
+                found, await self.contact_repo.get_by_dedupe_keys(missing, self.dedupe.window_start())
+            )
+        return found
+    
+    async def _purge_dedupe_keys(self) -> None:
+        if self.dedupe.purge_due():
+            await self.contact_repo.purge_dedupe_keys(self.dedupe.window_start())
+    
+    async def _get_available_operators(self, source_id: int) -> Dict[int, entities.OperatorCandidate]:
+        return self._filter_by_load(await self._operator_candidates(source_id))
+    
+    async def _get_sampler(self, source_id: int) -> Optional[WeightedSampler]:
+        if self.samplers is None:
+            return None
+        version = await self.weight_repo.get_weights_version(source_id)
+        sampler = self._cached_sampler(source_id, version)
+        if sampler is None:
+            sampler = self._build_sampler(source_id, version, await self.weight_repo.get_weights_for_source(source_id))
+        return sampler
\ No newline at end of file
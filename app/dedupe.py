@@ -0,0 +1,139 @@
+import asyncio
+import datetime
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from contextlib import AsyncExitStack, ExitStack, asynccontextmanager, contextmanager
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, Iterable, Optional
+from core import entities
+
+def dedupe_key(lead_external_id: str, source_id: int, message: Optional[str], idempotency_key: Optional[str] = None) -> str:
+    if idempotency_key is not None:
+        payload = ["key", lead_external_id, source_id, idempotency_key]
+    else:
+        payload = ["content", lead_external_id, source_id, message]
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False).encode()).hexdigest()
+
+@dataclass(slots=True)
+class _Entry:
+    contact: entities.Contact
+    expires_at: float
+
+class ContactDedupeIndex:
+    def __init__(
+        self,
+        window: float = 600.0,
+        max_size: int = 100000,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.window = window
+        self.max_size = max_size
+        self._clock = clock
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._claims: Dict[str, list] = {}
+        self._async_claims: Dict[str, list] = {}
+        self._next_purge = clock() + window
+        self.hits = 0
+        self.misses = 0
+        self.fallback_hits = 0
+        self.expirations = 0
+        self.evictions = 0
+    
+    def get_many(self, keys: Iterable[str]) -> Dict[str, entities.Contact]:
+        now = self._clock()
+        found = {}
+        with self._lock:
+            for key in set(keys):
+                entry = self._entries.get(key)
+                if entry is not None and entry.expires_at <= now:
+                    del self._entries[key]
+                    self.expirations += 1
+                    entry = None
+                if entry is None:
+                    self.misses += 1
+                    continue
+                self.hits += 1
+                found[key] = replace(entry.contact)
+        return found
+    
+    def window_start(self) -> datetime.datetime:
+        return datetime.datetime.utcnow() - datetime.timedelta(seconds=self.window)
+    
+    def remember(self, contacts: Iterable[entities.Contact], fallback: bool = False) -> None:
+        now = self._clock()
+        utcnow = datetime.datetime.utcnow()
+        with self._lock:
+            for contact in contacts:
+                if contact.dedupe_key is None:
+                    continue
+                age = (utcnow - contact.created_at).total_seconds() if contact.created_at is not None else 0.0
+                self._entries[contact.dedupe_key] = _Entry(replace(contact), now + self.window - max(age, 0.0))
+                self._entries.move_to_end(contact.dedupe_key)
+                if fallback:
+                    self.fallback_hits += 1
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+    
+    def purge_due(self) -> bool:
+        now = self._clock()
+        with self._lock:
+            if now < self._next_purge:
+                return False
+            self._next_purge = now + self.window
+            return True
+    
+    @contextmanager
+    def claim(self, key: str):
+        with self._lock:
+            claim = self._claims.setdefault(key, [threading.Lock(), 0])
+            claim[1] += 1
+        try:
+            with claim[0]:
+                yield
+        finally:
+            with self._lock:
+                claim[1] -= 1
+                if not claim[1]:
+                    del self._claims[key]
+    
+    @contextmanager
+    def claim_many(self, keys: Iterable[str]):
+        with ExitStack() as stack:
+            for key in sorted(set(keys)):
+                stack.enter_context(self.claim(key))
+            yield
+    
+    @asynccontextmanager
+    async def claim_async(self, key: str):
+        claim = self._async_claims.setdefault(key, [asyncio.Lock(), 0])
+        claim[1] += 1
+        try:
+            async with claim[0]:
+                yield
+        finally:
+            claim[1] -= 1
+            if not claim[1]:
+                del self._async_claims[key]
+    
+    @asynccontextmanager
+    async def claim_many_async(self, keys: Iterable[str]):
+        async with AsyncExitStack() as stack:
+            for key in sorted(set(keys)):
+                await stack.enter_async_context(self.claim_async(key))
+            yield
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "fallback_hits": self.fallback_hits,
+                "expirations": self.expirations,
+                "evictions": self.evictions,
+                "size": len(self._entries)
+            }
\ No newline at end of file
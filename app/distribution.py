@@ -0,0 +1,100 @@
+from dataclasses import replace
+from typing import Callable, Dict, Iterable, List, Optional
+from core import entities
+from app.load_tracker import OperatorLoadTracker
+from app.sampler import WeightedSampler
+
+def filter_by_load(
+    candidates: Iterable[entities.OperatorCandidate],
+    load_tracker: Optional[OperatorLoadTracker] = None
+) -> Dict[int, entities.OperatorCandidate]:
+    available = {}
+    for candidate in candidates:
+        if load_tracker is not None:
+            active_count = load_tracker.get(candidate.operator_id)
+            if active_count >= candidate.max_active_leads:
+                continue
+            candidate = replace(candidate, active_count=active_count)
+        available[candidate.operator_id] = candidate
+    return available
+
+def choose_operator(
+    available: Dict[int, entities.OperatorCandidate],
+    sampler: Optional[WeightedSampler] = None
+) -> Optional[int]:
+    if not available:
+        return None
+    
+    operator_id = sampler.choice(available) if sampler is not None else None
+    if operator_id is None:
+        operator_id = WeightedSampler(
+            (candidate.operator_id, candidate.weight) for candidate in available.values()
+        ).choice()
+    return operator_id
+
+def reserve_operator(
+    source_id: int,
+    available_by_source: Dict[int, Dict[int, entities.OperatorCandidate]],
+    sampler: Optional[WeightedSampler],
+    reserve: Callable[[entities.OperatorCandidate], bool],
+    preferred: Optional[int] = None
+) -> Optional[int]:
+    available = available_by_source[source_id]
+    if preferred in available:
+        if reserve(available[preferred]):
+            return preferred
+        for source_available in available_by_source.values():
+            source_available.pop(preferred, None)
+    while True:
+        operator_id = choose_operator(available, sampler)
+        if operator_id is None or reserve(available[operator_id]):
+            return operator_id
+        for source_available in available_by_source.values():
+            source_available.pop(operator_id, None)
+
+def local_reserve(available_by_source: Dict[int, Dict[int, entities.OperatorCandidate]]) -> Callable[[entities.OperatorCandidate], bool]:
+    active_counts: Dict[int, int] = {}
+    for available in available_by_source.values():
+        for candidate in available.values():
+            active_counts.setdefault(candidate.operator_id, candidate.active_count)
+    
+    def reserve(candidate: entities.OperatorCandidate) -> bool:
+        if active_counts[candidate.operator_id] >= candidate.max_active_leads:
+            return False
+        active_counts[candidate.operator_id] += 1
+        return True
+    return reserve
+
+def distribute(
+    source_ids: List[int],
+    available_by_source: Dict[int, Dict[int, entities.OperatorCandidate]],
+    samplers_by_source: Dict[int, Optional[WeightedSampler]],
+    reserve: Optional[Callable[[entities.OperatorCandidate], bool]] = None,
+    lead_ids: Optional[List[int]] = None,
+    affinity: Optional[Dict[int, int]] = None
+) -> List[Optional[int]]:
+    if reserve is None:
+        reserve = local_reserve(available_by_source)
+    if affinity is None:
+        return [
+            reserve_operator(source_id, available_by_source, samplers_by_source.get(source_id), reserve)
+            for source_id in source_ids
+        ]
+    
+    operator_ids = []
+    for source_id, lead_id in zip(source_ids, lead_ids):
+        operator_id = reserve_operator(
+            source_id, available_by_source, samplers_by_source.get(source_id), reserve, affinity.get(lead_id)
+        )
+        if operator_id is not None:
+            affinity[lead_id] = operator_id
+        operator_ids.append(operator_id)
+    return operator_ids
+
+def collect_new_leads(external_ids: Iterable[str], leads: Dict[str, entities.Lead]) -> List[entities.Lead]:
+    new_leads = []
+    for external_id in external_ids:
+        if external_id not in leads:
+            leads[external_id] = entities.Lead(external_id=external_id)
+            new_leads.append(leads[external_id])
+    return new_leads
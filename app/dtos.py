@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
 
@@ -24,6 +24,14 @@ class ContactCreate(BaseModel):
     lead_external_id: str
     source_id: int
     message: Optional[str] = None
+    idempotency_key: Optional[str] = Field(default=None, max_length=255)
+
+class ContactBatchCreate(BaseModel):
+    contacts: List[ContactCreate] = Field(min_length=1, max_length=10000)
+
+class ContactBatchStatusUpdate(BaseModel):
+    contact_ids: List[int] = Field(min_length=1, max_length=10000)
+    status: str
 
 class ContactResponse(BaseModel):
     id: int
@@ -33,15 +41,111 @@ class ContactResponse(BaseModel):
     message: Optional[str]
     status: str
     created_at: datetime
+    
+    @classmethod
+    def from_entity(cls, contact) -> "ContactResponse":
+        return cls(**cls.row(contact))
+    
+    @staticmethod
+    def row(contact) -> dict:
+        return {
+            "id": contact.id,
+            "lead_id": contact.lead_id,
+            "source_id": contact.source_id,
+            "operator_id": contact.operator_id,
+            "message": contact.message,
+            "status": contact.status.value,
+            "created_at": contact.created_at
+        }
 
-class LeadResponse(BaseModel):
+class LeadSummaryResponse(BaseModel):
     id: int
     external_id: str
     email: Optional[str]
     phone: Optional[str]
     created_at: datetime
+    
+    @classmethod
+    def from_entity(cls, lead) -> "LeadSummaryResponse":
+        return cls(**cls.row(lead))
+    
+    @staticmethod
+    def row(lead) -> dict:
+        return {
+            "id": lead.id,
+            "external_id": lead.external_id,
+            "email": lead.email,
+            "phone": lead.phone,
+            "created_at": lead.created_at
+        }
+
+class LeadResponse(LeadSummaryResponse):
     contacts: List[ContactResponse] = []
 
+class OperatorResponse(BaseModel):
+    id: int
+    name: str
+    status: str
+    max_active_leads: int
+    created_at: Optional[datetime]
+    
+    @classmethod
+    def from_entity(cls, operator) -> "OperatorResponse":
+        return cls(**cls.row(operator))
+    
+    @staticmethod
+    def row(operator) -> dict:
+        return {
+            "id": operator.id,
+            "name": operator.name,
+            "status": operator.status.value,
+            "max_active_leads": operator.max_active_leads,
+            "created_at": operator.created_at
+        }
+
+class ContactPage(BaseModel):
+    items: List[ContactResponse]
+    next_cursor: Optional[int] = None
+
+class LeadPage(BaseModel):
+    items: List[LeadSummaryResponse]
+    next_cursor: Optional[int] = None
+
+class OperatorPage(BaseModel):
+    items: List[OperatorResponse]
+    next_cursor: Optional[int] = None
+
+class HourlyContactStats(BaseModel):
+    hour: datetime
+    total: int
+    unassigned: int
+    new: int
+    in_progress: int
+    closed: int
+
+class OperatorShareStats(BaseModel):
+    operator_id: int
+    contacts: int
+    share: float
+    weight: int
+    weight_share: float
+
+class SourceDistributionStats(BaseModel):
+    source_id: int
+    total: int
+    unassigned: int
+    unassigned_rate: float
+    operators: List[OperatorShareStats]
+
+class OperatorLoadStats(BaseModel):
+    operator_id: int
+    name: str
+    status: str
+    max_active_leads: int
+    active: int
+    load: float
+    contacts: int
+
 class OperatorWeightUpdate(BaseModel):
     operator_id: int
     weight: int
@@ -0,0 +1,114 @@
+import logging
+import threading
+from functools import partial
+from typing import Callable, Dict, List, Optional
+from core import entities
+from shared_state import CounterStore, LocalCounterStore
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_CONTACT_STATUSES = frozenset({entities.ContactStatus.NEW, entities.ContactStatus.IN_PROGRESS})
+
+LOAD_FIELDS = 4
+ACTIVE, COMMITTED, SETTLED, CLOSING = range(LOAD_FIELDS)
+
+def _shift(delta: int, values: List[int]) -> List[int]:
+    return [max(values[ACTIVE] + delta, 0), max(values[COMMITTED] + delta, 0), values[SETTLED], values[CLOSING]]
+
+def _settle(values: List[int]) -> List[int]:
+    return [values[ACTIVE], values[COMMITTED] + 1, values[SETTLED] + 1, values[CLOSING]]
+
+def _begin_close(values: List[int]) -> List[int]:
+    return [values[ACTIVE], values[COMMITTED], values[SETTLED], values[CLOSING] + 1]
+
+def _end_close(closed: int, values: List[int]) -> List[int]:
+    return [
+        max(values[ACTIVE] - closed, 0), max(values[COMMITTED] - closed, 0), values[SETTLED], max(values[CLOSING] - 1, 0)
+    ]
+
+def _reconciled(count: int, settled_before: int, values: List[int]) -> List[int]:
+    committed = count + values[SETTLED] - settled_before + values[CLOSING]
+    return [max(values[ACTIVE] + committed - values[COMMITTED], 0), committed, values[SETTLED], values[CLOSING]]
+
+class OperatorLoadTracker:
+    def __init__(
+        self,
+        load_counts: Callable[[], Dict[int, int]],
+        reconcile_interval: float = 60.0,
+        store: Optional[CounterStore] = None
+    ):
+        self._load_counts = load_counts
+        self.reconcile_interval = reconcile_interval
+        self._store = store or LocalCounterStore(LOAD_FIELDS)
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def get(self, operator_id: int) -> int:
+        return self._store.get(operator_id)
+    
+    def increment(self, operator_id: int, delta: int = 1) -> None:
+        self._store.update(operator_id, partial(_shift, delta))
+    
+    def try_reserve(self, operator_id: int, max_active_leads: int) -> bool:
+        return self._store.try_increment(operator_id, max_active_leads)
+    
+    def settle(self, operator_id: int) -> None:
+        self._store.update(operator_id, _settle)
+    
+    def release(self, operator_id: int) -> None:
+        self._store.add(operator_id, -1)
+    
+    def begin_close(self, operator_id: int) -> None:
+        self._store.update(operator_id, _begin_close)
+    
+    def end_close(self, operator_id: int, closed: bool = True) -> None:
+        self._store.update(operator_id, partial(_end_close, int(closed)))
+    
+    def decrement(self, operator_id: int) -> None:
+        self.increment(operator_id, -1)
+    
+    def on_status_change(
+        self,
+        operator_id: Optional[int],
+        old_status: entities.ContactStatus,
+        new_status: entities.ContactStatus
+    ) -> None:
+        if operator_id is None:
+            return
+        was_active = old_status in ACTIVE_CONTACT_STATUSES
+        is_active = new_status in ACTIVE_CONTACT_STATUSES
+        if was_active and not is_active:
+            self.decrement(operator_id)
+        elif is_active and not was_active:
+            self.increment(operator_id)
+    
+    def reconcile(self) -> None:
+        if not self._store.try_lead():
+            return
+        settled = self._store.values(SETTLED)
+        counts = self._load_counts()
+        for operator_id in set(counts) | set(self._store.values(COMMITTED)):
+            self._store.update(
+                operator_id, partial(_reconciled, counts.get(operator_id, 0), settled.get(operator_id, 0))
+            )
+    
+    def start(self) -> None:
+        self.reconcile()
+        if self.reconcile_interval <= 0 or self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="operator-load-reconcile", daemon=True)
+        self._thread.start()
+    
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def _run(self) -> None:
+        while not self._stopped.wait(self.reconcile_interval):
+            try:
+                self.reconcile()
+            except Exception:
+                logger.exception("Operator load reconciliation failed")
\ No newline at end of file
@@ -0,0 +1,97 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DRAIN_RATE_WINDOW = 300.0
+
+class RedistributionWorker:
+    def __init__(
+        self,
+        redistribute: Callable[[Optional[int], int], Tuple[int, Optional[int]]],
+        count_backlog: Callable[[], int],
+        interval: float = 30.0,
+        batch_size: int = 500
+    ):
+        self._redistribute = redistribute
+        self._count_backlog = count_backlog
+        self.interval = interval
+        self.batch_size = batch_size
+        self._backlog = 0
+        self._assigned_total = 0
+        self._runs = 0
+        self._last_run_at: Optional[float] = None
+        self._history = deque()
+        self._run_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def trigger(self) -> None:
+        self._wake.set()
+    
+    def run_once(self) -> int:
+        with self._run_lock:
+            assigned = 0
+            after_id = None
+            while not self._stopped.is_set():
+                batch_assigned, after_id = self._redistribute(after_id, self.batch_size)
+                assigned += batch_assigned
+                if after_id is None:
+                    break
+            self._record(assigned)
+            self._backlog = self._count_backlog()
+            return assigned
+    
+    def stats(self) -> dict:
+        now = time.monotonic()
+        self._trim(now)
+        return {
+            "backlog": self._backlog,
+            "assigned_total": self._assigned_total,
+            "runs": self._runs,
+            "drain_rate": sum(assigned for _, assigned in self._history) / DRAIN_RATE_WINDOW,
+            "seconds_since_last_run": None if self._last_run_at is None else now - self._last_run_at
+        }
+    
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._wake.set()
+        self._thread = threading.Thread(target=self._run, name="contact-redistribution", daemon=True)
+        self._thread.start()
+    
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def _record(self, assigned: int) -> None:
+        now = time.monotonic()
+        self._runs += 1
+        self._assigned_total += assigned
+        self._last_run_at = now
+        if assigned:
+            self._history.append((now, assigned))
+        self._trim(now)
+    
+    def _trim(self, now: float) -> None:
+        while self._history and now - self._history[0][0] > DRAIN_RATE_WINDOW:
+            self._history.popleft()
+    
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.interval if self.interval > 0 else None)
+            self._wake.clear()
+            if self._stopped.is_set():
+                return
+            try:
+                self.run_once()
+            except Exception:
+                logger.exception("Contact redistribution failed")
\ No newline at end of file
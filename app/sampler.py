@@ -0,0 +1,52 @@
+import bisect
+import random
+from itertools import accumulate
+from typing import Container, Dict, Iterable, Optional, Tuple
+
+MAX_REJECTIONS = 8
+
+class WeightedSampler:
+    def __init__(self, weights: Iterable[Tuple[int, int]]):
+        items = [(operator_id, weight) for operator_id, weight in weights if weight > 0]
+        self.operator_ids = [operator_id for operator_id, _ in items]
+        self.weights = [weight for _, weight in items]
+        self.cumulative = list(accumulate(self.weights))
+        self.total = self.cumulative[-1] if self.cumulative else 0
+    
+    def __len__(self) -> int:
+        return len(self.operator_ids)
+    
+    def choice(self, allowed: Optional[Container[int]] = None, rng: random.Random = random) -> Optional[int]:
+        if not self.total:
+            return None
+        for _ in range(MAX_REJECTIONS):
+            operator_id = self.operator_ids[bisect.bisect_right(self.cumulative, rng.randrange(self.total))]
+            if allowed is None or operator_id in allowed:
+                return operator_id
+        return self._choice_filtered(allowed, rng)
+    
+    def _choice_filtered(self, allowed: Container[int], rng: random.Random) -> Optional[int]:
+        operator_ids = []
+        weights = []
+        for operator_id, weight in zip(self.operator_ids, self.weights):
+            if operator_id in allowed:
+                operator_ids.append(operator_id)
+                weights.append(weight)
+        if not operator_ids:
+            return None
+        return rng.choices(operator_ids, weights=weights)[0]
+
+class SamplerRegistry:
+    def __init__(self):
+        self._samplers: Dict[int, Tuple[int, WeightedSampler]] = {}
+    
+    def get(self, source_id: int, version: int) -> Optional[WeightedSampler]:
+        cached = self._samplers.get(source_id)
+        if cached is None or cached[0] != version:
+            return None
+        return cached[1]
+    
+    def build(self, source_id: int, weights: Iterable[Tuple[int, int]], version: int) -> WeightedSampler:
+        sampler = WeightedSampler(weights)
+        self._samplers[source_id] = (version, sampler)
+        return sampler
\ No newline at end of file
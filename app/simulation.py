@@ -0,0 +1,226 @@
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+from core import entities
+
+@dataclass(slots=True)
+class ContactStream:
+    arrivals: np.ndarray
+    source_ids: np.ndarray
+
+@dataclass(slots=True)
+class OperatorSimulation:
+    operator_id: int
+    max_active_leads: int
+    assigned: int
+    share: float
+    peak_active: int
+    seconds_at_capacity: float
+    at_capacity_share: float
+
+@dataclass(slots=True)
+class SourceSimulation:
+    source_id: int
+    contacts: int
+    unassigned: int
+
+@dataclass(slots=True)
+class SimulationResult:
+    contacts: int
+    assigned: int
+    unassigned: int
+    duration_seconds: float
+    elapsed_seconds: float
+    sources: List[SourceSimulation]
+    operators: List[OperatorSimulation]
+
+def build_scenario(
+    operators: Iterable[entities.Operator],
+    weights_by_source: Dict[int, Iterable[entities.OperatorSourceWeight]],
+    active_counts: Optional[Dict[int, int]] = None
+) -> Dict[int, List[entities.OperatorCandidate]]:
+    active_counts = active_counts or {}
+    active = {
+        operator.id: operator for operator in operators
+        if operator.status == entities.OperatorStatus.ACTIVE
+    }
+    return {
+        source_id: [
+            entities.OperatorCandidate(
+                operator_id=weight.operator_id,
+                weight=weight.weight,
+                active_count=active_counts.get(weight.operator_id, 0),
+                max_active_leads=active[weight.operator_id].max_active_leads
+            ) for weight in weights if weight.weight > 0 and weight.operator_id in active
+        ] for source_id, weights in weights_by_source.items()
+    }
+
+def synthetic_stream(
+    contacts: int,
+    duration_seconds: float,
+    source_shares: Dict[int, float],
+    seed: Optional[int] = None
+) -> ContactStream:
+    rng = np.random.default_rng(seed)
+    source_ids = np.fromiter(source_shares, dtype=np.int64, count=len(source_shares))
+    shares = np.fromiter(source_shares.values(), dtype=np.float64, count=len(source_shares))
+    return ContactStream(
+        arrivals=np.sort(rng.uniform(0.0, duration_seconds, contacts)),
+        source_ids=rng.choice(source_ids, size=contacts, p=shares / shares.sum())
+    )
+
+def recorded_stream(contacts: Iterable[entities.Contact]) -> ContactStream:
+    created_at = []
+    source_ids = []
+    for contact in contacts:
+        created_at.append(contact.created_at.timestamp())
+        source_ids.append(contact.source_id)
+    arrivals = np.array(created_at, dtype=np.float64)
+    order = np.argsort(arrivals, kind="stable")
+    arrivals = arrivals[order]
+    if arrivals.size:
+        arrivals -= arrivals[0]
+    return ContactStream(arrivals=arrivals, source_ids=np.array(source_ids, dtype=np.int64)[order])
+
+def _assign(
+    rows: np.ndarray,
+    free: np.ndarray,
+    weights: np.ndarray,
+    row_offsets: np.ndarray,
+    rng: np.random.Generator
+) -> np.ndarray:
+    operator_count = weights.shape[1]
+    assigned = np.full(rows.size, -1, dtype=np.int64)
+    if not weights.size:
+        return assigned
+    pending = np.flatnonzero(rows >= 0)
+    while pending.size:
+        cumulative = np.cumsum(weights * (free > 0), axis=1)
+        totals = cumulative[:, -1]
+        pending = pending[totals[rows[pending]] > 0]
+        if not pending.size:
+            break
+        pending_rows = rows[pending]
+        offsets = np.concatenate(([0], np.cumsum(totals)[:-1]))
+        picked = np.searchsorted(
+            (cumulative + offsets[:, None]).ravel(),
+            offsets[pending_rows] + rng.integers(0, totals[pending_rows]),
+            side="right"
+        ) - row_offsets[pending_rows]
+        order = np.argsort(picked, kind="stable")
+        ranked = picked[order]
+        rank = np.arange(ranked.size) - np.searchsorted(ranked, ranked, side="left")
+        accepted = np.empty(ranked.size, dtype=bool)
+        accepted[order] = rank < free[ranked]
+        assigned[pending[accepted]] = picked[accepted]
+        free -= np.bincount(picked[accepted], minlength=operator_count)
+        pending = pending[~accepted]
+    return assigned
+
+def simulate(
+    scenario: Dict[int, List[entities.OperatorCandidate]],
+    stream: ContactStream,
+    mean_handle_seconds: float = 1800.0,
+    handle_seconds: Optional[Dict[int, float]] = None,
+    tick_seconds: float = 60.0,
+    duration_seconds: Optional[float] = None,
+    seed: Optional[int] = None
+) -> SimulationResult:
+    started = time.perf_counter()
+    rng = np.random.default_rng(seed)
+    handle_seconds = handle_seconds or {}
+    candidates: Dict[int, entities.OperatorCandidate] = {}
+    for source_candidates in scenario.values():
+        for candidate in source_candidates:
+            candidates.setdefault(candidate.operator_id, candidate)
+    operator_ids = sorted(candidates)
+    operator_index = {operator_id: index for index, operator_id in enumerate(operator_ids)}
+    source_ids = np.array(sorted(scenario), dtype=np.int64)
+    operator_count = len(operator_ids)
+    
+    weights = np.zeros((source_ids.size, operator_count), dtype=np.int64)
+    for row, source_id in enumerate(source_ids.tolist()):
+        for candidate in scenario[source_id]:
+            weights[row, operator_index[candidate.operator_id]] = max(candidate.weight, 0)
+    row_offsets = np.arange(source_ids.size, dtype=np.int64) * operator_count
+    capacity = np.array([candidates[operator_id].max_active_leads for operator_id in operator_ids], dtype=np.int64)
+    active = np.array([candidates[operator_id].active_count for operator_id in operator_ids], dtype=np.int64)
+    handle = np.array(
+        [handle_seconds.get(operator_id, mean_handle_seconds) for operator_id in operator_ids], dtype=np.float64
+    )
+    
+    rows = np.searchsorted(source_ids, stream.source_ids)
+    known = rows < source_ids.size
+    known[known] = source_ids[rows[known]] == stream.source_ids[known]
+    rows[~known] = -1
+    
+    last_arrival = float(stream.arrivals[-1]) if stream.arrivals.size else 0.0
+    duration_seconds = max(duration_seconds or 0.0, last_arrival)
+    tick_count = int(duration_seconds // tick_seconds) + 1
+    bounds = np.searchsorted((stream.arrivals // tick_seconds).astype(np.int64), np.arange(tick_count + 1))
+    releases: Dict[int, List[np.ndarray]] = {}
+    
+    def schedule(operators: np.ndarray, close_at: np.ndarray, tick: int) -> None:
+        close_ticks = np.maximum((close_at // tick_seconds).astype(np.int64), tick + 1)
+        order = np.argsort(close_ticks, kind="stable")
+        close_ticks = close_ticks[order]
+        ticks, starts = np.unique(close_ticks, return_index=True)
+        for close_tick, part in zip(ticks.tolist(), np.split(operators[order], starts[1:])):
+            if close_tick < tick_count:
+                releases.setdefault(close_tick, []).append(part)
+    
+    initial = np.repeat(np.arange(operator_count), active)
+    schedule(initial, rng.exponential(handle[initial]), -1)
+    
+    assigned_counts = np.zeros(operator_count, dtype=np.int64)
+    peak_active = active.copy()
+    ticks_at_capacity = np.zeros(operator_count, dtype=np.int64)
+    contacts_by_row = np.bincount(rows[known], minlength=source_ids.size)
+    unassigned_by_row = np.zeros(source_ids.size, dtype=np.int64)
+    for tick in range(tick_count):
+        released = releases.pop(tick, None)
+        if released:
+            active -= np.bincount(np.concatenate(released), minlength=operator_count)
+        start, stop = bounds[tick], bounds[tick + 1]
+        if stop > start:
+            tick_rows = rows[start:stop]
+            picked = _assign(tick_rows, np.maximum(capacity - active, 0), weights, row_offsets, rng)
+            ok = picked >= 0
+            operators = picked[ok]
+            added = np.bincount(operators, minlength=operator_count)
+            active += added
+            assigned_counts += added
+            unassigned_by_row += np.bincount(tick_rows[~ok & (tick_rows >= 0)], minlength=source_ids.size)
+            schedule(operators, stream.arrivals[start:stop][ok] + rng.exponential(handle[operators]), tick)
+        np.maximum(peak_active, active, out=peak_active)
+        ticks_at_capacity += active >= capacity
+    
+    contacts = int(stream.source_ids.size)
+    assigned = int(assigned_counts.sum())
+    sources = [
+        SourceSimulation(source_id=source_id, contacts=int(count), unassigned=int(unassigned))
+        for source_id, count, unassigned in zip(source_ids.tolist(), contacts_by_row, unassigned_by_row)
+    ]
+    unknown = stream.source_ids[~known]
+    for source_id, count in zip(*np.unique(unknown, return_counts=True)):
+        sources.append(SourceSimulation(source_id=int(source_id), contacts=int(count), unassigned=int(count)))
+    return SimulationResult(
+        contacts=contacts,
+        assigned=assigned,
+        unassigned=contacts - assigned,
+        duration_seconds=float(duration_seconds),
+        elapsed_seconds=time.perf_counter() - started,
+        sources=sources,
+        operators=[
+            OperatorSimulation(
+                operator_id=operator_id,
+                max_active_leads=int(capacity[index]),
+                assigned=int(assigned_counts[index]),
+                share=float(assigned_counts[index] / assigned) if assigned else 0.0,
+                peak_active=int(peak_active[index]),
+                seconds_at_capacity=float(ticks_at_capacity[index] * tick_seconds),
+                at_capacity_share=float(ticks_at_capacity[index] / tick_count)
+            ) for index, operator_id in enumerate(operator_ids)
+        ]
+    )
\ No newline at end of file
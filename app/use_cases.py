@@ -1,74 +1,435 @@
-import random
-from typing import List, Optional
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 from core import entities, repositories
+from metrics import span
+from app import distribution
+from app.affinity import LeadAffinityIndex
+from app.dedupe import ContactDedupeIndex, dedupe_key
+from app.load_tracker import ACTIVE_CONTACT_STATUSES, OperatorLoadTracker
+from app.redistribution import RedistributionWorker
+from app.sampler import SamplerRegistry, WeightedSampler
 
-class LeadDistributionUseCase:
+CONTACT_STATUS_TRANSITIONS = {
+    entities.ContactStatus.NEW: frozenset({entities.ContactStatus.IN_PROGRESS, entities.ContactStatus.CLOSED}),
+    entities.ContactStatus.IN_PROGRESS: frozenset({entities.ContactStatus.CLOSED}),
+    entities.ContactStatus.CLOSED: frozenset()
+}
+
+OPERATOR_PAGE_SIZE = 1000
+
+def _page(items: list, limit: int) -> entities.Page:
+    if len(items) > limit:
+        return entities.Page(items=items[:limit], next_cursor=items[limit - 1].id)
+    return entities.Page(items=items)
+
+class BaseLeadDistributionUseCase:
+    def __init__(
+        self,
+        load_tracker: Optional[OperatorLoadTracker] = None,
+        samplers: Optional[SamplerRegistry] = None,
+        affinity: Optional[LeadAffinityIndex] = None,
+        dedupe: Optional[ContactDedupeIndex] = None
+    ):
+        self.load_tracker = load_tracker
+        self.samplers = samplers
+        self.affinity = affinity
+        self.dedupe = dedupe
+    
+    def _dedupe_keys(
+        self,
+        items: List[Tuple[str, int, Optional[str]]],
+        idempotency_keys: Optional[List[Optional[str]]]
+    ) -> List[str]:
+        return [
+            dedupe_key(external_id, source_id, message, idempotency_key)
+            for (external_id, source_id, message), idempotency_key in zip(items, idempotency_keys or [None] * len(items))
+        ]
+    
+    def _fresh_items(
+        self,
+        keys: List[str],
+        items: List[Tuple[str, int, Optional[str]]],
+        found: Dict[str, entities.Contact]
+    ) -> Dict[str, Tuple[str, int, Optional[str]]]:
+        fresh = {}
+        for key, item in zip(keys, items):
+            if key not in found:
+                fresh.setdefault(key, item)
+        return fresh
+    
+    def _remember_created(
+        self,
+        found: Dict[str, entities.Contact],
+        keys: List[str],
+        created: List[entities.Contact]
+    ) -> None:
+        self.dedupe.remember(created)
+        found.update(zip(keys, created))
+    
+    def _indexed_duplicates(self, keys: List[str]) -> Tuple[Dict[str, entities.Contact], List[str]]:
+        found = self.dedupe.get_many(keys)
+        return found, [key for key in keys if key not in found]
+    
+    def _stored_duplicates(
+        self,
+        found: Dict[str, entities.Contact],
+        stored: Dict[str, entities.Contact]
+    ) -> Dict[str, entities.Contact]:
+        self.dedupe.remember(stored.values(), fallback=True)
+        found.update(stored)
+        return found
+    
+    def _operator_candidates(self, source_id: int):
+        if self.load_tracker is None:
+            return self.weight_repo.get_available_operators(source_id)
+        return self.weight_repo.get_source_operators(source_id)
+    
+    def _filter_by_load(self, candidates: Iterable[entities.OperatorCandidate]) -> Dict[int, entities.OperatorCandidate]:
+        return distribution.filter_by_load(candidates, self.load_tracker)
+    
+    def _cached_sampler(self, source_id: int, version: int) -> Optional[WeightedSampler]:
+        return self.samplers.get(source_id, version)
+    
+    def _build_sampler(
+        self,
+        source_id: int,
+        version: int,
+        weights: Iterable[entities.OperatorSourceWeight]
+    ) -> WeightedSampler:
+        return self.samplers.build(source_id, ((w.operator_id, w.weight) for w in weights), version)
+    
+    def _reserve_operator(
+        self,
+        source_id: int,
+        available_operators: Dict[int, entities.OperatorCandidate],
+        sampler: Optional[WeightedSampler],
+        preferred: Optional[int] = None
+    ) -> Optional[int]:
+        available_by_source = {source_id: available_operators}
+        return distribution.reserve_operator(
+            source_id, available_by_source, sampler, self._reserve_for(available_by_source), preferred
+        )
+    
+    def _distribute(
+        self,
+        source_ids: List[int],
+        available_by_source: Dict[int, Dict[int, entities.OperatorCandidate]],
+        samplers_by_source: Dict[int, Optional[WeightedSampler]],
+        lead_ids: List[int]
+    ) -> List[Optional[int]]:
+        return distribution.distribute(
+            source_ids, available_by_source, samplers_by_source, self._reserve_for(available_by_source),
+            lead_ids, self._preferred_operators(lead_ids)
+        )
+    
+    def _new_contacts(
+        self,
+        items: List[Tuple[str, int, Optional[str]]],
+        leads: Dict[str, entities.Lead],
+        operator_ids: List[Optional[int]],
+        keys: Optional[List[str]]
+    ) -> List[entities.Contact]:
+        return [
+            entities.Contact(
+                lead_id=leads[external_id].id,
+                source_id=source_id,
+                operator_id=operator_id,
+                message=message,
+                dedupe_key=key
+            ) for (external_id, source_id, message), operator_id, key in zip(items, operator_ids, keys or [None] * len(items))
+        ]
+    
+    def _created(self, contacts: List[entities.Contact], operator_ids: List[Optional[int]]) -> None:
+        self._settle(operator_ids)
+        self._remember(contacts)
+    
+    def _preferred_operator(self, lead_id: int) -> Optional[int]:
+        if self.affinity is None:
+            return None
+        return self.affinity.get(lead_id)
+    
+    def _preferred_operators(self, lead_ids: List[int]) -> Optional[Dict[int, int]]:
+        if self.affinity is None:
+            return None
+        return self.affinity.get_many(lead_ids)
+    
+    def _remember(self, contacts: Iterable[entities.Contact]) -> None:
+        if self.affinity is not None:
+            self.affinity.remember(contacts)
+    
+    def _reserve_for(
+        self,
+        available_by_source: Dict[int, Dict[int, entities.OperatorCandidate]]
+    ) -> Callable[[entities.OperatorCandidate], bool]:
+        if self.load_tracker is None:
+            return distribution.local_reserve(available_by_source)
+        return lambda candidate: self.load_tracker.try_reserve(candidate.operator_id, candidate.max_active_leads)
+    
+    def _release(self, operator_ids: List[Optional[int]]) -> None:
+        if self.load_tracker is None:
+            return
+        for operator_id in operator_ids:
+            if operator_id is not None:
+                self.load_tracker.release(operator_id)
+    
+    def _settle(self, operator_ids: List[Optional[int]]) -> None:
+        if self.load_tracker is None:
+            return
+        for operator_id in operator_ids:
+            if operator_id is not None:
+                self.load_tracker.settle(operator_id)
+
+class LeadDistributionUseCase(BaseLeadDistributionUseCase):
     def __init__(
         self,
         lead_repo: repositories.LeadRepository,
         operator_repo: repositories.OperatorRepository,
         source_repo: repositories.SourceRepository,
         weight_repo: repositories.OperatorSourceWeightRepository,
-        contact_repo: repositories.ContactRepository
+        contact_repo: repositories.ContactRepository,
+        load_tracker: Optional[OperatorLoadTracker] = None,
+        samplers: Optional[SamplerRegistry] = None,
+        affinity: Optional[LeadAffinityIndex] = None,
+        dedupe: Optional[ContactDedupeIndex] = None
     ):
+        super().__init__(load_tracker, samplers, affinity, dedupe)
         self.lead_repo = lead_repo
         self.operator_repo = operator_repo
         self.source_repo = source_repo
         self.weight_repo = weight_repo
         self.contact_repo = contact_repo
     
-    def create_contact(self, lead_external_id: str, source_id: int, message: str = None) -> entities.Contact:
-        lead = self.lead_repo.get_by_external_id(lead_external_id)
-        if not lead:
-            lead = entities.Lead(external_id=lead_external_id)
-            lead = self.lead_repo.create(lead)
+    def create_contact(
+        self,
+        lead_external_id: str,
+        source_id: int,
+        message: str = None,
+        idempotency_key: Optional[str] = None
+    ) -> entities.Contact:
+        if self.dedupe is None:
+            return self._create_contact(lead_external_id, source_id, message)
+        key = dedupe_key(lead_external_id, source_id, message, idempotency_key)
+        with self.dedupe.claim(key):
+            with span("dedupe_lookup"):
+                original = self._find_duplicates([key]).get(key)
+            if original is not None:
+                return original
+            contact = self._create_contact(lead_external_id, source_id, message, key)
+            self.dedupe.remember([contact])
+        self._purge_dedupe_keys()
+        return contact
+    
+    def create_contacts(
+        self,
+        items: List[Tuple[str, int, Optional[str]]],
+        idempotency_keys: Optional[List[Optional[str]]] = None
+    ) -> List[entities.Contact]:
+        if self.dedupe is None:
+            return self._create_contacts(items)
+        keys = self._dedupe_keys(items, idempotency_keys)
+        with self.dedupe.claim_many(keys):
+            found = self._find_duplicates(keys)
+            fresh = self._fresh_items(keys, items, found)
+            if fresh:
+                self._remember_created(found, list(fresh), self._create_contacts(list(fresh.values()), list(fresh)))
+        self._purge_dedupe_keys()
+        return [found[key] for key in keys]
+    
+    def _create_contact(
+        self,
+        lead_external_id: str,
+        source_id: int,
+        message: Optional[str],
+        key: Optional[str] = None
+    ) -> entities.Contact:
+        with span("lead_upsert"):
+            lead = self.lead_repo.get_or_create(lead_external_id)
         
-        available_operators = self._get_available_operators(source_id)
-        operator_id = self._select_operator(available_operators, source_id)
+        with span("available_operators"):
+            available_operators = self._get_available_operators(source_id)
+        with span("select_operator"):
+            operator_id = self._select_operator(source_id, available_operators, self._preferred_operator(lead.id))
         
         contact = entities.Contact(
             lead_id=lead.id,
             source_id=source_id,
             operator_id=operator_id,
-            message=message
+            message=message,
+            dedupe_key=key
         )
-        return self.contact_repo.create(contact)
+        try:
+            with span("contact_commit"):
+                contact = self.contact_repo.create(contact)
+        except Exception:
+            self._release([operator_id])
+            raise
+        self._created([contact], [operator_id])
+        return contact
     
-    def _get_available_operators(self, source_id: int) -> List[entities.Operator]:
-        weights = self.weight_repo.get_weights_for_source(source_id)
-        operator_ids_with_weights = {w.operator_id for w in weights}
+    def _create_contacts(
+        self,
+        items: List[Tuple[str, int, Optional[str]]],
+        keys: Optional[List[str]] = None
+    ) -> List[entities.Contact]:
+        leads = self.lead_repo.get_by_external_ids(external_id for external_id, _, _ in items)
+        new_leads = distribution.collect_new_leads((external_id for external_id, _, _ in items), leads)
+        self.lead_repo.create_many(new_leads, commit=False)
         
-        active_operators = self.operator_repo.get_active_operators()
+        source_ids = [source_id for _, source_id, _ in items]
+        available_by_source = {source_id: self._get_available_operators(source_id) for source_id in set(source_ids)}
+        samplers_by_source = {
+            source_id: self._get_sampler(source_id)
+            for source_id, available in available_by_source.items() if available
+        }
+        operator_ids = self._distribute(
+            source_ids, available_by_source, samplers_by_source, [leads[external_id].id for external_id, _, _ in items]
+        )
+        
+        try:
+            contacts = self.contact_repo.create_many(self._new_contacts(items, leads, operator_ids, keys))
+        except Exception:
+            self._release(operator_ids)
+            raise
+        self._created(contacts, operator_ids)
+        return contacts
+    
+    def redistribute_unassigned(self, after_id: Optional[int], limit: int) -> Tuple[int, Optional[int]]:
+        contacts = self.contact_repo.get_unassigned_contacts(after_id, limit)
+        if not contacts:
+            return 0, None
         
-        available_operators = []
-        for operator in active_operators:
-            if operator.id in operator_ids_with_weights:
-                active_contacts = self.contact_repo.get_operator_active_contacts_count(operator.id)
-                if active_contacts < operator.max_active_leads:
-                    available_operators.append(operator)
+        source_ids = [contact.source_id for contact in contacts]
+        available_by_source = {source_id: self._get_available_operators(source_id) for source_id in set(source_ids)}
+        samplers_by_source = {
+            source_id: self._get_sampler(source_id)
+            for source_id, available in available_by_source.items() if available
+        }
+        if not samplers_by_source:
+            return 0, contacts[-1].id if len(contacts) == limit else None
+        operator_ids = self._distribute(
+            source_ids, available_by_source, samplers_by_source, [contact.lead_id for contact in contacts]
+        )
         
-        return available_operators
+        assignments = {
+            contact.id: operator_id
+            for contact, operator_id in zip(contacts, operator_ids) if operator_id is not None
+        }
+        try:
+            claimed = set(self.contact_repo.assign_operators(assignments)) if assignments else set()
+        except Exception:
+            self._release(operator_ids)
+            raise
+        self._release([operator_id for contact_id, operator_id in assignments.items() if contact_id not in claimed])
+        for contact in contacts:
+            if contact.id in claimed:
+                contact.operator_id = assignments[contact.id]
+        self._created(
+            [contact for contact in contacts if contact.id in claimed],
+            [operator_id for contact_id, operator_id in assignments.items() if contact_id in claimed]
+        )
+        return len(claimed), contacts[-1].id if len(contacts) == limit else None
+    
+    def _find_duplicates(self, keys: List[str]) -> Dict[str, entities.Contact]:
+        found, missing = self._indexed_duplicates(keys)
+        if missing:
+            return self._stored_duplicates(found, self.contact_repo.get_by_dedupe_keys(missing, self.dedupe.window_start()))
+        return found
+    
+    def _purge_dedupe_keys(self) -> None:
+        if self.dedupe.purge_due():
+            self.contact_repo.purge_dedupe_keys(self.dedupe.window_start())
+    
+    def _get_available_operators(self, source_id: int) -> Dict[int, entities.OperatorCandidate]:
+        return self._filter_by_load(self._operator_candidates(source_id))
+    
+    def _get_sampler(self, source_id: int) -> Optional[WeightedSampler]:
+        if self.samplers is None:
+            return None
+        version = self.weight_repo.get_weights_version(source_id)
+        sampler = self._cached_sampler(source_id, version)
+        if sampler is None:
+            sampler = self._build_sampler(source_id, version, self.weight_repo.get_weights_for_source(source_id))
+        return sampler
     
-    def _select_operator(self, available_operators: List[entities.Operator], source_id: int) -> Optional[int]:
+    def _select_operator(
+        self,
+        source_id: int,
+        available_operators: Dict[int, entities.OperatorCandidate],
+        preferred: Optional[int] = None
+    ) -> Optional[int]:
         if not available_operators:
             return None
-        
-        all_weights = self.weight_repo.get_weights_for_source(source_id)
-        available_operator_ids = {op.id for op in available_operators}
-        available_weights = [w for w in all_weights if w.operator_id in available_operator_ids]
-        
-        if not available_weights:
+        return self._reserve_operator(source_id, available_operators, self._get_sampler(source_id), preferred)
+
+class ContactStatusUseCase:
+    def __init__(
+        self,
+        contact_repo: repositories.ContactRepository,
+        load_tracker: Optional[OperatorLoadTracker] = None,
+        redistributor: Optional[RedistributionWorker] = None,
+        affinity: Optional[LeadAffinityIndex] = None
+    ):
+        self.contact_repo = contact_repo
+        self.load_tracker = load_tracker
+        self.redistributor = redistributor
+        self.affinity = affinity
+    
+    def update_status(self, contact_id: int, status: entities.ContactStatus) -> Optional[entities.Contact]:
+        contacts = self.update_statuses([contact_id], status)
+        return contacts[0] if contacts else None
+    
+    def update_statuses(self, contact_ids: List[int], status: entities.ContactStatus) -> Optional[List[entities.Contact]]:
+        contact_ids = list(dict.fromkeys(contact_ids))
+        found = self.contact_repo.get_by_ids(contact_ids)
+        if len(found) != len(contact_ids):
             return None
+        contacts = [found[contact_id] for contact_id in contact_ids]
         
-        weighted_operators = []
-        for weight in available_weights:
-            weighted_operators.extend([weight.operator_id] * weight.weight)
+        invalid = [contact.id for contact in contacts if status not in CONTACT_STATUS_TRANSITIONS[contact.status]]
+        if invalid:
+            raise ValueError(f"Cannot move contacts {invalid} to {status.value}")
+        closing = [
+            contact.operator_id for contact in contacts
+            if contact.operator_id is not None and contact.status in ACTIVE_CONTACT_STATUSES
+            and status not in ACTIVE_CONTACT_STATUSES
+        ]
+        self._begin_close(closing)
+        try:
+            updated = self.contact_repo.update_statuses(contacts, status)
+        except Exception:
+            self._end_close(closing, False)
+            raise
+        self._end_close(closing, updated)
+        if not updated:
+            raise ValueError("Contacts were changed concurrently")
         
-        return random.choice(weighted_operators)
+        for contact in contacts:
+            contact.status = status
+        if self.affinity is not None and status == entities.ContactStatus.CLOSED:
+            self.affinity.forget(contacts)
+        if self.redistributor is not None and status == entities.ContactStatus.CLOSED:
+            self.redistributor.trigger()
+        return contacts
+    
+    def _begin_close(self, operator_ids: List[int]) -> None:
+        if self.load_tracker is None:
+            return
+        for operator_id in operator_ids:
+            self.load_tracker.begin_close(operator_id)
+    
+    def _end_close(self, operator_ids: List[int], closed: bool) -> None:
+        if self.load_tracker is None:
+            return
+        for operator_id in operator_ids:
+            self.load_tracker.end_close(operator_id, closed)
 
 class OperatorManagementUseCase:
-    def __init__(self, operator_repo: repositories.OperatorRepository):
+    def __init__(
+        self,
+        operator_repo: repositories.OperatorRepository,
+        redistributor: Optional[RedistributionWorker] = None
+    ):
         self.operator_repo = operator_repo
+        self.redistributor = redistributor
     
     def create_operator(self, name: str, max_active_leads: int = 10) -> entities.Operator:
         operator = entities.Operator(
@@ -81,17 +442,135 @@ class OperatorManagementUseCase:
         operator = self.operator_repo.get_by_id(operator_id)
         if operator:
             operator.status = status
-            return self.operator_repo.update(operator)
+            operator = self.operator_repo.update(operator)
+            if self.redistributor is not None and status == entities.OperatorStatus.ACTIVE:
+                self.redistributor.trigger()
+            return operator
         return None
+    
+    def list_operators(self, after_id: Optional[int], limit: int) -> entities.Page:
+        return _page(self.operator_repo.list_operators(after_id, limit + 1), limit)
+
+class ContactQueryUseCase:
+    def __init__(
+        self,
+        contact_repo: repositories.ContactRepository,
+        lead_repo: repositories.LeadRepository
+    ):
+        self.contact_repo = contact_repo
+        self.lead_repo = lead_repo
+    
+    def list_contacts(self, filters: entities.ContactFilter, after_id: Optional[int], limit: int) -> entities.Page:
+        return _page(self.contact_repo.list_contacts(filters, after_id, limit + 1), limit)
+    
+    def export_contacts(self, filters: entities.ContactFilter) -> Iterator[entities.Contact]:
+        return self.contact_repo.iter_contacts(filters)
+    
+    def list_leads(self, after_id: Optional[int], limit: int) -> entities.Page:
+        return _page(self.lead_repo.list_leads(after_id, limit + 1), limit)
+    
+    def export_leads(self) -> Iterator[entities.Lead]:
+        return self.lead_repo.iter_leads()
+
+class ContactStatsUseCase:
+    def __init__(
+        self,
+        stats_repo: repositories.ContactStatsRepository,
+        operator_repo: repositories.OperatorRepository,
+        weight_repo: repositories.OperatorSourceWeightRepository
+    ):
+        self.stats_repo = stats_repo
+        self.operator_repo = operator_repo
+        self.weight_repo = weight_repo
+    
+    def hourly(self, filters: entities.ContactFilter) -> List[dict]:
+        hours: Dict = {}
+        for rollup in self.stats_repo.aggregate(filters, ("hour", "status", "assigned")):
+            row = hours.setdefault(rollup.hour, {
+                "hour": rollup.hour,
+                "total": 0,
+                "unassigned": 0,
+                **{status.value: 0 for status in entities.ContactStatus}
+            })
+            row["total"] += rollup.count
+            row[rollup.status.value] += rollup.count
+            if not rollup.assigned:
+                row["unassigned"] += rollup.count
+        return list(hours.values())
+    
+    def source_distribution(self, source_id: int, filters: entities.ContactFilter) -> dict:
+        filters.source_id = source_id
+        counts = {rollup.operator_id: rollup.count for rollup in self.stats_repo.aggregate(filters, ("operator_id",))}
+        weights = {w.operator_id: w.weight for w in self.weight_repo.get_weights_for_source(source_id) if w.weight > 0}
+        unassigned = counts.pop(None, 0)
+        assigned = sum(counts.values())
+        total_weight = sum(weights.values())
+        return {
+            "source_id": source_id,
+            "total": assigned + unassigned,
+            "unassigned": unassigned,
+            "unassigned_rate": unassigned / (assigned + unassigned) if assigned + unassigned else 0.0,
+            "operators": [
+                {
+                    "operator_id": operator_id,
+                    "contacts": counts.get(operator_id, 0),
+                    "share": counts.get(operator_id, 0) / assigned if assigned else 0.0,
+                    "weight": weights.get(operator_id, 0),
+                    "weight_share": weights.get(operator_id, 0) / total_weight if total_weight else 0.0
+                } for operator_id in sorted(counts.keys() | weights.keys())
+            ]
+        }
+    
+    def operator_load(self, filters: entities.ContactFilter) -> List[dict]:
+        active: Dict[int, int] = {}
+        for rollup in self.stats_repo.aggregate(entities.ContactFilter(), ("operator_id", "status")):
+            if rollup.operator_id is not None and rollup.status != entities.ContactStatus.CLOSED:
+                active[rollup.operator_id] = active.get(rollup.operator_id, 0) + rollup.count
+        counts = {rollup.operator_id: rollup.count for rollup in self.stats_repo.aggregate(filters, ("operator_id",))}
+        return [
+            {
+                "operator_id": operator.id,
+                "name": operator.name,
+                "status": operator.status.value,
+                "max_active_leads": operator.max_active_leads,
+                "active": active.get(operator.id, 0),
+                "load": active.get(operator.id, 0) / operator.max_active_leads if operator.max_active_leads else 0.0,
+                "contacts": counts.get(operator.id, 0)
+            } for operator in self._operators()
+        ]
+    
+    def _operators(self) -> List[entities.Operator]:
+        operators = []
+        after_id = None
+        while True:
+            page = self.operator_repo.list_operators(after_id, OPERATOR_PAGE_SIZE)
+            operators.extend(page)
+            if len(page) < OPERATOR_PAGE_SIZE:
+                return operators
+            after_id = page[-1].id
 
 class SourceManagementUseCase:
     def __init__(
         self,
         source_repo: repositories.SourceRepository,
-        weight_repo: repositories.OperatorSourceWeightRepository
+        weight_repo: repositories.OperatorSourceWeightRepository,
+        samplers: Optional[SamplerRegistry] = None,
+        redistributor: Optional[RedistributionWorker] = None
     ):
         self.source_repo = source_repo
         self.weight_repo = weight_repo
+        self.samplers = samplers
+        self.redistributor = redistributor
     
     def update_source_weights(self, source_id: int, weights: List[entities.OperatorSourceWeight]) -> List[entities.OperatorSourceWeight]:
-        return self.weight_repo.update_weights(source_id, weights)
\ No newline at end of file
+        updated_weights = self.weight_repo.update_weights(source_id, weights)
+        if self.samplers is not None:
+            version = self.weight_repo.get_weights_version(source_id)
+            self.samplers.build(
+                source_id,
+                ((w.operator_id, w.weight) for w in self.weight_repo.get_weights_for_source(source_id)),
+                version
+            )
+        if self.redistributor is not None:
+            self.redistributor.trigger()
+        return updated_weights
\ No newline at end of file
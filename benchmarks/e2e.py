@@ -0,0 +1,188 @@
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import time
+from benchmarks.common import percentile, write_report
+
+SEED_CHUNK_SIZE = 50000
+SEED_HISTORY_DAYS = 90
+
+def seed_database(
+    path: str, operators: int, sources: int, contacts: int, leads: int, capacity: int, seed_value: int,
+    history_days: float = SEED_HISTORY_DAYS
+) -> None:
+    from sqlalchemy import create_engine
+    from data.database import Base
+    import data.models  # noqa: F401
+    
+    if os.path.exists(path):
+        os.remove(path)
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+    
+    rng = random.Random(seed_value)
+    now = int(time.time())
+    history_seconds = int(history_days * 24 * 3600)
+    connection = sqlite3.connect(path)
+    with connection:
+        connection.executemany(
+            "INSERT INTO sources (id, name) VALUES (?, ?)",
+            [(source_id, f"source-{source_id}") for source_id in range(1, sources + 1)]
+        )
+        connection.executemany(
+            "INSERT INTO operators (id, name, status, max_active_leads) VALUES (?, ?, 'active', ?)",
+            [(operator_id, f"operator-{operator_id}", capacity) for operator_id in range(1, operators + 1)]
+        )
+        connection.executemany(
+            "INSERT INTO operator_source_weights (operator_id, source_id, weight) VALUES (?, ?, ?)",
+            [
+                (operator_id, source_id, rng.randint(1, 100))
+                for source_id in range(1, sources + 1)
+                for operator_id in range(1, operators + 1)
+            ]
+        )
+        for start in range(0, leads, SEED_CHUNK_SIZE):
+            connection.executemany(
+                "INSERT INTO leads (id, external_id) VALUES (?, ?)",
+                [(lead_id, f"lead-{lead_id}") for lead_id in range(start + 1, min(start + SEED_CHUNK_SIZE, leads) + 1)]
+            )
+        for start in range(0, contacts, SEED_CHUNK_SIZE):
+            connection.executemany(
+                "INSERT INTO contacts (lead_id, source_id, operator_id, status, created_at) VALUES (?, ?, ?, 'closed', ?)",
+                [
+                    (
+                        rng.randint(1, leads), rng.randint(1, sources), rng.randint(1, operators),
+                        time.strftime("%Y-%m-%d %H:%M:%S.000000", time.gmtime(now - rng.randint(0, history_seconds)))
+                    )
+                    for _ in range(start, min(start + SEED_CHUNK_SIZE, contacts))
+                ]
+            )
+    connection.close()
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+    
+    def attach(self, engine) -> None:
+        from sqlalchemy import event
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+    
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.count += 1
+
+async def drive(
+    app, requests: int, concurrency: int, sources: int, leads: int, returning_share: float, seed_value: int,
+    base_url: str = "http://bench"
+) -> dict:
+    import httpx
+    
+    rng = random.Random(seed_value)
+    payloads = []
+    for index in range(requests):
+        if rng.random() < returning_share:
+            external_id = f"lead-{rng.randint(1, leads)}"
+        else:
+            external_id = f"bench-{seed_value}-{index}"
+        payloads.append({"lead_external_id": external_id, "source_id": rng.randint(1, sources), "message": "bench"})
+    
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app) if app is not None else None
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=None) as client:
+        async def send(payload):
+            nonlocal errors
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post("/api/v1/contacts/", json=payload)
+                latencies.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    errors += 1
+        
+        started = time.perf_counter()
+        await asyncio.gather(*(send(payload) for payload in payloads))
+        elapsed = time.perf_counter() - started
+    
+    return {
+        "requests": requests,
+        "errors": errors,
+        "elapsed_s": elapsed,
+        "throughput_rps": requests / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000
+    }
+
+def capacity_violations(path: str) -> int:
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute(
+            "SELECT COUNT(*) FROM ("
+            " SELECT o.id FROM operators o JOIN contacts c ON c.operator_id = o.id"
+            " WHERE c.status IN ('new', 'in_progress')"
+            " GROUP BY o.id, o.max_active_leads HAVING COUNT(c.id) > o.max_active_leads)"
+        ).fetchone()[0]
+    finally:
+        connection.close()
+
+async def run(args) -> dict:
+    from main import app
+    from data.database import async_engine, engine
+    
+    if engine.url.database != os.path.abspath(args.database):
+        raise RuntimeError(f"The app is bound to {engine.url.database} instead of {args.database}, set CRM_DATABASE_URL before importing data")
+    counter = QueryCounter()
+    counter.attach(engine)
+    if async_engine is not None:
+        counter.attach(async_engine.sync_engine)
+    
+    await app.router.startup()
+    try:
+        counter.count = 0
+        result = await drive(app, args.requests, args.concurrency, args.sources, args.leads, args.returning_share, args.seed)
+        result["queries_per_request"] = counter.count / args.requests if args.requests else 0.0
+    finally:
+        await app.router.shutdown()
+    return result
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="End-to-end load test of POST /api/v1/contacts/")
+    parser.add_argument("--database", default="bench_leads.db")
+    parser.add_argument("--no-seed", action="store_true", help="reuse an already seeded database")
+    parser.add_argument("--operators", type=int, default=200)
+    parser.add_argument("--sources", type=int, default=5)
+    parser.add_argument("--contacts", type=int, default=1000000)
+    parser.add_argument("--leads", type=int, default=200000)
+    parser.add_argument("--capacity", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--returning-share", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args(argv)
+    
+    os.environ["CRM_DATABASE_URL"] = f"sqlite:///{os.path.abspath(args.database)}"
+    if not args.no_seed:
+        seed_database(args.database, args.operators, args.sources, args.contacts, args.leads, args.capacity, args.seed)
+    
+    results = []
+    for concurrency in args.concurrency:
+        run_args = argparse.Namespace(**vars(args))
+        run_args.concurrency = concurrency
+        run_args.seed = args.seed + concurrency
+        result = asyncio.run(run(run_args))
+        result.update({
+            "concurrency": concurrency,
+            "operators": args.operators,
+            "seeded_contacts": args.contacts,
+            "async_mode": os.environ.get("CRM_ASYNC_MODE", "0"),
+            "capacity_violations": capacity_violations(args.database)
+        })
+        results.append(result)
+    write_report("e2e", results, args.output)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
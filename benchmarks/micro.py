@@ -0,0 +1,88 @@
+import argparse
+import itertools
+import random
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.load_tracker import OperatorLoadTracker
+from app.sampler import SamplerRegistry
+from app.use_cases import LeadDistributionUseCase
+from data import models
+from data.cache import CachedOperatorSourceWeightRepository, SourceWeightCache
+from data.database import Base
+from data.repository import SQLContactRepository, SQLLeadRepository, SQLOperatorRepository, SQLOperatorSourceWeightRepository, SQLSourceRepository
+from benchmarks.common import measure, write_report
+
+SOURCE_ID = 1
+OPERATOR_COUNTS = [10, 100, 1000, 10000]
+WEIGHT_MAGNITUDES = [1, 100, 10000]
+MODES = ["tracked", "sql"]
+
+def seed(session, operators: int, weight_magnitude: int, rng: random.Random) -> None:
+    session.execute(insert(models.SourceModel), [{"id": SOURCE_ID, "name": "bench"}])
+    session.execute(insert(models.OperatorModel), [
+        {"id": operator_id, "name": f"operator-{operator_id}", "status": "active", "max_active_leads": 10 ** 9}
+        for operator_id in range(1, operators + 1)
+    ])
+    session.execute(insert(models.OperatorSourceWeightModel), [
+        {"operator_id": operator_id, "source_id": SOURCE_ID, "weight": rng.randint(1, weight_magnitude)}
+        for operator_id in range(1, operators + 1)
+    ])
+    session.commit()
+
+def build_use_case(session, mode: str) -> LeadDistributionUseCase:
+    weight_repo = SQLOperatorSourceWeightRepository(session)
+    load_tracker = None
+    if mode == "tracked":
+        weight_repo = CachedOperatorSourceWeightRepository(weight_repo, SourceWeightCache())
+        contact_repo = SQLContactRepository(session)
+        load_tracker = OperatorLoadTracker(contact_repo.get_active_contacts_counts, reconcile_interval=0)
+        load_tracker.start()
+    return LeadDistributionUseCase(
+        lead_repo=SQLLeadRepository(session),
+        operator_repo=SQLOperatorRepository(session),
+        source_repo=SQLSourceRepository(session),
+        weight_repo=weight_repo,
+        contact_repo=SQLContactRepository(session),
+        load_tracker=load_tracker,
+        samplers=SamplerRegistry()
+    )
+
+def run_case(operators: int, weight_magnitude: int, mode: str, iterations: int, seed_value: int) -> list:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autoflush=False, bind=engine)()
+    try:
+        seed(session, operators, weight_magnitude, random.Random(seed_value))
+        use_case = build_use_case(session, mode)
+        available = use_case._get_available_operators(SOURCE_ID)
+        case = {"operators": operators, "weight_magnitude": weight_magnitude, "mode": mode}
+        return [
+            dict(case, target="_get_available_operators", **measure(
+                lambda: use_case._get_available_operators(SOURCE_ID), iterations
+            )),
+            dict(case, target="_select_operator", **measure(
+                lambda: use_case._select_operator(SOURCE_ID, available), iterations
+            ))
+        ]
+    finally:
+        session.close()
+        engine.dispose()
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Microbenchmarks of LeadDistributionUseCase selection steps")
+    parser.add_argument("--operators", type=int, nargs="+", default=OPERATOR_COUNTS)
+    parser.add_argument("--weights", type=int, nargs="+", default=WEIGHT_MAGNITUDES)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=MODES)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args(argv)
+    
+    results = []
+    for operators, weight_magnitude, mode in itertools.product(args.operators, args.weights, args.modes):
+        results.extend(run_case(operators, weight_magnitude, mode, args.iterations, args.seed))
+    write_report("micro", results, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import argparse
+import itertools
+import tracemalloc
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from core import entities
+from data import core_repository, models, repository
+from data.database import Base
+from benchmarks.common import measure, write_report
+
+SOURCE_ID = 1
+IMPLEMENTATIONS = {
+    "orm": (
+        repository.SQLLeadRepository, repository.SQLOperatorRepository,
+        repository.SQLOperatorSourceWeightRepository, repository.SQLContactRepository
+    ),
+    "core": (
+        core_repository.CoreSQLLeadRepository, core_repository.CoreSQLOperatorRepository,
+        core_repository.CoreSQLOperatorSourceWeightRepository, core_repository.CoreSQLContactRepository
+    )
+}
+
+def seed(session, operators: int, leads: int) -> None:
+    session.execute(insert(models.SourceModel), [{"id": SOURCE_ID, "name": "bench"}])
+    session.execute(insert(models.OperatorModel), [
+        {"id": operator_id, "name": f"operator-{operator_id}", "status": "active", "max_active_leads": 10 ** 9}
+        for operator_id in range(1, operators + 1)
+    ])
+    session.execute(insert(models.OperatorSourceWeightModel), [
+        {"operator_id": operator_id, "source_id": SOURCE_ID, "weight": operator_id}
+        for operator_id in range(1, operators + 1)
+    ])
+    session.execute(insert(models.LeadModel), [
+        {"id": lead_id, "external_id": f"lead-{lead_id}"} for lead_id in range(1, leads + 1)
+    ])
+    session.execute(insert(models.ContactModel), [
+        {"lead_id": lead_id, "source_id": SOURCE_ID, "operator_id": lead_id % operators + 1, "status": "new"}
+        for lead_id in range(1, leads + 1)
+    ])
+    session.commit()
+
+def peak_allocation(fn, iterations: int) -> float:
+    fn()
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(iterations):
+            baseline = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            fn()
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    finally:
+        tracemalloc.stop()
+    return sum(peaks) / len(peaks) / 1024
+
+def weight_updates(operators: int):
+    weights = [entities.OperatorSourceWeight(operator_id=operator_id, weight=operator_id) for operator_id in range(1, operators + 1)]
+    changed = [
+        entities.OperatorSourceWeight(operator_id=weight.operator_id, weight=weight.weight + 1)
+        if weight.operator_id % 100 == 0 else weight for weight in weights[:-max(operators // 100, 1)]
+    ]
+    return itertools.cycle([changed, weights])
+
+def targets(session, implementation: str, operators: int) -> dict:
+    lead_class, operator_class, weight_class, contact_class = IMPLEMENTATIONS[implementation]
+    lead_repo = lead_class(session)
+    operator_repo = operator_class(session)
+    weight_repo = weight_class(session)
+    contact_repo = contact_class(session)
+    updates = weight_updates(operators)
+    return {
+        "lead.get_by_external_id": lambda: lead_repo.get_by_external_id("lead-1"),
+        "lead.get_or_create": lambda: lead_repo.get_or_create("lead-2"),
+        "operator.get_by_id": lambda: operator_repo.get_by_id(1),
+        "weight.get_source_operators": lambda: weight_repo.get_source_operators(SOURCE_ID),
+        "weight.get_weights_version": lambda: weight_repo.get_weights_version(SOURCE_ID),
+        "weight.update_weights": lambda: weight_repo.update_weights(SOURCE_ID, next(updates)),
+        "contact.get_contacts_by_lead": lambda: contact_repo.get_contacts_by_lead(1),
+        "contact.create": lambda: contact_repo.create(entities.Contact(lead_id=1, source_id=SOURCE_ID, operator_id=1))
+    }
+
+def run_case(implementation: str, operators: int, leads: int, iterations: int) -> list:
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autoflush=False, bind=engine)()
+    try:
+        seed(session, operators, leads)
+        case = {"implementation": implementation, "operators": operators, "leads": leads}
+        return [
+            dict(case, target=name, peak_kib=peak_allocation(fn, iterations), **measure(fn, iterations))
+            for name, fn in targets(session, implementation, operators).items()
+        ]
+    finally:
+        session.close()
+        engine.dispose()
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Per-call cost of the ORM and Core repository implementations")
+    parser.add_argument("--implementations", nargs="+", choices=list(IMPLEMENTATIONS), default=list(IMPLEMENTATIONS))
+    parser.add_argument("--operators", type=int, default=100)
+    parser.add_argument("--leads", type=int, default=10000)
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args(argv)
+    
+    results = []
+    for implementation in args.implementations:
+        results.extend(run_case(implementation, args.operators, args.leads, args.iterations))
+    write_report("repositories", results, args.output)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
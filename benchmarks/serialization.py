@@ -0,0 +1,111 @@
+import argparse
+import asyncio
+import datetime
+import time
+from typing import List
+from fastapi import FastAPI
+from fastapi.responses import Response
+from app import dtos
+from api.responses import json_response
+from core import entities
+from benchmarks.common import percentile, write_report
+
+def contacts(count: int) -> list:
+    created_at = datetime.datetime(2024, 1, 1, 12, 30, 15, 123456)
+    return [
+        entities.Contact(
+            id=contact_id, lead_id=contact_id, source_id=1, operator_id=contact_id % 50 + 1,
+            message="Здравствуйте, хочу узнать условия", status=entities.ContactStatus.NEW, created_at=created_at
+        ) for contact_id in range(1, count + 1)
+    ]
+
+def build_app(count: int):
+    items = contacts(count)
+    app = FastAPI()
+    
+    @app.get("/baseline")
+    def baseline():
+        return Response(b"{}", media_type="application/json")
+    
+    if count == 1:
+        @app.get("/validated", response_model=dtos.ContactResponse)
+        def validated_contact():
+            return dtos.ContactResponse.from_entity(items[0])
+        
+        @app.get("/fast", response_model=dtos.ContactResponse)
+        def fast_contact():
+            return json_response(dtos.ContactResponse.row(items[0]))
+    else:
+        @app.get("/validated", response_model=dtos.ContactPage)
+        def validated_page():
+            return dtos.ContactPage(
+                items=[dtos.ContactResponse.from_entity(contact) for contact in items], next_cursor=items[-1].id
+            )
+        
+        @app.get("/fast", response_model=dtos.ContactPage)
+        def fast_page():
+            return json_response({
+                "items": [dtos.ContactResponse.row(contact) for contact in items], "next_cursor": items[-1].id
+            })
+    
+    return app
+
+async def call(app, path: str) -> None:
+    scope = {
+        "type": "http", "http_version": "1.1", "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": b"", "headers": [], "server": ("bench", 80), "client": ("bench", 1)
+    }
+    
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+    
+    async def send(message):
+        if message["type"] == "http.response.start" and message["status"] != 200:
+            raise RuntimeError(f"{path} answered {message['status']}")
+    
+    await app(scope, receive, send)
+
+async def measure_paths(app, paths: List[str], iterations: int) -> dict:
+    samples = {path: [] for path in paths}
+    for path in paths:
+        await call(app, path)
+    for _ in range(iterations):
+        for path in paths:
+            started = time.perf_counter()
+            await call(app, path)
+            samples[path].append(time.perf_counter() - started)
+    return samples
+
+def run_case(count: int, iterations: int) -> list:
+    app = build_app(count)
+    paths = ["/baseline", "/validated", "/fast"]
+    samples = asyncio.run(measure_paths(app, paths, iterations))
+    baseline = percentile(samples["/baseline"], 0.50)
+    results = []
+    for path in paths[1:]:
+        p50 = percentile(samples[path], 0.50)
+        results.append({
+            "mode": path[1:],
+            "payload": "contact" if count == 1 else "page",
+            "items": count,
+            "iterations": iterations,
+            "p50_us": p50 * 1e6,
+            "p95_us": percentile(samples[path], 0.95) * 1e6,
+            "serialization_p50_us": (p50 - baseline) * 1e6
+        })
+    return results
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Per-request response serialization cost: validated response_model against direct bytes")
+    parser.add_argument("--items", type=int, nargs="+", default=[1, 50, 1000], help="1 for a single contact, otherwise contacts per page")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args(argv)
+    
+    results = []
+    for count in args.items:
+        results.extend(run_case(count, args.iterations))
+    write_report("serialization", results, args.output)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,112 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from benchmarks.common import write_report
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PHASES = ("import_s", "create_app_s", "startup_s", "first_request_s", "total_s")
+
+async def _first_request(app) -> None:
+    import httpx
+    
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        response = await client.get("/api/v1/operators/")
+        response.raise_for_status()
+
+def probe() -> dict:
+    import httpx
+    
+    started = time.perf_counter()
+    import main
+    imported = time.perf_counter()
+    app = main.create_app()
+    created = time.perf_counter()
+    
+    async def serve_first_request():
+        await app.router.startup()
+        started_up = time.perf_counter()
+        try:
+            await _first_request(app)
+        finally:
+            answered = time.perf_counter()
+            await app.router.shutdown()
+        return started_up, answered
+    
+    started_up, answered = asyncio.run(serve_first_request())
+    return {
+        "import_s": imported - started,
+        "create_app_s": created - imported,
+        "startup_s": started_up - created,
+        "first_request_s": answered - started_up,
+        "total_s": answered - started
+    }
+
+def environment(database: str, create_schema: bool) -> dict:
+    return dict(
+        os.environ,
+        CRM_DATABASE_URL=f"sqlite:///{os.path.abspath(database)}",
+        CRM_CREATE_SCHEMA="true" if create_schema else "false",
+        CRM_REDISTRIBUTION="false"
+    )
+
+def run_probe(database: str, create_schema: bool) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--probe"],
+        cwd=ROOT, env=environment(database, create_schema), capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+def time_to_first_response(database: str, create_schema: bool, port: int) -> float:
+    from benchmarks.workers import wait_ready
+    
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:create_app", "--factory", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=environment(database, create_schema)
+    )
+    try:
+        wait_ready(port)
+        return time.perf_counter() - started
+    finally:
+        server.terminate()
+        server.wait()
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Cold import, app construction and time to first request of a worker")
+    parser.add_argument("--database", default="bench_startup.db")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--no-uvicorn", action="store_true", help="skip the uvicorn process start measurement")
+    parser.add_argument("--probe", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args(argv)
+    
+    if args.probe:
+        sys.stdout.write(json.dumps(probe()) + "\n")
+        return
+    
+    if os.path.exists(args.database):
+        os.remove(args.database)
+    run_probe(args.database, create_schema=True)
+    results = []
+    for create_schema in (True, False):
+        samples = [run_probe(args.database, create_schema) for _ in range(args.runs)]
+        result = {"create_schema": create_schema, "runs": args.runs}
+        for phase in PHASES:
+            values = [sample[phase] for sample in samples]
+            result[f"{phase[:-2]}_median_ms"] = statistics.median(values) * 1000
+            result[f"{phase[:-2]}_max_ms"] = max(values) * 1000
+        if not args.no_uvicorn:
+            result["uvicorn_first_response_median_ms"] = statistics.median(
+                time_to_first_response(args.database, create_schema, args.port) for _ in range(args.runs)
+            ) * 1000
+        results.append(result)
+    write_report("startup", results, args.output)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,76 @@
+import argparse
+import datetime
+import time
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+from app.use_cases import ContactStatsUseCase
+from core import entities
+from data import models
+from data.migrations import migrate
+from data.repository import SQLContactStatsRepository, SQLOperatorRepository, SQLOperatorSourceWeightRepository
+from benchmarks.common import measure, write_report
+from benchmarks.e2e import seed_database
+
+def scan_hourly(session, created_from: datetime.datetime):
+    hour = func.strftime("%Y-%m-%d %H:00:00", models.ContactModel.created_at)
+    return session.execute(
+        select(hour, models.ContactModel.status, func.count(models.ContactModel.id)).where(
+            models.ContactModel.created_at >= created_from
+        ).group_by(hour, models.ContactModel.status)
+    ).all()
+
+def scan_operator_load(session):
+    return session.execute(
+        select(models.ContactModel.operator_id, func.count(models.ContactModel.id)).where(
+            models.ContactModel.status.in_([entities.ContactStatus.NEW.value, entities.ContactStatus.IN_PROGRESS.value])
+        ).group_by(models.ContactModel.operator_id)
+    ).all()
+
+def run_case(path: str, contacts: int, args) -> list:
+    history_days = contacts / args.contacts_per_day
+    seed_database(path, args.operators, args.sources, contacts, args.leads, args.capacity, args.seed, history_days)
+    engine = create_engine(f"sqlite:///{path}")
+    started = time.perf_counter()
+    migrate(bind=engine)
+    backfill_s = time.perf_counter() - started
+    session = sessionmaker(autoflush=False, bind=engine)()
+    try:
+        use_case = ContactStatsUseCase(
+            SQLContactStatsRepository(session), SQLOperatorRepository(session), SQLOperatorSourceWeightRepository(session)
+        )
+        day_ago = datetime.datetime.utcnow() - datetime.timedelta(days=1)
+        week_ago = datetime.datetime.utcnow() - datetime.timedelta(days=7)
+        targets = {
+            "rollup.hourly_24h": lambda: use_case.hourly(entities.ContactFilter(created_from=day_ago)),
+            "rollup.source_7d": lambda: use_case.source_distribution(1, entities.ContactFilter(created_from=week_ago)),
+            "rollup.operator_load": lambda: use_case.operator_load(entities.ContactFilter(created_from=day_ago)),
+            "scan.hourly_24h": lambda: scan_hourly(session, day_ago),
+            "scan.operator_load": lambda: scan_operator_load(session)
+        }
+        case = {"contacts": contacts, "history_days": history_days, "backfill_s": backfill_s}
+        return [dict(case, target=name, **measure(fn, args.iterations)) for name, fn in targets.items()]
+    finally:
+        session.close()
+        engine.dispose()
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Stats endpoints over contact rollups against GROUP BY over contacts")
+    parser.add_argument("--database", default="bench_stats.db")
+    parser.add_argument("--contacts", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--contacts-per-day", type=int, default=10000, help="seeded traffic density, history grows with --contacts")
+    parser.add_argument("--operators", type=int, default=200)
+    parser.add_argument("--sources", type=int, default=5)
+    parser.add_argument("--leads", type=int, default=50000)
+    parser.add_argument("--capacity", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args(argv)
+    
+    results = []
+    for contacts in args.contacts:
+        results.extend(run_case(args.database, contacts, args))
+    write_report("stats", results, args.output)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
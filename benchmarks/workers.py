@@ -0,0 +1,88 @@
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+from benchmarks.common import write_report
+from benchmarks.e2e import capacity_violations, drive, seed_database
+from shared_state import unlink_segments
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def serve(database: str, workers: int, port: int, shared_state: str, segment_prefix: str) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        CRM_DATABASE_URL=f"sqlite:///{os.path.abspath(database)}",
+        CRM_SHARED_STATE=shared_state,
+        CRM_SHARED_STATE_NAME=segment_prefix,
+        CRM_DB_SQLITE_WAL="true",
+        CRM_REDISTRIBUTION="false"
+    )
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "main:create_app", "--factory", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning"
+        ],
+        cwd=ROOT, env=env
+    )
+
+def wait_ready(port: int, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=1).close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.2)
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Throughput of POST /api/v1/contacts/ across uvicorn worker counts")
+    parser.add_argument("--database", default="bench_leads.db")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--shared-state", choices=["local", "shared_memory"], default="shared_memory")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--operators", type=int, default=200)
+    parser.add_argument("--sources", type=int, default=5)
+    parser.add_argument("--contacts", type=int, default=100000)
+    parser.add_argument("--leads", type=int, default=50000)
+    parser.add_argument("--capacity", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--returning-share", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args(argv)
+    
+    segment_prefix = f"crm_bench_{os.getpid()}"
+    results = []
+    for workers in args.workers:
+        seed_database(args.database, args.operators, args.sources, args.contacts, args.leads, args.capacity, args.seed)
+        server = serve(args.database, workers, args.port, args.shared_state, segment_prefix)
+        try:
+            wait_ready(args.port)
+            result = asyncio.run(drive(
+                None, args.requests, args.concurrency, args.sources, args.leads, args.returning_share, args.seed,
+                base_url=f"http://127.0.0.1:{args.port}"
+            ))
+        finally:
+            server.terminate()
+            server.wait()
+            unlink_segments(segment_prefix)
+        result.update({
+            "workers": workers,
+            "shared_state": args.shared_state,
+            "concurrency": args.concurrency,
+            "capacity_violations": capacity_violations(args.database)
+        })
+        results.append(result)
+    baseline = results[0]["throughput_rps"] if results else 0.0
+    for result in results:
+        result["speedup"] = result["throughput_rps"] / baseline if baseline else 0.0
+    write_report("workers", results, args.output)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,76 @@
+import os
+from dataclasses import dataclass, fields
+
+def _parse(value: str, default):
+    if isinstance(default, bool):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    if isinstance(default, int):
+        return int(value)
+    if isinstance(default, float):
+        return float(value)
+    return value
+
+@dataclass
+class Settings:
+    database_url: str = "sqlite:///./leads.db"
+    async_database_url: str = ""
+    async_mode: bool = False
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30.0
+    db_pool_recycle: int = -1
+    db_pool_pre_ping: bool = True
+    db_sqlite_static_pool: bool = False
+    db_sqlite_wal: bool = False
+    db_sqlite_performance: bool = False
+    db_sqlite_mmap_size: int = 268435456
+    db_sqlite_cache_size: int = -65536
+    create_schema: bool = True
+    metrics: bool = True
+    slow_request_threshold_ms: float = 0.0
+    load_tracking: bool = True
+    load_reconcile_interval: float = 60.0
+    fast_repositories: bool = True
+    lead_cache_size: int = 100000
+    weight_cache: bool = True
+    weight_cache_ttl: float = 30.0
+    weight_cache_max_sources: int = 1024
+    shared_state: str = "local"
+    shared_state_name: str = "crm"
+    shared_state_slots: int = 65536
+    write_behind: bool = False
+    write_behind_durability: str = "journal"
+    write_behind_journal: str = "./contacts.journal"
+    write_behind_flush_ms: float = 50.0
+    write_behind_batch_size: int = 500
+    write_behind_max_pending: int = 100000
+    lead_affinity: bool = False
+    lead_affinity_ttl: float = 86400.0
+    lead_affinity_max_size: int = 100000
+    contact_dedupe: bool = False
+    contact_dedupe_window: float = 600.0
+    contact_dedupe_max_size: int = 100000
+    redistribution: bool = True
+    redistribution_interval: float = 30.0
+    redistribution_batch_size: int = 500
+    
+    def get_async_database_url(self) -> str:
+        if self.async_database_url:
+            return self.async_database_url
+        return self.database_url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    
+    @classmethod
+    def from_env(cls, prefix: str = "CRM_") -> "Settings":
+        settings = cls()
+        for field in fields(cls):
+            value = os.environ.get(prefix + field.name.upper())
+            if value is not None:
+                setattr(settings, field.name, _parse(value, getattr(settings, field.name)))
+        return settings
+
+settings = Settings.from_env()
+
+def configure(new_settings: Settings) -> Settings:
+    for field in fields(Settings):
+        setattr(settings, field.name, getattr(new_settings, field.name))
+    return settings
\ No newline at end of file
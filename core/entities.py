@@ -1,6 +1,6 @@
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Any
 from enum import Enum
 
 class OperatorStatus(Enum):
@@ -12,7 +12,7 @@ class ContactStatus(Enum):
     IN_PROGRESS = "in_progress"
     CLOSED = "closed"
 
-@dataclass
+@dataclass(slots=True)
 class Lead:
     id: Optional[int] = None
     external_id: str = None
@@ -20,7 +20,7 @@ class Lead:
     phone: Optional[str] = None
     created_at: Optional[datetime] = None
 
-@dataclass
+@dataclass(slots=True)
 class Operator:
     id: Optional[int] = None
     name: str = None
@@ -28,14 +28,14 @@ class Operator:
     max_active_leads: int = 10
     created_at: Optional[datetime] = None
 
-@dataclass
+@dataclass(slots=True)
 class Source:
     id: Optional[int] = None
     name: str = None
     description: Optional[str] = None
     created_at: Optional[datetime] = None
 
-@dataclass
+@dataclass(slots=True)
 class OperatorSourceWeight:
     id: Optional[int] = None
     operator_id: int = None
@@ -43,7 +43,14 @@ class OperatorSourceWeight:
     weight: int = 1
     created_at: Optional[datetime] = None
 
-@dataclass
+@dataclass(slots=True)
+class OperatorCandidate:
+    operator_id: int = None
+    weight: int = 1
+    active_count: int = 0
+    max_active_leads: int = 10
+
+@dataclass(slots=True)
 class Contact:
     id: Optional[int] = None
     lead_id: int = None
@@ -51,4 +58,27 @@ class Contact:
     operator_id: Optional[int] = None
     message: Optional[str] = None
     status: ContactStatus = ContactStatus.NEW
-    created_at: Optional[datetime] = None
\ No newline at end of file
+    created_at: Optional[datetime] = None
+    dedupe_key: Optional[str] = None
+
+@dataclass(slots=True)
+class ContactFilter:
+    operator_id: Optional[int] = None
+    source_id: Optional[int] = None
+    status: Optional[ContactStatus] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+
+@dataclass(slots=True)
+class ContactRollup:
+    hour: Optional[datetime] = None
+    source_id: Optional[int] = None
+    operator_id: Optional[int] = None
+    status: Optional[ContactStatus] = None
+    assigned: Optional[bool] = None
+    count: int = 0
+
+@dataclass(slots=True)
+class Page:
+    items: List[Any]
+    next_cursor: Optional[int] = None
\ No newline at end of file
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional
 from .entities import *
 
 class LeadRepository(ABC):
@@ -10,6 +10,26 @@ class LeadRepository(ABC):
     @abstractmethod
     def create(self, lead: Lead) -> Lead:
         pass
+    
+    @abstractmethod
+    def get_by_external_ids(self, external_ids: Iterable[str]) -> Dict[str, Lead]:
+        pass
+    
+    @abstractmethod
+    def create_many(self, leads: List[Lead], commit: bool = True) -> List[Lead]:
+        pass
+    
+    @abstractmethod
+    def get_or_create(self, external_id: str) -> Lead:
+        pass
+    
+    @abstractmethod
+    def list_leads(self, after_id: Optional[int], limit: int) -> List[Lead]:
+        pass
+    
+    @abstractmethod
+    def iter_leads(self, batch_size: int = 1000) -> Iterator[Lead]:
+        pass
 
 class OperatorRepository(ABC):
     @abstractmethod
@@ -23,6 +43,10 @@ class OperatorRepository(ABC):
     @abstractmethod
     def update(self, operator: Operator) -> Operator:
         pass
+    
+    @abstractmethod
+    def list_operators(self, after_id: Optional[int], limit: int) -> List[Operator]:
+        pass
 
 class SourceRepository(ABC):
     @abstractmethod
@@ -41,16 +65,132 @@ class OperatorSourceWeightRepository(ABC):
     @abstractmethod
     def update_weights(self, source_id: int, weights: List[OperatorSourceWeight]) -> List[OperatorSourceWeight]:
         pass
+    
+    @abstractmethod
+    def get_available_operators(self, source_id: int) -> List[OperatorCandidate]:
+        pass
+    
+    @abstractmethod
+    def get_source_operators(self, source_id: int) -> List[OperatorCandidate]:
+        pass
+    
+    @abstractmethod
+    def get_weights_version(self, source_id: int) -> int:
+        pass
 
 class ContactRepository(ABC):
     @abstractmethod
     def create(self, contact: Contact) -> Contact:
         pass
     
+    @abstractmethod
+    def create_many(self, contacts: List[Contact], commit: bool = True) -> List[Contact]:
+        pass
+    
     @abstractmethod
     def get_operator_active_contacts_count(self, operator_id: int) -> int:
         pass
     
+    @abstractmethod
+    def get_active_contacts_counts(self) -> Dict[int, int]:
+        pass
+    
     @abstractmethod
     def get_contacts_by_lead(self, lead_id: int) -> List[Contact]:
+        pass
+    
+    @abstractmethod
+    def list_contacts(self, filters: ContactFilter, after_id: Optional[int], limit: int) -> List[Contact]:
+        pass
+    
+    @abstractmethod
+    def iter_contacts(self, filters: ContactFilter, batch_size: int = 1000) -> Iterator[Contact]:
+        pass
+    
+    @abstractmethod
+    def get_by_ids(self, contact_ids: Iterable[int]) -> Dict[int, Contact]:
+        pass
+    
+    @abstractmethod
+    def get_by_dedupe_keys(self, dedupe_keys: Iterable[str], created_from: datetime) -> Dict[str, Contact]:
+        pass
+    
+    @abstractmethod
+    def purge_dedupe_keys(self, created_before: datetime) -> int:
+        pass
+    
+    @abstractmethod
+    def update_statuses(self, contacts: List[Contact], status: ContactStatus) -> bool:
+        pass
+    
+    @abstractmethod
+    def count_unassigned(self) -> int:
+        pass
+    
+    @abstractmethod
+    def get_unassigned_contacts(self, after_id: Optional[int], limit: int) -> List[Contact]:
+        pass
+    
+    @abstractmethod
+    def assign_operators(self, assignments: Dict[int, int]) -> List[int]:
+        pass
+
+class ContactStatsRepository(ABC):
+    @abstractmethod
+    def aggregate(self, filters: ContactFilter, group_by: Iterable[str]) -> List[ContactRollup]:
+        pass
+
+class AsyncLeadRepository(ABC):
+    @abstractmethod
+    async def get_by_external_id(self, external_id: str) -> Optional[Lead]:
+        pass
+    
+    @abstractmethod
+    async def create(self, lead: Lead) -> Lead:
+        pass
+    
+    @abstractmethod
+    async def get_by_external_ids(self, external_ids: Iterable[str]) -> Dict[str, Lead]:
+        pass
+    
+    @abstractmethod
+    async def create_many(self, leads: List[Lead], commit: bool = True) -> List[Lead]:
+        pass
+    
+    @abstractmethod
+    async def get_or_create(self, external_id: str) -> Lead:
+        pass
+
+class AsyncOperatorSourceWeightRepository(ABC):
+    @abstractmethod
+    async def get_weights_for_source(self, source_id: int) -> List[OperatorSourceWeight]:
+        pass
+    
+    @abstractmethod
+    async def get_available_operators(self, source_id: int) -> List[OperatorCandidate]:
+        pass
+    
+    @abstractmethod
+    async def get_source_operators(self, source_id: int) -> List[OperatorCandidate]:
+        pass
+    
+    @abstractmethod
+    async def get_weights_version(self, source_id: int) -> int:
+        pass
+
+class AsyncContactRepository(ABC):
+    @abstractmethod
+    async def create(self, contact: Contact) -> Contact:
+        pass
+    
+    @abstractmethod
+    async def create_many(self, contacts: List[Contact], commit: bool = True) -> List[Contact]:
+        pass
+    
+    @abstractmethod
+    async def get_by_dedupe_keys(self, dedupe_keys: Iterable[str], created_from: datetime) -> Dict[str, Contact]:
+        pass
+    
+    @abstractmethod
+    async def purge_dedupe_keys(self, created_before: datetime) -> int:
         pass
\ No newline at end of file
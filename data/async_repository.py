@@ -0,0 +1,182 @@
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from core import entities, repositories
+from . import models
+from .repository import (
+    AVAILABLE_OPERATORS, SOURCE_OPERATORS, _chunks, _deduped_contact, count_rollups, dedupe_purge, dedupe_query, dedupe_writes,
+    lead_upsert_statement, rollup_writes
+)
+
+def _lead_entity(db_lead: models.LeadModel) -> entities.Lead:
+    return entities.Lead(
+        id=db_lead.id,
+        external_id=db_lead.external_id,
+        email=db_lead.email,
+        phone=db_lead.phone,
+        created_at=db_lead.created_at
+    )
+
+class AsyncSQLLeadRepository(repositories.AsyncLeadRepository):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def get_by_external_id(self, external_id: str) -> entities.Lead:
+        db_lead = (await self.db.execute(
+            select(models.LeadModel).where(models.LeadModel.external_id == external_id)
+        )).scalars().first()
+        if db_lead:
+            return _lead_entity(db_lead)
+        return None
+    
+    async def create(self, lead: entities.Lead) -> entities.Lead:
+        db_lead = models.LeadModel(
+            external_id=lead.external_id,
+            email=lead.email,
+            phone=lead.phone
+        )
+        self.db.add(db_lead)
+        await self.db.commit()
+        lead.id = db_lead.id
+        lead.created_at = db_lead.created_at
+        return lead
+    
+    async def get_by_external_ids(self, external_ids) -> dict[str, entities.Lead]:
+        leads = {}
+        for chunk in _chunks(list(set(external_ids))):
+            db_leads = (await self.db.execute(
+                select(models.LeadModel).where(models.LeadModel.external_id.in_(chunk))
+            )).scalars()
+            for db_lead in db_leads:
+                leads[db_lead.external_id] = _lead_entity(db_lead)
+        return leads
+    
+    async def create_many(self, leads: list[entities.Lead], commit: bool = True) -> list[entities.Lead]:
+        if not leads:
+            return leads
+        rows = (await self.db.execute(
+            lead_upsert_statement(self.db.bind.dialect.name),
+            [{"external_id": lead.external_id, "email": lead.email, "phone": lead.phone} for lead in leads]
+        )).all()
+        inserted = {external_id: (lead_id, created_at) for lead_id, external_id, created_at in rows}
+        existing = await self.get_by_external_ids(lead.external_id for lead in leads if lead.external_id not in inserted)
+        for lead in leads:
+            if lead.external_id in inserted:
+                lead.id, lead.created_at = inserted[lead.external_id]
+            else:
+                lead.id = existing[lead.external_id].id
+                lead.created_at = existing[lead.external_id].created_at
+        if commit:
+            await self.db.commit()
+        return leads
+    
+    async def get_or_create(self, external_id: str) -> entities.Lead:
+        row = (await self.db.execute(
+            lead_upsert_statement(self.db.bind.dialect.name), {"external_id": external_id}
+        )).first()
+        if row is None:
+            return await self.get_by_external_id(external_id)
+        await self.db.commit()
+        return entities.Lead(id=row.id, external_id=external_id, created_at=row.created_at)
+
+class AsyncSQLOperatorSourceWeightRepository(repositories.AsyncOperatorSourceWeightRepository):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def get_weights_for_source(self, source_id: int) -> list[entities.OperatorSourceWeight]:
+        db_weights = (await self.db.execute(
+            select(models.OperatorSourceWeightModel).where(
+                models.OperatorSourceWeightModel.source_id == source_id
+            )
+        )).scalars()
+        return [
+            entities.OperatorSourceWeight(
+                id=weight.id,
+                operator_id=weight.operator_id,
+                source_id=weight.source_id,
+                weight=weight.weight,
+                created_at=weight.created_at
+            ) for weight in db_weights
+        ]
+    
+    async def get_available_operators(self, source_id: int) -> list[entities.OperatorCandidate]:
+        rows = await self.db.execute(AVAILABLE_OPERATORS, {"source_id": source_id})
+        return [entities.OperatorCandidate(*row) for row in rows]
+    
+    async def get_source_operators(self, source_id: int) -> list[entities.OperatorCandidate]:
+        rows = await self.db.execute(SOURCE_OPERATORS, {"source_id": source_id})
+        return [
+            entities.OperatorCandidate(operator_id=operator_id, weight=weight, max_active_leads=max_active_leads)
+            for operator_id, weight, max_active_leads in rows
+        ]
+    
+    async def get_weights_version(self, source_id: int) -> int:
+        version = (await self.db.execute(
+            select(models.SourceWeightVersionModel.version).where(
+                models.SourceWeightVersionModel.source_id == source_id
+            )
+        )).scalar()
+        return version or 0
+
+class AsyncSQLContactRepository(repositories.AsyncContactRepository):
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def create(self, contact: entities.Contact) -> entities.Contact:
+        db_contact = models.ContactModel(
+            lead_id=contact.lead_id,
+            source_id=contact.source_id,
+            operator_id=contact.operator_id,
+            message=contact.message,
+            status=contact.status.value
+        )
+        self.db.add(db_contact)
+        await self.db.flush()
+        contact.id = db_contact.id
+        contact.created_at = db_contact.created_at
+        await self._apply_writes([contact])
+        await self.db.commit()
+        return contact
+    
+    async def create_many(self, contacts: list[entities.Contact], commit: bool = True) -> list[entities.Contact]:
+        if not contacts:
+            return contacts
+        rows = (await self.db.execute(
+            insert(models.ContactModel).returning(
+                models.ContactModel.id,
+                models.ContactModel.created_at,
+                sort_by_parameter_order=True
+            ),
+            [
+                {
+                    "lead_id": contact.lead_id,
+                    "source_id": contact.source_id,
+                    "operator_id": contact.operator_id,
+                    "message": contact.message,
+                    "status": contact.status.value
+                } for contact in contacts
+            ]
+        )).all()
+        for contact, (contact_id, created_at) in zip(contacts, rows):
+            contact.id = contact_id
+            contact.created_at = created_at
+        await self._apply_writes(contacts)
+        if commit:
+            await self.db.commit()
+        return contacts
+    
+    async def get_by_dedupe_keys(self, dedupe_keys, created_from) -> dict[str, entities.Contact]:
+        contacts = {}
+        for chunk in _chunks(list(set(dedupe_keys))):
+            for row in await self.db.execute(dedupe_query(chunk, created_from)):
+                contacts[row.dedupe_key] = _deduped_contact(row)
+        return contacts
+    
+    async def purge_dedupe_keys(self, created_before) -> int:
+        removed = (await self.db.execute(dedupe_purge(created_before))).rowcount
+        await self.db.commit()
+        return removed
+    
+    async def _apply_writes(self, contacts: list[entities.Contact]) -> None:
+        dialect_name = self.db.bind.dialect.name
+        for statement, rows in rollup_writes(dialect_name, count_rollups(contacts)) + dedupe_writes(dialect_name, contacts):
+            await self.db.execute(statement, rows)
\ No newline at end of file
@@ -0,0 +1,345 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from core import entities, repositories
+from shared_state import CounterStore
+
+ALL_SOURCES = 0
+
+@dataclass
+class _SourceEntry:
+    version: int
+    expires_at: float
+    generation: Optional[Tuple[int, int]] = None
+    data: Dict[str, list] = field(default_factory=dict)
+
+class SourceWeightCache:
+    def __init__(
+        self,
+        ttl: float = 30.0,
+        max_sources: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+        generations: Optional[CounterStore] = None
+    ):
+        self.ttl = ttl
+        self.max_sources = max_sources
+        self._clock = clock
+        self._generations = generations
+        self._entries: "OrderedDict[int, _SourceEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+    
+    def version(self, source_id: int, load_version: Callable[[], int]) -> int:
+        return self.entry(source_id, load_version).version
+    
+    def lookup(self, source_id: int, kind: str, load: Callable[[], list], load_version: Callable[[], int]) -> list:
+        entry = self.entry(source_id, load_version)
+        data = self.get_data(entry, kind)
+        if data is None:
+            data = self.put_data(entry, kind, load())
+        return data
+    
+    def entry(self, source_id: int, load_version: Callable[[], int]) -> _SourceEntry:
+        entry = self.fresh_entry(source_id)
+        if entry is None:
+            generation = self.generation(source_id)
+            entry = self.revalidate(source_id, load_version(), generation)
+        return entry
+    
+    def generation(self, source_id: int) -> Optional[Tuple[int, int]]:
+        if self._generations is None:
+            return None
+        return self._generations.get(ALL_SOURCES), self._generations.get(source_id)
+    
+    def fresh_entry(self, source_id: int) -> Optional[_SourceEntry]:
+        now = self._clock()
+        generation = self.generation(source_id)
+        with self._lock:
+            entry = self._entries.get(source_id)
+            if entry is None:
+                return None
+            self._entries.move_to_end(source_id)
+            return entry if entry.expires_at > now and entry.generation == generation else None
+    
+    def revalidate(self, source_id: int, version: int, generation: Optional[Tuple[int, int]] = None) -> _SourceEntry:
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(source_id)
+            if entry is not None and entry.version == version:
+                entry.expires_at = now + self.ttl
+                entry.generation = generation
+                self.revalidations += 1
+                return entry
+            entry = _SourceEntry(version=version, expires_at=now + self.ttl, generation=generation)
+            self._store(source_id, entry)
+            return entry
+    
+    def replace(self, source_id: int, version: int, data: Dict[str, list]) -> _SourceEntry:
+        if self._generations is not None:
+            self._generations.add(source_id)
+        entry = _SourceEntry(
+            version=version, expires_at=self._clock() + self.ttl, generation=self.generation(source_id), data=data
+        )
+        with self._lock:
+            self._store(source_id, entry)
+        return entry
+    
+    def _store(self, source_id: int, entry: _SourceEntry) -> None:
+        self._entries[source_id] = entry
+        self._entries.move_to_end(source_id)
+        while len(self._entries) > self.max_sources:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+    
+    def get_data(self, entry: _SourceEntry, kind: str) -> Optional[list]:
+        data = entry.data.get(kind)
+        if data is None:
+            return None
+        with self._lock:
+            self.hits += 1
+        return list(data)
+    
+    def put_data(self, entry: _SourceEntry, kind: str, data: list) -> list:
+        with self._lock:
+            self.misses += 1
+            entry.data[kind] = data
+        return list(data)
+    
+    def invalidate(self, source_id: Optional[int] = None) -> None:
+        if self._generations is not None:
+            self._generations.add(ALL_SOURCES if source_id is None else source_id)
+        with self._lock:
+            if source_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(source_id, None)
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidations": self.revalidations,
+                "evictions": self.evictions,
+                "sources": len(self._entries),
+                "versions": {source_id: entry.version for source_id, entry in self._entries.items()}
+            }
+
+class CachedOperatorSourceWeightRepository(repositories.OperatorSourceWeightRepository):
+    def __init__(self, inner: repositories.OperatorSourceWeightRepository, cache: SourceWeightCache):
+        self.inner = inner
+        self.cache = cache
+    
+    def get_weights_for_source(self, source_id: int) -> List[entities.OperatorSourceWeight]:
+        return self.cache.lookup(
+            source_id, "weights",
+            lambda: self.inner.get_weights_for_source(source_id),
+            lambda: self.inner.get_weights_version(source_id)
+        )
+    
+    def get_source_operators(self, source_id: int) -> List[entities.OperatorCandidate]:
+        return self.cache.lookup(
+            source_id, "operators",
+            lambda: self.inner.get_source_operators(source_id),
+            lambda: self.inner.get_weights_version(source_id)
+        )
+    
+    def get_weights_version(self, source_id: int) -> int:
+        return self.cache.version(source_id, lambda: self.inner.get_weights_version(source_id))
+    
+    def get_available_operators(self, source_id: int) -> List[entities.OperatorCandidate]:
+        return self.inner.get_available_operators(source_id)
+    
+    def update_weights(self, source_id: int, weights: List[entities.OperatorSourceWeight]) -> List[entities.OperatorSourceWeight]:
+        updated_weights = self.inner.update_weights(source_id, weights)
+        self.cache.replace(source_id, self.inner.get_weights_version(source_id), {
+            "weights": self.inner.get_weights_for_source(source_id),
+            "operators": self.inner.get_source_operators(source_id)
+        })
+        return updated_weights
+
+class CachedOperatorRepository(repositories.OperatorRepository):
+    def __init__(self, inner: repositories.OperatorRepository, cache: SourceWeightCache):
+        self.inner = inner
+        self.cache = cache
+    
+    def get_active_operators(self) -> List[entities.Operator]:
+        return self.inner.get_active_operators()
+    
+    def get_by_id(self, operator_id: int) -> Optional[entities.Operator]:
+        return self.inner.get_by_id(operator_id)
+    
+    def update(self, operator: entities.Operator) -> entities.Operator:
+        operator = self.inner.update(operator)
+        self.cache.invalidate()
+        return operator
+    
+    def list_operators(self, after_id: Optional[int], limit: int) -> List[entities.Operator]:
+        return self.inner.list_operators(after_id, limit)
+
+class AsyncCachedOperatorSourceWeightRepository(repositories.AsyncOperatorSourceWeightRepository):
+    def __init__(self, inner: repositories.AsyncOperatorSourceWeightRepository, cache: SourceWeightCache):
+        self.inner = inner
+        self.cache = cache
+    
+    async def get_weights_for_source(self, source_id: int) -> List[entities.OperatorSourceWeight]:
+        return await self._lookup(source_id, "weights", lambda: self.inner.get_weights_for_source(source_id))
+    
+    async def get_source_operators(self, source_id: int) -> List[entities.OperatorCandidate]:
+        return await self._lookup(source_id, "operators", lambda: self.inner.get_source_operators(source_id))
+    
+    async def get_weights_version(self, source_id: int) -> int:
+        return (await self._entry(source_id)).version
+    
+    async def get_available_operators(self, source_id: int) -> List[entities.OperatorCandidate]:
+        return await self.inner.get_available_operators(source_id)
+    
+    async def _entry(self, source_id: int) -> _SourceEntry:
+        entry = self.cache.fresh_entry(source_id)
+        if entry is None:
+            generation = self.cache.generation(source_id)
+            entry = self.cache.revalidate(source_id, await self.inner.get_weights_version(source_id), generation)
+        return entry
+    
+    async def _lookup(self, source_id: int, kind: str, load) -> list:
+        entry = await self._entry(source_id)
+        data = self.cache.get_data(entry, kind)
+        if data is None:
+            data = self.cache.put_data(entry, kind, await load())
+        return data
+
+class LeadCache:
+    def __init__(self, max_size: int = 100000):
+        self.max_size = max_size
+        self._leads: "OrderedDict[str, entities.Lead]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, external_id: str) -> Optional[entities.Lead]:
+        with self._lock:
+            lead = self._leads.get(external_id)
+            if lead is None:
+                self.misses += 1
+                return None
+            self._leads.move_to_end(external_id)
+            self.hits += 1
+        return replace(lead)
+    
+    def put_many(self, leads: Iterable[entities.Lead]) -> None:
+        with self._lock:
+            for lead in leads:
+                if lead is None or lead.id is None:
+                    continue
+                self._leads[lead.external_id] = replace(lead)
+                self._leads.move_to_end(lead.external_id)
+            while len(self._leads) > self.max_size:
+                self._leads.popitem(last=False)
+    
+    def put(self, lead: Optional[entities.Lead]) -> None:
+        self.put_many([lead])
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._leads)}
+
+class CachedLeadRepository(repositories.LeadRepository):
+    def __init__(self, inner: repositories.LeadRepository, cache: LeadCache):
+        self.inner = inner
+        self.cache = cache
+    
+    def get_by_external_id(self, external_id: str) -> Optional[entities.Lead]:
+        lead = self.cache.get(external_id)
+        if lead is None:
+            lead = self.inner.get_by_external_id(external_id)
+            self.cache.put(lead)
+        return lead
+    
+    def create(self, lead: entities.Lead) -> entities.Lead:
+        lead = self.inner.create(lead)
+        self.cache.put(lead)
+        return lead
+    
+    def get_by_external_ids(self, external_ids: Iterable[str]) -> Dict[str, entities.Lead]:
+        leads = {}
+        missing = []
+        for external_id in set(external_ids):
+            lead = self.cache.get(external_id)
+            if lead is None:
+                missing.append(external_id)
+            else:
+                leads[external_id] = lead
+        if missing:
+            found = self.inner.get_by_external_ids(missing)
+            self.cache.put_many(found.values())
+            leads.update(found)
+        return leads
+    
+    def create_many(self, leads: List[entities.Lead], commit: bool = True) -> List[entities.Lead]:
+        leads = self.inner.create_many(leads, commit=commit)
+        if commit:
+            self.cache.put_many(leads)
+        return leads
+    
+    def get_or_create(self, external_id: str) -> entities.Lead:
+        lead = self.cache.get(external_id)
+        if lead is None:
+            lead = self.inner.get_or_create(external_id)
+            self.cache.put(lead)
+        return lead
+    
+    def list_leads(self, after_id: Optional[int], limit: int) -> List[entities.Lead]:
+        return self.inner.list_leads(after_id, limit)
+    
+    def iter_leads(self, batch_size: int = 1000) -> Iterator[entities.Lead]:
+        return self.inner.iter_leads(batch_size)
+
+class AsyncCachedLeadRepository(repositories.AsyncLeadRepository):
+    def __init__(self, inner: repositories.AsyncLeadRepository, cache: LeadCache):
+        self.inner = inner
+        self.cache = cache
+    
+    async def get_by_external_id(self, external_id: str) -> Optional[entities.Lead]:
+        lead = self.cache.get(external_id)
+        if lead is None:
+            lead = await self.inner.get_by_external_id(external_id)
+            self.cache.put(lead)
+        return lead
+    
+    async def create(self, lead: entities.Lead) -> entities.Lead:
+        lead = await self.inner.create(lead)
+        self.cache.put(lead)
+        return lead
+    
+    async def get_by_external_ids(self, external_ids: Iterable[str]) -> Dict[str, entities.Lead]:
+        leads = {}
+        missing = []
+        for external_id in set(external_ids):
+            lead = self.cache.get(external_id)
+            if lead is None:
+                missing.append(external_id)
+            else:
+                leads[external_id] = lead
+        if missing:
+            found = await self.inner.get_by_external_ids(missing)
+            self.cache.put_many(found.values())
+            leads.update(found)
+        return leads
+    
+    async def create_many(self, leads: List[entities.Lead], commit: bool = True) -> List[entities.Lead]:
+        leads = await self.inner.create_many(leads, commit=commit)
+        if commit:
+            self.cache.put_many(leads)
+        return leads
+    
+    async def get_or_create(self, external_id: str) -> entities.Lead:
+        lead = self.cache.get(external_id)
+        if lead is None:
+            lead = await self.inner.get_or_create(external_id)
+            self.cache.put(lead)
+        return lead
\ No newline at end of file
@@ -0,0 +1,187 @@
+from sqlalchemy import bindparam, func, insert, select
+from core import entities
+from . import models
+from .repository import (
+    ACTIVE_CONTACT_STATUSES, UNASSIGNED_CONTACTS, SQLContactRepository, SQLLeadRepository, SQLOperatorRepository,
+    SQLOperatorSourceWeightRepository, SQLSourceRepository, _chunks, _contact_from_row, _lead_from_row,
+    apply_dedupe_keys, apply_rollups, count_rollups, lead_upsert_statement
+)
+
+leads_table = models.LeadModel.__table__
+operators_table = models.OperatorModel.__table__
+sources_table = models.SourceModel.__table__
+weights_table = models.OperatorSourceWeightModel.__table__
+contacts_table = models.ContactModel.__table__
+weight_versions_table = models.SourceWeightVersionModel.__table__
+
+LEAD_COLUMNS = (
+    leads_table.c.id, leads_table.c.external_id, leads_table.c.email, leads_table.c.phone, leads_table.c.created_at
+)
+OPERATOR_COLUMNS = (
+    operators_table.c.id, operators_table.c.name, operators_table.c.status,
+    operators_table.c.max_active_leads, operators_table.c.created_at
+)
+SOURCE_COLUMNS = (sources_table.c.id, sources_table.c.name, sources_table.c.description, sources_table.c.created_at)
+WEIGHT_COLUMNS = (
+    weights_table.c.id, weights_table.c.operator_id, weights_table.c.source_id,
+    weights_table.c.weight, weights_table.c.created_at
+)
+CONTACT_COLUMNS = (
+    contacts_table.c.id, contacts_table.c.lead_id, contacts_table.c.source_id, contacts_table.c.operator_id,
+    contacts_table.c.message, contacts_table.c.status, contacts_table.c.created_at
+)
+
+LEAD_BY_EXTERNAL_ID = select(*LEAD_COLUMNS).where(leads_table.c.external_id == bindparam("external_id")).limit(1)
+LEADS_BY_EXTERNAL_IDS = select(*LEAD_COLUMNS).where(
+    leads_table.c.external_id.in_(bindparam("external_ids", expanding=True))
+)
+LEADS_PAGE = select(*LEAD_COLUMNS).where(
+    leads_table.c.id > bindparam("after_id")
+).order_by(leads_table.c.id).limit(bindparam("limit"))
+LEADS_ALL = select(*LEAD_COLUMNS).order_by(leads_table.c.id)
+LEAD_INSERT = insert(leads_table).returning(leads_table.c.id, leads_table.c.created_at)
+
+OPERATORS_ACTIVE = select(*OPERATOR_COLUMNS).where(operators_table.c.status == entities.OperatorStatus.ACTIVE.value)
+OPERATOR_BY_ID = select(*OPERATOR_COLUMNS).where(operators_table.c.id == bindparam("operator_id"))
+OPERATORS_PAGE = select(*OPERATOR_COLUMNS).where(
+    operators_table.c.id > bindparam("after_id")
+).order_by(operators_table.c.id).limit(bindparam("limit"))
+
+SOURCE_BY_ID = select(*SOURCE_COLUMNS).where(sources_table.c.id == bindparam("source_id"))
+SOURCES_ALL = select(*SOURCE_COLUMNS)
+
+WEIGHTS_FOR_SOURCE = select(*WEIGHT_COLUMNS).where(weights_table.c.source_id == bindparam("source_id"))
+WEIGHTS_VERSION = select(weight_versions_table.c.version).where(
+    weight_versions_table.c.source_id == bindparam("source_id")
+)
+
+CONTACT_INSERT = insert(contacts_table).returning(contacts_table.c.id, contacts_table.c.created_at)
+CONTACTS_BY_LEAD = select(*CONTACT_COLUMNS).where(contacts_table.c.lead_id == bindparam("lead_id"))
+CONTACTS_BY_IDS = select(*CONTACT_COLUMNS).where(
+    contacts_table.c.id.in_(bindparam("contact_ids", expanding=True))
+)
+OPERATOR_ACTIVE_CONTACTS_COUNT = select(func.count(contacts_table.c.id)).where(
+    contacts_table.c.operator_id == bindparam("operator_id"),
+    contacts_table.c.status.in_(ACTIVE_CONTACT_STATUSES)
+)
+ACTIVE_CONTACTS_COUNTS = select(contacts_table.c.operator_id, func.count(contacts_table.c.id)).where(
+    contacts_table.c.operator_id.isnot(None),
+    contacts_table.c.status.in_(ACTIVE_CONTACT_STATUSES)
+).group_by(contacts_table.c.operator_id)
+UNASSIGNED_PAGE = select(*CONTACT_COLUMNS).where(
+    UNASSIGNED_CONTACTS,
+    contacts_table.c.id > bindparam("after_id")
+).order_by(contacts_table.c.id).limit(bindparam("limit"))
+
+def _operator_from_row(row) -> entities.Operator:
+    return entities.Operator(
+        id=row.id,
+        name=row.name,
+        status=entities.OperatorStatus(row.status),
+        max_active_leads=row.max_active_leads,
+        created_at=row.created_at
+    )
+
+def _cursor(after_id) -> int:
+    return 0 if after_id is None else after_id
+
+class CoreSQLLeadRepository(SQLLeadRepository):
+    def get_by_external_id(self, external_id: str) -> entities.Lead:
+        row = self.db.connection().execute(LEAD_BY_EXTERNAL_ID, {"external_id": external_id}).first()
+        return _lead_from_row(row) if row is not None else None
+    
+    def create(self, lead: entities.Lead) -> entities.Lead:
+        lead.id, lead.created_at = self.db.connection().execute(
+            LEAD_INSERT, {"external_id": lead.external_id, "email": lead.email, "phone": lead.phone}
+        ).one()
+        self.db.commit()
+        return lead
+    
+    def get_by_external_ids(self, external_ids) -> dict[str, entities.Lead]:
+        connection = self.db.connection()
+        found = {}
+        for chunk in _chunks(list(set(external_ids))):
+            for row in connection.execute(LEADS_BY_EXTERNAL_IDS, {"external_ids": chunk}):
+                found[row.external_id] = _lead_from_row(row)
+        return found
+    
+    def get_or_create(self, external_id: str) -> entities.Lead:
+        connection = self.db.connection()
+        row = connection.execute(lead_upsert_statement(connection.dialect.name), {"external_id": external_id}).first()
+        if row is None:
+            return self.get_by_external_id(external_id)
+        self.db.commit()
+        return entities.Lead(id=row.id, external_id=external_id, created_at=row.created_at)
+    
+    def list_leads(self, after_id, limit: int) -> list[entities.Lead]:
+        rows = self.db.connection().execute(LEADS_PAGE, {"after_id": _cursor(after_id), "limit": limit})
+        return [_lead_from_row(row) for row in rows]
+    
+    def iter_leads(self, batch_size: int = 1000):
+        for row in self.db.connection().execution_options(yield_per=batch_size).execute(LEADS_ALL):
+            yield _lead_from_row(row)
+
+class CoreSQLOperatorRepository(SQLOperatorRepository):
+    def get_active_operators(self) -> list[entities.Operator]:
+        return [_operator_from_row(row) for row in self.db.connection().execute(OPERATORS_ACTIVE)]
+    
+    def get_by_id(self, operator_id: int) -> entities.Operator:
+        row = self.db.connection().execute(OPERATOR_BY_ID, {"operator_id": operator_id}).first()
+        return _operator_from_row(row) if row is not None else None
+    
+    def list_operators(self, after_id, limit: int) -> list[entities.Operator]:
+        rows = self.db.connection().execute(OPERATORS_PAGE, {"after_id": _cursor(after_id), "limit": limit})
+        return [_operator_from_row(row) for row in rows]
+
+class CoreSQLSourceRepository(SQLSourceRepository):
+    def get_by_id(self, source_id: int) -> entities.Source:
+        row = self.db.connection().execute(SOURCE_BY_ID, {"source_id": source_id}).first()
+        return entities.Source(*row) if row is not None else None
+    
+    def get_all(self) -> list[entities.Source]:
+        return [entities.Source(*row) for row in self.db.connection().execute(SOURCES_ALL)]
+
+class CoreSQLOperatorSourceWeightRepository(SQLOperatorSourceWeightRepository):
+    def get_weights_for_source(self, source_id: int) -> list[entities.OperatorSourceWeight]:
+        rows = self.db.connection().execute(WEIGHTS_FOR_SOURCE, {"source_id": source_id})
+        return [entities.OperatorSourceWeight(*row) for row in rows]
+    
+    def get_weights_version(self, source_id: int) -> int:
+        return self.db.connection().execute(WEIGHTS_VERSION, {"source_id": source_id}).scalar() or 0
+
+class CoreSQLContactRepository(SQLContactRepository):
+    def create(self, contact: entities.Contact) -> entities.Contact:
+        connection = self.db.connection()
+        contact.id, contact.created_at = connection.execute(CONTACT_INSERT, {
+            "lead_id": contact.lead_id,
+            "source_id": contact.source_id,
+            "operator_id": contact.operator_id,
+            "message": contact.message,
+            "status": contact.status.value
+        }).one()
+        apply_rollups(connection, count_rollups([contact]))
+        apply_dedupe_keys(connection, [contact])
+        self.db.commit()
+        return contact
+    
+    def get_operator_active_contacts_count(self, operator_id: int) -> int:
+        return self.db.connection().execute(OPERATOR_ACTIVE_CONTACTS_COUNT, {"operator_id": operator_id}).scalar()
+    
+    def get_active_contacts_counts(self) -> dict[int, int]:
+        return {operator_id: count for operator_id, count in self.db.connection().execute(ACTIVE_CONTACTS_COUNTS)}
+    
+    def get_contacts_by_lead(self, lead_id: int) -> list[entities.Contact]:
+        rows = self.db.connection().execute(CONTACTS_BY_LEAD, {"lead_id": lead_id})
+        return [_contact_from_row(row) for row in rows]
+    
+    def get_by_ids(self, contact_ids) -> dict[int, entities.Contact]:
+        connection = self.db.connection()
+        found = {}
+        for chunk in _chunks(list(set(contact_ids))):
+            for row in connection.execute(CONTACTS_BY_IDS, {"contact_ids": chunk}):
+                found[row.id] = _contact_from_row(row)
+        return found
+    
+    def get_unassigned_contacts(self, after_id, limit: int) -> list[entities.Contact]:
+        rows = self.db.connection().execute(UNASSIGNED_PAGE, {"after_id": _cursor(after_id), "limit": limit})
+        return [_contact_from_row(row) for row in rows]
\ No newline at end of file
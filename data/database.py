@@ -1,19 +1,133 @@
-from sqlalchemy import create_engine
+import threading
+import time
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
+from config import settings
+import metrics
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./leads.db"
+SQLALCHEMY_DATABASE_URL = settings.database_url
+IS_SQLITE = SQLALCHEMY_DATABASE_URL.startswith("sqlite")
+CONNECT_ARGS = {"check_same_thread": False} if IS_SQLITE else {}
+
+class PoolMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.in_use = 0
+        self.max_in_use = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+    
+    def attach(self, engine) -> None:
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+    
+    def observe_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+    
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "in_use": self.in_use,
+                "max_in_use": self.max_in_use,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max
+            }
+    
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+    
+    def _on_checkin(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            self.in_use -= 1
+
+def _pool_options(url: str, poolclass=QueuePool) -> dict:
+    if url.startswith("sqlite") and (settings.db_sqlite_static_pool or ":memory:" in url):
+        return {"poolclass": StaticPool}
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping
+    }
+
+def _sqlite_pragmas() -> list:
+    pragmas = []
+    if settings.db_sqlite_wal or settings.db_sqlite_performance:
+        pragmas.append("journal_mode=WAL")
+    if settings.db_sqlite_performance:
+        pragmas.extend([
+            "synchronous=NORMAL",
+            f"mmap_size={settings.db_sqlite_mmap_size}",
+            f"cache_size={settings.db_sqlite_cache_size}",
+            "temp_store=MEMORY"
+        ])
+    return pragmas
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    for pragma in SQLITE_PRAGMAS:
+        cursor.execute(f"PRAGMA {pragma}")
+    cursor.close()
+
+SQLITE_PRAGMAS = _sqlite_pragmas() if IS_SQLITE else []
 
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    SQLALCHEMY_DATABASE_URL, connect_args=CONNECT_ARGS, **_pool_options(SQLALCHEMY_DATABASE_URL)
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+pool_metrics = PoolMetrics()
+pool_metrics.attach(engine)
+
+async_engine = None
+AsyncSessionLocal = None
+async_pool_metrics = None
+if settings.async_mode:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    
+    async_engine = create_async_engine(
+        settings.get_async_database_url(), connect_args=CONNECT_ARGS,
+        **_pool_options(settings.get_async_database_url(), AsyncAdaptedQueuePool)
+    )
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    async_pool_metrics = PoolMetrics()
+    async_pool_metrics.attach(async_engine.sync_engine)
+
+if settings.metrics:
+    metrics.instrument_engine(engine)
+    if async_engine is not None:
+        metrics.instrument_engine(async_engine.sync_engine)
+
+if SQLITE_PRAGMAS:
+    event.listen(engine, "connect", _apply_sqlite_pragmas)
+    if async_engine is not None:
+        event.listen(async_engine.sync_engine, "connect", _apply_sqlite_pragmas)
 
 Base = declarative_base()
 
 def get_db():
     db = SessionLocal()
     try:
+        started = time.perf_counter()
+        db.connection()
+        pool_metrics.observe_wait(time.perf_counter() - started)
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        started = time.perf_counter()
+        await db.connection()
+        async_pool_metrics.observe_wait(time.perf_counter() - started)
+        yield db
\ No newline at end of file
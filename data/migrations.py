@@ -0,0 +1,102 @@
+import sys
+from sqlalchemy import delete, func, insert, select, text
+from .database import Base, engine
+from . import models
+from .repository import ROLLUP_DIMENSIONS, TOTAL_DIMENSIONS, UNASSIGNED_OPERATOR_ID
+
+STALE_INDEXES = (("contacts", "ix_contacts_unassigned"),)
+
+def _deduplicate_weights(connection) -> int:
+    latest_ids = select(func.max(models.OperatorSourceWeightModel.id)).group_by(
+        models.OperatorSourceWeightModel.source_id,
+        models.OperatorSourceWeightModel.operator_id
+    )
+    result = connection.execute(
+        delete(models.OperatorSourceWeightModel).where(
+            models.OperatorSourceWeightModel.id.not_in(latest_ids)
+        )
+    )
+    return result.rowcount
+
+def _hour(dialect_name: str, column):
+    if dialect_name == "sqlite":
+        return func.strftime("%Y-%m-%d %H:00:00.000000", column)
+    return func.date_trunc("hour", column)
+
+def rebuild_contact_rollups(connection) -> int:
+    connection.execute(delete(models.ContactRollupModel))
+    connection.execute(delete(models.ContactTotalModel))
+    dimensions = (
+        _hour(connection.dialect.name, models.ContactModel.created_at),
+        models.ContactModel.source_id,
+        func.coalesce(models.ContactModel.operator_id, UNASSIGNED_OPERATOR_ID),
+        models.ContactModel.status
+    )
+    result = connection.execute(
+        insert(models.ContactRollupModel).from_select(
+            ROLLUP_DIMENSIONS + ("count",),
+            select(*dimensions, func.count(models.ContactModel.id)).group_by(*dimensions)
+        )
+    )
+    totals = [getattr(models.ContactRollupModel, dimension) for dimension in TOTAL_DIMENSIONS]
+    connection.execute(
+        insert(models.ContactTotalModel).from_select(
+            TOTAL_DIMENSIONS + ("count",),
+            select(*totals, func.sum(models.ContactRollupModel.count)).group_by(*totals)
+        )
+    )
+    return result.rowcount
+
+def _rollups_missing(connection) -> bool:
+    has_rollups = connection.execute(select(models.ContactRollupModel.hour).limit(1)).first() is not None
+    has_contacts = connection.execute(select(models.ContactModel.id).limit(1)).first() is not None
+    return has_contacts and not has_rollups
+
+def _missing_indexes(connection) -> list:
+    return [
+        index
+        for table in Base.metadata.sorted_tables
+        for index in sorted(table.indexes, key=lambda index: index.name)
+        if not connection.dialect.has_index(connection, table.name, index.name)
+    ]
+
+def _sync_indexes(connection) -> list:
+    applied = []
+    missing = _missing_indexes(connection)
+    if any(index.table.name == "operator_source_weights" and index.unique for index in missing):
+        removed = _deduplicate_weights(connection)
+        if removed:
+            applied.append(f"removed {removed} duplicate operator_source_weights rows")
+    for table_name, index_name in STALE_INDEXES:
+        if connection.dialect.has_index(connection, table_name, index_name):
+            connection.execute(text(f"DROP INDEX {index_name}"))
+            applied.append(f"dropped index {index_name}")
+    for index in missing:
+        index.create(connection)
+        applied.append(f"created index {index.name}")
+    if applied and connection.dialect.name == "sqlite":
+        connection.execute(text("ANALYZE"))
+        applied.append("analyzed index statistics")
+    return applied
+
+def create_schema(bind=engine) -> list:
+    Base.metadata.create_all(bind=bind)
+    with bind.begin() as connection:
+        return _sync_indexes(connection)
+
+def check_schema(bind=engine) -> None:
+    with bind.connect() as connection:
+        missing = [index.name for index in _missing_indexes(connection)]
+    if missing:
+        raise RuntimeError(f"Database is missing indexes {missing}, run python -m data.migrations")
+
+def migrate(bind=engine, rebuild_rollups: bool = False) -> list:
+    applied = create_schema(bind)
+    with bind.begin() as connection:
+        if rebuild_rollups or _rollups_missing(connection):
+            applied.append(f"built {rebuild_contact_rollups(connection)} contact_rollups rows")
+    return applied
+
+if __name__ == "__main__":
+    for step in migrate(rebuild_rollups="--rebuild-rollups" in sys.argv[1:]) or ["schema is up to date"]:
+        print(step)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum, Text, Index, text
 from sqlalchemy.orm import relationship
 from .database import Base
 import datetime
@@ -39,6 +39,9 @@ class SourceModel(Base):
 
 class OperatorSourceWeightModel(Base):
     __tablename__ = "operator_source_weights"
+    __table_args__ = (
+        Index("ix_operator_source_weights_source_id_operator_id", "source_id", "operator_id", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     operator_id = Column(Integer, ForeignKey("operators.id"))
@@ -49,8 +52,24 @@ class OperatorSourceWeightModel(Base):
     operator = relationship("OperatorModel", back_populates="source_weights")
     source = relationship("SourceModel", back_populates="operator_weights")
 
+class SourceWeightVersionModel(Base):
+    __tablename__ = "source_weight_versions"
+    
+    source_id = Column(Integer, ForeignKey("sources.id"), primary_key=True)
+    version = Column(Integer, default=0, nullable=False)
+
 class ContactModel(Base):
     __tablename__ = "contacts"
+    __table_args__ = (
+        Index("ix_contacts_operator_id_status", "operator_id", "status"),
+        Index("ix_contacts_lead_id", "lead_id"),
+        Index(
+            "ix_contacts_unassigned_active",
+            "id",
+            sqlite_where=text("operator_id IS NULL AND status IN ('new', 'in_progress')"),
+            postgresql_where=text("operator_id IS NULL AND status IN ('new', 'in_progress')")
+        ),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     lead_id = Column(Integer, ForeignKey("leads.id"))
@@ -62,4 +81,32 @@ class ContactModel(Base):
     
     lead = relationship("LeadModel", back_populates="contacts")
     source = relationship("SourceModel", back_populates="contacts")
-    operator = relationship("OperatorModel", back_populates="contacts")
\ No newline at end of file
+    operator = relationship("OperatorModel", back_populates="contacts")
+
+class ContactRollupModel(Base):
+    __tablename__ = "contact_rollups"
+    __table_args__ = (
+        Index("ix_contact_rollups_source_id_hour", "source_id", "hour"),
+        Index("ix_contact_rollups_status_operator_id", "status", "operator_id"),
+    )
+    
+    hour = Column(DateTime, primary_key=True)
+    source_id = Column(Integer, primary_key=True)
+    operator_id = Column(Integer, primary_key=True)
+    status = Column(String, primary_key=True)
+    count = Column(Integer, default=0, nullable=False)
+
+class ContactTotalModel(Base):
+    __tablename__ = "contact_totals"
+    
+    source_id = Column(Integer, primary_key=True)
+    operator_id = Column(Integer, primary_key=True)
+    status = Column(String, primary_key=True)
+    count = Column(Integer, default=0, nullable=False)
+
+class ContactDedupeModel(Base):
+    __tablename__ = "contact_dedupe_keys"
+    
+    dedupe_key = Column(String, primary_key=True)
+    contact_id = Column(Integer, ForeignKey("contacts.id"), nullable=False)
+    created_at = Column(DateTime, nullable=False, index=True)
\ No newline at end of file
@@ -1,7 +1,288 @@
+from datetime import timedelta
+from functools import lru_cache
+from sqlalchemy import and_, bindparam, delete, func, insert, select, update
 from sqlalchemy.orm import Session
 from core import entities, repositories
 from . import models
 
+ACTIVE_CONTACT_STATUSES = [entities.ContactStatus.NEW.value, entities.ContactStatus.IN_PROGRESS.value]
+UNASSIGNED_CONTACTS = and_(
+    models.ContactModel.operator_id.is_(None),
+    models.ContactModel.status.in_(
+        bindparam("unassigned_statuses", ACTIVE_CONTACT_STATUSES, expanding=True, literal_execute=True)
+    )
+)
+IN_CLAUSE_CHUNK_SIZE = 500
+UNASSIGNED_OPERATOR_ID = 0
+ROLLUP_DIMENSIONS = ("hour", "source_id", "operator_id", "status")
+TOTAL_DIMENSIONS = ROLLUP_DIMENSIONS[1:]
+ROLLUP_GROUPS = ROLLUP_DIMENSIONS + ("assigned",)
+
+def _chunks(items: list, size: int = IN_CLAUSE_CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+LEAD_COLUMNS = (
+    models.LeadModel.id,
+    models.LeadModel.external_id,
+    models.LeadModel.email,
+    models.LeadModel.phone,
+    models.LeadModel.created_at
+)
+
+CONTACT_COLUMNS = (
+    models.ContactModel.id,
+    models.ContactModel.lead_id,
+    models.ContactModel.source_id,
+    models.ContactModel.operator_id,
+    models.ContactModel.message,
+    models.ContactModel.status,
+    models.ContactModel.created_at
+)
+
+ACTIVE_COUNT = func.count(models.ContactModel.id)
+AVAILABLE_OPERATORS = select(
+    models.OperatorSourceWeightModel.operator_id,
+    models.OperatorSourceWeightModel.weight,
+    ACTIVE_COUNT,
+    models.OperatorModel.max_active_leads
+).join(
+    models.OperatorModel,
+    models.OperatorModel.id == models.OperatorSourceWeightModel.operator_id
+).outerjoin(
+    models.ContactModel,
+    and_(
+        models.ContactModel.operator_id == models.OperatorModel.id,
+        models.ContactModel.status.in_(ACTIVE_CONTACT_STATUSES)
+    )
+).where(
+    models.OperatorSourceWeightModel.source_id == bindparam("source_id"),
+    models.OperatorSourceWeightModel.weight > 0,
+    models.OperatorModel.status == entities.OperatorStatus.ACTIVE.value
+).group_by(
+    models.OperatorSourceWeightModel.id,
+    models.OperatorSourceWeightModel.operator_id,
+    models.OperatorSourceWeightModel.weight,
+    models.OperatorModel.max_active_leads
+).having(ACTIVE_COUNT < models.OperatorModel.max_active_leads)
+SOURCE_OPERATORS = select(
+    models.OperatorSourceWeightModel.operator_id,
+    models.OperatorSourceWeightModel.weight,
+    models.OperatorModel.max_active_leads
+).join(
+    models.OperatorModel,
+    models.OperatorModel.id == models.OperatorSourceWeightModel.operator_id
+).where(
+    models.OperatorSourceWeightModel.source_id == bindparam("source_id"),
+    models.OperatorSourceWeightModel.weight > 0,
+    models.OperatorModel.status == entities.OperatorStatus.ACTIVE.value
+)
+
+def _lead_from_row(row) -> entities.Lead:
+    return entities.Lead(
+        id=row.id,
+        external_id=row.external_id,
+        email=row.email,
+        phone=row.phone,
+        created_at=row.created_at
+    )
+
+def _contact_from_row(row) -> entities.Contact:
+    return entities.Contact(
+        id=row.id,
+        lead_id=row.lead_id,
+        source_id=row.source_id,
+        operator_id=row.operator_id,
+        message=row.message,
+        status=entities.ContactStatus(row.status),
+        created_at=row.created_at
+    )
+
+def _rollup_from_row(group_by: list, row) -> entities.ContactRollup:
+    rollup = entities.ContactRollup(count=row[-1])
+    for dimension, value in zip(group_by, row):
+        if dimension == "status":
+            value = entities.ContactStatus(value)
+        elif dimension == "operator_id" and value == UNASSIGNED_OPERATOR_ID:
+            value = None
+        setattr(rollup, dimension, value)
+    return rollup
+
+def _rollup_column(model, dimension: str):
+    if dimension == "assigned":
+        return (model.operator_id != UNASSIGNED_OPERATOR_ID).label("assigned")
+    return getattr(model, dimension)
+
+def _filter_rollups(query, model, filters: entities.ContactFilter):
+    if filters.operator_id is not None:
+        query = query.filter(model.operator_id == filters.operator_id)
+    if filters.source_id is not None:
+        query = query.filter(model.source_id == filters.source_id)
+    if filters.status is not None:
+        query = query.filter(model.status == filters.status.value)
+    if filters.created_from is not None:
+        query = query.filter(model.hour >= rollup_hour(filters.created_from))
+    if filters.created_to is not None:
+        query = query.filter(model.hour < rollup_hour_end(filters.created_to))
+    return query
+
+def _filter_contacts(query, filters: entities.ContactFilter):
+    if filters.operator_id is not None:
+        query = query.filter(models.ContactModel.operator_id == filters.operator_id)
+    if filters.source_id is not None:
+        query = query.filter(models.ContactModel.source_id == filters.source_id)
+    if filters.status is not None:
+        query = query.filter(models.ContactModel.status == filters.status.value)
+    if filters.created_from is not None:
+        query = query.filter(models.ContactModel.created_at >= filters.created_from)
+    if filters.created_to is not None:
+        query = query.filter(models.ContactModel.created_at < filters.created_to)
+    return query
+
+@lru_cache(maxsize=None)
+def lead_upsert_statement(dialect_name: str):
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    return dialect_insert(models.LeadModel).on_conflict_do_nothing(
+        index_elements=[models.LeadModel.external_id]
+    ).returning(
+        models.LeadModel.id,
+        models.LeadModel.external_id,
+        models.LeadModel.created_at
+    )
+
+@lru_cache(maxsize=None)
+def weight_upsert_statement(dialect_name: str):
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    statement = dialect_insert(models.OperatorSourceWeightModel)
+    return statement.on_conflict_do_update(
+        index_elements=[models.OperatorSourceWeightModel.source_id, models.OperatorSourceWeightModel.operator_id],
+        set_={"weight": statement.excluded.weight}
+    )
+
+@lru_cache(maxsize=None)
+def dedupe_upsert_statement(dialect_name: str):
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    statement = dialect_insert(models.ContactDedupeModel)
+    return statement.on_conflict_do_update(
+        index_elements=[models.ContactDedupeModel.dedupe_key],
+        set_={"contact_id": statement.excluded.contact_id, "created_at": statement.excluded.created_at}
+    )
+
+@lru_cache(maxsize=None)
+def count_upsert_statement(dialect_name: str, model):
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    statement = dialect_insert(model)
+    return statement.on_conflict_do_update(
+        index_elements=list(model.__table__.primary_key.columns),
+        set_={"count": model.count + statement.excluded["count"]}
+    )
+
+def rollup_hour(created_at):
+    return created_at.replace(minute=0, second=0, microsecond=0)
+
+def rollup_hour_end(created_at):
+    hour = rollup_hour(created_at)
+    return hour if hour == created_at else hour + timedelta(hours=1)
+
+def rollup_key(contact: entities.Contact, status: entities.ContactStatus = None, operator_id: int = None) -> tuple:
+    return (
+        rollup_hour(contact.created_at),
+        contact.source_id,
+        operator_id or contact.operator_id or UNASSIGNED_OPERATOR_ID,
+        (status or contact.status).value
+    )
+
+def count_rollups(
+    contacts,
+    deltas: dict = None,
+    delta: int = 1,
+    status: entities.ContactStatus = None,
+    operator_id: int = None
+) -> dict:
+    deltas = {} if deltas is None else deltas
+    for contact in contacts:
+        key = rollup_key(contact, status, operator_id)
+        deltas[key] = deltas.get(key, 0) + delta
+    return deltas
+
+def rollup_writes(dialect_name: str, deltas: dict) -> list:
+    totals = {}
+    for key, count in deltas.items():
+        totals[key[1:]] = totals.get(key[1:], 0) + count
+    writes = []
+    for model, dimensions, counts in (
+        (models.ContactRollupModel, ROLLUP_DIMENSIONS, deltas),
+        (models.ContactTotalModel, TOTAL_DIMENSIONS, totals)
+    ):
+        rows = [dict(zip(dimensions, key), count=count) for key, count in counts.items() if count]
+        if rows:
+            writes.append((count_upsert_statement(dialect_name, model), rows))
+    return writes
+
+def apply_rollups(connection, deltas: dict) -> None:
+    for statement, rows in rollup_writes(connection.dialect.name, deltas):
+        connection.execute(statement, rows)
+
+def dedupe_writes(dialect_name: str, contacts) -> list:
+    rows = [
+        {"dedupe_key": contact.dedupe_key, "contact_id": contact.id, "created_at": contact.created_at}
+        for contact in contacts if contact.dedupe_key is not None
+    ]
+    if not rows:
+        return []
+    return [(dedupe_upsert_statement(dialect_name), rows)]
+
+def apply_dedupe_keys(connection, contacts) -> None:
+    for statement, rows in dedupe_writes(connection.dialect.name, contacts):
+        connection.execute(statement, rows)
+
+def dedupe_query(dedupe_keys, created_from):
+    return select(*CONTACT_COLUMNS, models.ContactDedupeModel.dedupe_key).join(
+        models.ContactDedupeModel, models.ContactDedupeModel.contact_id == models.ContactModel.id
+    ).where(
+        models.ContactDedupeModel.dedupe_key.in_(dedupe_keys),
+        models.ContactDedupeModel.created_at >= created_from
+    )
+
+def dedupe_purge(created_before):
+    return delete(models.ContactDedupeModel).where(models.ContactDedupeModel.created_at < created_before)
+
+def _deduped_contact(row) -> entities.Contact:
+    contact = _contact_from_row(row)
+    contact.dedupe_key = row.dedupe_key
+    return contact
+
+def bump_weights_versions(db: Session, source_ids) -> None:
+    source_ids = set(source_ids)
+    if not source_ids:
+        return
+    existing = {
+        source_id for (source_id,) in db.query(models.SourceWeightVersionModel.source_id).filter(
+            models.SourceWeightVersionModel.source_id.in_(source_ids)
+        )
+    }
+    if existing:
+        db.query(models.SourceWeightVersionModel).filter(
+            models.SourceWeightVersionModel.source_id.in_(existing)
+        ).update(
+            {models.SourceWeightVersionModel.version: models.SourceWeightVersionModel.version + 1},
+            synchronize_session=False
+        )
+    for source_id in source_ids - existing:
+        db.add(models.SourceWeightVersionModel(source_id=source_id, version=1))
+
 class SQLLeadRepository(repositories.LeadRepository):
     def __init__(self, db: Session):
         self.db = db
@@ -32,6 +313,60 @@ class SQLLeadRepository(repositories.LeadRepository):
         lead.id = db_lead.id
         lead.created_at = db_lead.created_at
         return lead
+    
+    def get_by_external_ids(self, external_ids) -> dict[str, entities.Lead]:
+        leads = {}
+        for chunk in _chunks(list(set(external_ids))):
+            db_leads = self.db.query(models.LeadModel).filter(
+                models.LeadModel.external_id.in_(chunk)
+            ).all()
+            for db_lead in db_leads:
+                leads[db_lead.external_id] = entities.Lead(
+                    id=db_lead.id,
+                    external_id=db_lead.external_id,
+                    email=db_lead.email,
+                    phone=db_lead.phone,
+                    created_at=db_lead.created_at
+                )
+        return leads
+    
+    def create_many(self, leads: list[entities.Lead], commit: bool = True) -> list[entities.Lead]:
+        if not leads:
+            return leads
+        rows = self.db.execute(
+            lead_upsert_statement(self.db.bind.dialect.name),
+            [{"external_id": lead.external_id, "email": lead.email, "phone": lead.phone} for lead in leads]
+        ).all()
+        inserted = {external_id: (lead_id, created_at) for lead_id, external_id, created_at in rows}
+        existing = self.get_by_external_ids(lead.external_id for lead in leads if lead.external_id not in inserted)
+        for lead in leads:
+            if lead.external_id in inserted:
+                lead.id, lead.created_at = inserted[lead.external_id]
+            else:
+                lead.id = existing[lead.external_id].id
+                lead.created_at = existing[lead.external_id].created_at
+        if commit:
+            self.db.commit()
+        return leads
+    
+    def get_or_create(self, external_id: str) -> entities.Lead:
+        row = self.db.execute(
+            lead_upsert_statement(self.db.bind.dialect.name), {"external_id": external_id}
+        ).first()
+        if row is None:
+            return self.get_by_external_id(external_id)
+        self.db.commit()
+        return entities.Lead(id=row.id, external_id=external_id, created_at=row.created_at)
+    
+    def list_leads(self, after_id, limit: int) -> list[entities.Lead]:
+        query = self.db.query(*LEAD_COLUMNS)
+        if after_id is not None:
+            query = query.filter(models.LeadModel.id > after_id)
+        return [_lead_from_row(row) for row in query.order_by(models.LeadModel.id).limit(limit)]
+    
+    def iter_leads(self, batch_size: int = 1000):
+        for row in self.db.query(*LEAD_COLUMNS).order_by(models.LeadModel.id).yield_per(batch_size):
+            yield _lead_from_row(row)
 
 class SQLOperatorRepository(repositories.OperatorRepository):
     def __init__(self, db: Session):
@@ -73,9 +408,28 @@ class SQLOperatorRepository(repositories.OperatorRepository):
             db_op.name = operator.name
             db_op.status = operator.status.value
             db_op.max_active_leads = operator.max_active_leads
+            bump_weights_versions(self.db, (
+                source_id for (source_id,) in self.db.query(models.OperatorSourceWeightModel.source_id).filter(
+                    models.OperatorSourceWeightModel.operator_id == operator.id
+                )
+            ))
             self.db.commit()
             self.db.refresh(db_op)
         return operator
+    
+    def list_operators(self, after_id, limit: int) -> list[entities.Operator]:
+        query = self.db.query(models.OperatorModel)
+        if after_id is not None:
+            query = query.filter(models.OperatorModel.id > after_id)
+        return [
+            entities.Operator(
+                id=op.id,
+                name=op.name,
+                status=entities.OperatorStatus(op.status),
+                max_active_leads=op.max_active_leads,
+                created_at=op.created_at
+            ) for op in query.order_by(models.OperatorModel.id).limit(limit)
+        ]
 
 class SQLSourceRepository(repositories.SourceRepository):
     def __init__(self, db: Session):
@@ -124,20 +478,43 @@ class SQLOperatorSourceWeightRepository(repositories.OperatorSourceWeightReposit
         ]
     
     def update_weights(self, source_id: int, weights: list[entities.OperatorSourceWeight]) -> list[entities.OperatorSourceWeight]:
-        self.db.query(models.OperatorSourceWeightModel).filter(
-            models.OperatorSourceWeightModel.source_id == source_id
-        ).delete()
-        
-        for weight in weights:
-            db_weight = models.OperatorSourceWeightModel(
-                operator_id=weight.operator_id,
-                source_id=source_id,
-                weight=weight.weight
-            )
-            self.db.add(db_weight)
+        weights = list({weight.operator_id: weight for weight in weights}.values())
+        table = models.OperatorSourceWeightModel
+        connection = self.db.connection()
+        current = dict(connection.execute(
+            select(table.operator_id, table.weight).where(table.source_id == source_id)
+        ).all())
         
+        removed = sorted(current.keys() - {weight.operator_id for weight in weights})
+        for chunk in _chunks(removed):
+            connection.execute(delete(table).where(table.source_id == source_id, table.operator_id.in_(chunk)))
+        changed = [
+            {"operator_id": weight.operator_id, "source_id": source_id, "weight": weight.weight}
+            for weight in weights if current.get(weight.operator_id) != weight.weight
+        ]
+        if changed:
+            connection.execute(weight_upsert_statement(connection.dialect.name), changed)
+        if removed or changed:
+            bump_weights_versions(self.db, [source_id])
         self.db.commit()
         return weights
+    
+    def get_available_operators(self, source_id: int) -> list[entities.OperatorCandidate]:
+        rows = self.db.execute(AVAILABLE_OPERATORS, {"source_id": source_id})
+        return [entities.OperatorCandidate(*row) for row in rows]
+    
+    def get_source_operators(self, source_id: int) -> list[entities.OperatorCandidate]:
+        rows = self.db.execute(SOURCE_OPERATORS, {"source_id": source_id})
+        return [
+            entities.OperatorCandidate(operator_id=operator_id, weight=weight, max_active_leads=max_active_leads)
+            for operator_id, weight, max_active_leads in rows
+        ]
+    
+    def get_weights_version(self, source_id: int) -> int:
+        version = self.db.query(models.SourceWeightVersionModel.version).filter(
+            models.SourceWeightVersionModel.source_id == source_id
+        ).scalar()
+        return version or 0
 
 class SQLContactRepository(repositories.ContactRepository):
     def __init__(self, db: Session):
@@ -152,18 +529,60 @@ class SQLContactRepository(repositories.ContactRepository):
             status=contact.status.value
         )
         self.db.add(db_contact)
-        self.db.commit()
-        self.db.refresh(db_contact)
+        self.db.flush()
         contact.id = db_contact.id
         contact.created_at = db_contact.created_at
+        connection = self.db.connection()
+        apply_rollups(connection, count_rollups([contact]))
+        apply_dedupe_keys(connection, [contact])
+        self.db.commit()
         return contact
     
+    def create_many(self, contacts: list[entities.Contact], commit: bool = True) -> list[entities.Contact]:
+        if not contacts:
+            return contacts
+        rows = self.db.execute(
+            insert(models.ContactModel).returning(
+                models.ContactModel.id,
+                models.ContactModel.created_at,
+                sort_by_parameter_order=True
+            ),
+            [
+                {
+                    "lead_id": contact.lead_id,
+                    "source_id": contact.source_id,
+                    "operator_id": contact.operator_id,
+                    "message": contact.message,
+                    "status": contact.status.value
+                } for contact in contacts
+            ]
+        ).all()
+        for contact, (contact_id, created_at) in zip(contacts, rows):
+            contact.id = contact_id
+            contact.created_at = created_at
+        connection = self.db.connection()
+        apply_rollups(connection, count_rollups(contacts))
+        apply_dedupe_keys(connection, contacts)
+        if commit:
+            self.db.commit()
+        return contacts
+    
     def get_operator_active_contacts_count(self, operator_id: int) -> int:
         return self.db.query(models.ContactModel).filter(
             models.ContactModel.operator_id == operator_id,
-            models.ContactModel.status.in_(["new", "in_progress"])
+            models.ContactModel.status.in_(ACTIVE_CONTACT_STATUSES)
         ).count()
     
+    def get_active_contacts_counts(self) -> dict[int, int]:
+        rows = self.db.query(
+            models.ContactModel.operator_id,
+            func.count(models.ContactModel.id)
+        ).filter(
+            models.ContactModel.operator_id.isnot(None),
+            models.ContactModel.status.in_(ACTIVE_CONTACT_STATUSES)
+        ).group_by(models.ContactModel.operator_id).all()
+        return {operator_id: count for operator_id, count in rows}
+    
     def get_contacts_by_lead(self, lead_id: int) -> list[entities.Contact]:
         db_contacts = self.db.query(models.ContactModel).filter(
             models.ContactModel.lead_id == lead_id
@@ -178,4 +597,104 @@ class SQLContactRepository(repositories.ContactRepository):
                 status=entities.ContactStatus(contact.status),
                 created_at=contact.created_at
             ) for contact in db_contacts
-        ]
\ No newline at end of file
+        ]
+    
+    def list_contacts(self, filters: entities.ContactFilter, after_id, limit: int) -> list[entities.Contact]:
+        query = _filter_contacts(self.db.query(*CONTACT_COLUMNS), filters)
+        if after_id is not None:
+            query = query.filter(models.ContactModel.id > after_id)
+        return [_contact_from_row(row) for row in query.order_by(models.ContactModel.id).limit(limit)]
+    
+    def iter_contacts(self, filters: entities.ContactFilter, batch_size: int = 1000):
+        query = _filter_contacts(self.db.query(*CONTACT_COLUMNS), filters)
+        for row in query.order_by(models.ContactModel.id).yield_per(batch_size):
+            yield _contact_from_row(row)
+    
+    def get_by_ids(self, contact_ids) -> dict[int, entities.Contact]:
+        contacts = {}
+        for chunk in _chunks(list(set(contact_ids))):
+            for row in self.db.query(*CONTACT_COLUMNS).filter(models.ContactModel.id.in_(chunk)):
+                contacts[row.id] = _contact_from_row(row)
+        return contacts
+    
+    def get_by_dedupe_keys(self, dedupe_keys, created_from) -> dict[str, entities.Contact]:
+        contacts = {}
+        for chunk in _chunks(list(set(dedupe_keys))):
+            for row in self.db.execute(dedupe_query(chunk, created_from)):
+                contacts[row.dedupe_key] = _deduped_contact(row)
+        return contacts
+    
+    def purge_dedupe_keys(self, created_before) -> int:
+        removed = self.db.execute(dedupe_purge(created_before)).rowcount
+        self.db.commit()
+        return removed
+    
+    def update_statuses(self, contacts: list[entities.Contact], status: entities.ContactStatus) -> bool:
+        ids_by_status = {}
+        for contact in contacts:
+            ids_by_status.setdefault(contact.status, []).append(contact.id)
+        for old_status, contact_ids in ids_by_status.items():
+            for chunk in _chunks(contact_ids):
+                result = self.db.execute(
+                    update(models.ContactModel).where(
+                        models.ContactModel.id.in_(chunk),
+                        models.ContactModel.status == old_status.value
+                    ).values(status=status.value)
+                )
+                if result.rowcount != len(chunk):
+                    self.db.rollback()
+                    return False
+        deltas = count_rollups(contacts, delta=-1)
+        apply_rollups(self.db.connection(), count_rollups(contacts, deltas, status=status))
+        self.db.commit()
+        return True
+    
+    def count_unassigned(self) -> int:
+        return self.db.query(func.count(models.ContactModel.id)).filter(UNASSIGNED_CONTACTS).scalar()
+    
+    def get_unassigned_contacts(self, after_id, limit: int) -> list[entities.Contact]:
+        query = self.db.query(*CONTACT_COLUMNS).filter(UNASSIGNED_CONTACTS)
+        if after_id is not None:
+            query = query.filter(models.ContactModel.id > after_id)
+        return [_contact_from_row(row) for row in query.order_by(models.ContactModel.id).limit(limit)]
+    
+    def assign_operators(self, assignments: dict[int, int]) -> list[int]:
+        claimed = []
+        deltas = {}
+        for contact_id, operator_id in assignments.items():
+            row = self.db.execute(
+                update(models.ContactModel).where(
+                    models.ContactModel.id == contact_id,
+                    UNASSIGNED_CONTACTS
+                ).values(operator_id=operator_id).returning(
+                    models.ContactModel.source_id,
+                    models.ContactModel.status,
+                    models.ContactModel.created_at
+                )
+            ).first()
+            if row is not None:
+                claimed.append(contact_id)
+                contact = entities.Contact(
+                    source_id=row.source_id, status=entities.ContactStatus(row.status), created_at=row.created_at
+                )
+                count_rollups([contact], deltas, delta=-1)
+                count_rollups([contact], deltas, operator_id=operator_id)
+        apply_rollups(self.db.connection(), deltas)
+        self.db.commit()
+        return claimed
+
+class SQLContactStatsRepository(repositories.ContactStatsRepository):
+    def __init__(self, db: Session):
+        self.db = db
+    
+    def aggregate(self, filters: entities.ContactFilter, group_by) -> list[entities.ContactRollup]:
+        group_by = list(group_by)
+        unknown = set(group_by) - set(ROLLUP_GROUPS)
+        if unknown:
+            raise ValueError(f"Unknown rollup dimensions: {sorted(unknown)}")
+        hourly = "hour" in group_by or filters.created_from is not None or filters.created_to is not None
+        model = models.ContactRollupModel if hourly else models.ContactTotalModel
+        columns = [_rollup_column(model, dimension) for dimension in group_by]
+        total = func.sum(model.count)
+        query = _filter_rollups(self.db.query(*columns, total), model, filters).group_by(*columns).having(total != 0)
+        return [_rollup_from_row(group_by, row) for row in query.order_by(*columns)]
\ No newline at end of file
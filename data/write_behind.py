@@ -0,0 +1,370 @@
+import asyncio
+import datetime
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import replace
+from typing import Awaitable, Callable, Dict, Iterable, Iterator, List, Optional
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError
+from core import entities, repositories
+from . import models
+from .repository import _chunks, apply_dedupe_keys, apply_rollups, count_rollups
+
+logger = logging.getLogger(__name__)
+
+DURABILITY_LEVELS = ("none", "journal", "fsync")
+
+contacts_table = models.ContactModel.__table__
+
+def _journal_line(contact: entities.Contact) -> str:
+    return json.dumps({
+        "id": contact.id,
+        "lead_id": contact.lead_id,
+        "source_id": contact.source_id,
+        "operator_id": contact.operator_id,
+        "message": contact.message,
+        "status": contact.status.value,
+        "created_at": contact.created_at.isoformat(),
+        "dedupe_key": contact.dedupe_key
+    }) + "\n"
+
+def _contact_row(contact: entities.Contact) -> dict:
+    return {
+        "id": contact.id,
+        "lead_id": contact.lead_id,
+        "source_id": contact.source_id,
+        "operator_id": contact.operator_id,
+        "message": contact.message,
+        "status": contact.status.value,
+        "created_at": contact.created_at
+    }
+
+def read_journal(path: str) -> Iterator[entities.Contact]:
+    with open(path) as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except ValueError:
+                logger.warning("Skipping torn journal line in %s", path)
+                continue
+            yield entities.Contact(
+                id=row["id"],
+                lead_id=row["lead_id"],
+                source_id=row["source_id"],
+                operator_id=row["operator_id"],
+                message=row["message"],
+                status=entities.ContactStatus(row["status"]),
+                created_at=datetime.datetime.fromisoformat(row["created_at"]),
+                dedupe_key=row.get("dedupe_key")
+            )
+
+class ContactWriter:
+    def __init__(
+        self,
+        session_factory: Callable,
+        journal_path: Optional[str] = None,
+        durability: str = "journal",
+        flush_interval: float = 0.05,
+        batch_size: int = 500,
+        max_pending: int = 100000,
+        on_drop: Optional[Callable[[entities.Contact], None]] = None
+    ):
+        if durability not in DURABILITY_LEVELS:
+            raise ValueError(f"Unknown write-behind durability: {durability}")
+        if durability != "none" and not journal_path:
+            raise ValueError("Write-behind durability requires a journal path")
+        self._session_factory = session_factory
+        self.journal_path = journal_path
+        self.durability = durability
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self._on_drop = on_drop
+        self._pending: List[entities.Contact] = []
+        self._in_flight: List[entities.Contact] = []
+        self._condition = threading.Condition()
+        self._next_id = 0
+        self._journal = None
+        self._journal_sequence = 0
+        self._uncommitted_journals: List[str] = []
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.flushed = 0
+        self.flushes = 0
+        self.dropped = 0
+        self.last_flush_seconds = 0.0
+    
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self.recover()
+        if self.durability != "none":
+            self._journal = open(self.journal_path, "a")
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="contact-writer", daemon=True)
+        self._thread.start()
+    
+    def stop(self) -> None:
+        self._stopped.set()
+        with self._condition:
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+            if not self._uncommitted_journals and not self._pending and os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+    
+    def submit(self, contacts: List[entities.Contact]) -> List[entities.Contact]:
+        created_at = datetime.datetime.utcnow()
+        with self._condition:
+            while len(self._pending) >= self.max_pending and not self._stopped.is_set():
+                self._condition.notify_all()
+                self._condition.wait()
+            for contact in contacts:
+                self._next_id += 1
+                contact.id = self._next_id
+                contact.created_at = created_at
+            if self._journal is not None:
+                self._journal.write("".join(_journal_line(contact) for contact in contacts))
+                self._journal.flush()
+                if self.durability == "fsync":
+                    os.fsync(self._journal.fileno())
+            self._pending.extend(replace(contact) for contact in contacts)
+            if len(self._pending) >= self.batch_size:
+                self._condition.notify_all()
+        return contacts
+    
+    async def submit_async(self, contacts: List[entities.Contact]) -> List[entities.Contact]:
+        if self.durability == "fsync" or self._full():
+            return await asyncio.to_thread(self.submit, contacts)
+        return self.submit(contacts)
+    
+    def pending_counts(self) -> Dict[int, int]:
+        counts: Dict[int, int] = {}
+        with self._condition:
+            for contact in self._in_flight + self._pending:
+                if contact.operator_id is not None and contact.status != entities.ContactStatus.CLOSED:
+                    counts[contact.operator_id] = counts.get(contact.operator_id, 0) + 1
+        return counts
+    
+    def wait_stored(self, contact_ids: Iterable[int]) -> None:
+        contact_ids = list(contact_ids)
+        with self._condition:
+            while self._thread is not None and self._queued(contact_ids):
+                self._condition.notify_all()
+                self._condition.wait(self.flush_interval)
+    
+    def recover(self) -> int:
+        journals = self._journal_files()
+        recovered = 0
+        for path in journals:
+            recovered += self._replay(list(read_journal(path)))
+        db = self._session_factory()
+        try:
+            max_id = db.connection().execute(select(func.max(contacts_table.c.id))).scalar() or 0
+        finally:
+            db.close()
+        with self._condition:
+            self._next_id = max(self._next_id, max_id)
+        for path in journals:
+            os.remove(path)
+        if recovered:
+            logger.warning("Replayed %d contacts from the write-behind journal", recovered)
+        return recovered
+    
+    def stats(self) -> dict:
+        with self._condition:
+            pending = len(self._pending) + len(self._in_flight)
+        return {
+            "pending": pending,
+            "flushed": self.flushed,
+            "flushes": self.flushes,
+            "dropped": self.dropped,
+            "last_flush_seconds": self.last_flush_seconds
+        }
+    
+    def _full(self) -> bool:
+        with self._condition:
+            return len(self._pending) >= self.max_pending
+    
+    def _queued(self, contact_ids: List[int]) -> bool:
+        queued = self._in_flight or self._pending
+        return bool(queued) and any(queued[0].id <= contact_id <= self._next_id for contact_id in contact_ids)
+    
+    def _journal_files(self) -> List[str]:
+        if not self.journal_path:
+            return []
+        rotated = sorted(
+            (path for path in glob.glob(self.journal_path + ".*") if path.rsplit(".", 1)[1].isdigit()),
+            key=lambda path: int(path.rsplit(".", 1)[1])
+        )
+        return rotated + ([self.journal_path] if os.path.exists(self.journal_path) else [])
+    
+    def _replay(self, contacts: List[entities.Contact]) -> int:
+        db = self._session_factory()
+        try:
+            connection = db.connection()
+            existing = set()
+            for chunk in _chunks([contact.id for contact in contacts]):
+                existing.update(connection.execute(
+                    select(contacts_table.c.id).where(contacts_table.c.id.in_(chunk))
+                ).scalars())
+        finally:
+            db.close()
+        missing = [contact for contact in contacts if contact.id not in existing]
+        if missing:
+            self._store(missing)
+        return len(missing)
+    
+    def _rotate_journal(self) -> None:
+        if self._journal is None:
+            return
+        self._journal.close()
+        self._journal_sequence += 1
+        rotated = f"{self.journal_path}.{self._journal_sequence}"
+        os.replace(self.journal_path, rotated)
+        self._uncommitted_journals.append(rotated)
+        self._journal = open(self.journal_path, "a")
+    
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                if len(self._pending) < self.batch_size and not self._stopped.is_set():
+                    self._condition.wait(self.flush_interval)
+                batch, self._pending = self._pending, []
+                self._in_flight = batch
+                if batch:
+                    self._rotate_journal()
+                self._condition.notify_all()
+            flushed = self._flush(batch) if batch else True
+            if self._stopped.is_set() and (not flushed or not self._pending):
+                return
+    
+    def _flush(self, batch: List[entities.Contact]) -> bool:
+        started = time.perf_counter()
+        try:
+            self._store(batch)
+        except Exception:
+            logger.exception("Flushing %d contacts failed, will retry", len(batch))
+            with self._condition:
+                self._pending[:0] = batch
+                self._in_flight = []
+            self._stopped.wait(self.flush_interval)
+            return False
+        for path in self._uncommitted_journals:
+            os.remove(path)
+        self._uncommitted_journals = []
+        with self._condition:
+            self._in_flight = []
+            self._condition.notify_all()
+        self.flushed += len(batch)
+        self.flushes += 1
+        self.last_flush_seconds = time.perf_counter() - started
+        return True
+    
+    def _store(self, contacts: List[entities.Contact]) -> None:
+        try:
+            self._insert(contacts)
+        except IntegrityError:
+            for contact in contacts:
+                try:
+                    self._insert([contact])
+                except IntegrityError:
+                    logger.exception("Dropping contact %s that cannot be stored", contact.id)
+                    self.dropped += 1
+                    if self._on_drop is not None:
+                        self._on_drop(contact)
+    
+    def _insert(self, contacts: List[entities.Contact]) -> None:
+        db = self._session_factory()
+        try:
+            connection = db.connection()
+            for chunk in _chunks(contacts, self.batch_size):
+                connection.execute(insert(contacts_table), [_contact_row(contact) for contact in chunk])
+            apply_rollups(connection, count_rollups(contacts))
+            apply_dedupe_keys(connection, contacts)
+            db.commit()
+        finally:
+            db.close()
+
+class WriteBehindContactRepository(repositories.ContactRepository):
+    def __init__(self, inner: repositories.ContactRepository, writer: ContactWriter, commit: Callable[[], None]):
+        self.inner = inner
+        self.writer = writer
+        self.commit = commit
+    
+    def create(self, contact: entities.Contact) -> entities.Contact:
+        return self.writer.submit([contact])[0]
+    
+    def create_many(self, contacts: List[entities.Contact], commit: bool = True) -> List[entities.Contact]:
+        self.commit()
+        return self.writer.submit(contacts)
+    
+    def get_operator_active_contacts_count(self, operator_id: int) -> int:
+        return self.inner.get_operator_active_contacts_count(operator_id)
+    
+    def get_active_contacts_counts(self) -> Dict[int, int]:
+        return self.inner.get_active_contacts_counts()
+    
+    def get_contacts_by_lead(self, lead_id: int) -> List[entities.Contact]:
+        return self.inner.get_contacts_by_lead(lead_id)
+    
+    def list_contacts(self, filters: entities.ContactFilter, after_id: Optional[int], limit: int) -> List[entities.Contact]:
+        return self.inner.list_contacts(filters, after_id, limit)
+    
+    def iter_contacts(self, filters: entities.ContactFilter, batch_size: int = 1000) -> Iterator[entities.Contact]:
+        return self.inner.iter_contacts(filters, batch_size)
+    
+    def get_by_ids(self, contact_ids: Iterable[int]) -> Dict[int, entities.Contact]:
+        contact_ids = list(contact_ids)
+        self.writer.wait_stored(contact_ids)
+        return self.inner.get_by_ids(contact_ids)
+    
+    def get_by_dedupe_keys(self, dedupe_keys: Iterable[str], created_from: datetime.datetime) -> Dict[str, entities.Contact]:
+        return self.inner.get_by_dedupe_keys(dedupe_keys, created_from)
+    
+    def purge_dedupe_keys(self, created_before: datetime.datetime) -> int:
+        return self.inner.purge_dedupe_keys(created_before)
+    
+    def update_statuses(self, contacts: List[entities.Contact], status: entities.ContactStatus) -> bool:
+        return self.inner.update_statuses(contacts, status)
+    
+    def count_unassigned(self) -> int:
+        return self.inner.count_unassigned()
+    
+    def get_unassigned_contacts(self, after_id: Optional[int], limit: int) -> List[entities.Contact]:
+        return self.inner.get_unassigned_contacts(after_id, limit)
+    
+    def assign_operators(self, assignments: Dict[int, int]) -> List[int]:
+        return self.inner.assign_operators(assignments)
+
+class AsyncWriteBehindContactRepository(repositories.AsyncContactRepository):
+    def __init__(
+        self,
+        inner: repositories.AsyncContactRepository,
+        writer: ContactWriter,
+        commit: Callable[[], Awaitable[None]]
+    ):
+        self.inner = inner
+        self.writer = writer
+        self.commit = commit
+    
+    async def create(self, contact: entities.Contact) -> entities.Contact:
+        return (await self.writer.submit_async([contact]))[0]
+    
+    async def create_many(self, contacts: List[entities.Contact], commit: bool = True) -> List[entities.Contact]:
+        await self.commit()
+        return await self.writer.submit_async(contacts)
+    
+    async def get_by_dedupe_keys(self, dedupe_keys: Iterable[str], created_from: datetime.datetime) -> Dict[str, entities.Contact]:
+        return await self.inner.get_by_dedupe_keys(dedupe_keys, created_from)
+    
+    async def purge_dedupe_keys(self, created_before: datetime.datetime) -> int:
+        return await self.inner.purge_dedupe_keys(created_before)
\ No newline at end of file
@@ -1,16 +1,188 @@
-from fastapi import FastAPI
-from data.database import engine, Base
-from api.endpoints import router
+import sys
+from typing import Optional
+from config import Settings, configure, settings
+import metrics
 
-Base.metadata.create_all(bind=engine)
+def collect_runtime_metrics():
+    from api.dependencies import contact_dedupe, contact_writer, lead_affinity, lead_cache, redistributor, weight_cache, get_pool_metrics
+    
+    pools = {name: pool.snapshot() for name, pool in get_pool_metrics().items() if pool is not None}
+    lines = []
+    for name, key, metric_type, description in (
+        ("crm_db_pool_checkouts_total", "checkouts", "counter", "Connections checked out of the pool"),
+        ("crm_db_pool_in_use", "in_use", "gauge", "Connections currently checked out"),
+        ("crm_db_pool_wait_seconds_total", "wait_seconds_total", "counter", "Time spent waiting for a pooled connection"),
+        ("crm_db_pool_wait_seconds_max", "wait_seconds_max", "gauge", "Longest wait for a pooled connection")
+    ):
+        lines.extend(metrics.sample_lines(name, description, metric_type, {
+            (("pool", pool_name),): snapshot[key] for pool_name, snapshot in pools.items()
+        }))
+    if weight_cache is not None:
+        stats = weight_cache.stats()
+        for key in ("hits", "misses", "revalidations", "evictions"):
+            lines.extend(metrics.sample_lines(
+                f"crm_weight_cache_{key}_total", f"Source weight cache {key}", "counter", {(): stats[key]}
+            ))
+        lines.extend(metrics.sample_lines(
+            "crm_weight_cache_sources", "Sources held in the weight cache", "gauge", {(): stats["sources"]}
+        ))
+    if lead_cache is not None:
+        stats = lead_cache.stats()
+        for key in ("hits", "misses"):
+            lines.extend(metrics.sample_lines(
+                f"crm_lead_cache_{key}_total", f"Lead identity cache {key}", "counter", {(): stats[key]}
+            ))
+        lines.extend(metrics.sample_lines(
+            "crm_lead_cache_size", "Leads held in the identity cache", "gauge", {(): stats["size"]}
+        ))
+    if lead_affinity is not None:
+        stats = lead_affinity.stats()
+        for key, description in (
+            ("hits", "Returning leads with a remembered operator"),
+            ("misses", "Leads without a remembered operator"),
+            ("switches", "Leads moved to another operator than the remembered one"),
+            ("expirations", "Lead affinities dropped after their TTL"),
+            ("evictions", "Lead affinities evicted by size")
+        ):
+            lines.extend(metrics.sample_lines(
+                f"crm_lead_affinity_{key}_total", description, "counter", {(): stats[key]}
+            ))
+        lines.extend(metrics.sample_lines(
+            "crm_lead_affinity_size", "Leads held in the affinity index", "gauge", {(): stats["size"]}
+        ))
+    if contact_dedupe is not None:
+        stats = contact_dedupe.stats()
+        for key, description in (
+            ("hits", "Retried contacts answered from the dedupe index"),
+            ("misses", "Dedupe keys not found in the index"),
+            ("fallback_hits", "Retried contacts found in the dedupe table"),
+            ("expirations", "Dedupe keys dropped after the window"),
+            ("evictions", "Dedupe keys evicted by size")
+        ):
+            lines.extend(metrics.sample_lines(
+                f"crm_contact_dedupe_{key}_total", description, "counter", {(): stats[key]}
+            ))
+        lines.extend(metrics.sample_lines(
+            "crm_contact_dedupe_size", "Dedupe keys held in the index", "gauge", {(): stats["size"]}
+        ))
+    if redistributor is not None:
+        stats = redistributor.stats()
+        lines.extend(metrics.sample_lines(
+            "crm_unassigned_contacts", "Contacts waiting for an operator", "gauge", {(): stats["backlog"]}
+        ))
+        lines.extend(metrics.sample_lines(
+            "crm_redistributed_contacts_total", "Unassigned contacts assigned by the redistribution worker",
+            "counter", {(): stats["assigned_total"]}
+        ))
+        lines.extend(metrics.sample_lines(
+            "crm_redistribution_drain_rate", "Contacts assigned per second over the last five minutes",
+            "gauge", {(): stats["drain_rate"]}
+        ))
+    if contact_writer is not None:
+        stats = contact_writer.stats()
+        lines.extend(metrics.sample_lines(
+            "crm_write_behind_pending", "Contacts accepted but not yet committed", "gauge", {(): stats["pending"]}
+        ))
+        for key, description in (
+            ("flushed", "Contacts committed by the write-behind writer"),
+            ("flushes", "Group commits made by the write-behind writer"),
+            ("dropped", "Contacts the write-behind writer could not store")
+        ):
+            lines.extend(metrics.sample_lines(
+                f"crm_write_behind_{key}_total", description, "counter", {(): stats[key]}
+            ))
+    return lines
 
-app = FastAPI(title="Lead Distribution CRM", version="1.0.0")
-app.include_router(router, prefix="/api/v1")
+def create_app(app_settings: Optional[Settings] = None):
+    if app_settings is not None and app_settings != settings:
+        if "data.database" in sys.modules or "api.dependencies" in sys.modules:
+            raise RuntimeError("Settings must be passed to create_app before the application modules are imported")
+        configure(app_settings)
+    
+    from fastapi import FastAPI
+    from fastapi.responses import PlainTextResponse
+    from data.database import async_engine
+    from api.endpoints import router
+    from api.dependencies import check_shared_state_slots, contact_writer, load_tracker, redistributor
+    from api.middleware import MetricsMiddleware
+    if settings.async_mode:
+        from api.async_endpoints import contacts_router
+    else:
+        from api.endpoints import contacts_router
+    
+    app = FastAPI(title="Lead Distribution CRM", version="1.0.0")
+    app.include_router(contacts_router, prefix="/api/v1")
+    app.include_router(router, prefix="/api/v1")
+    
+    if settings.metrics:
+        app.add_middleware(MetricsMiddleware, slow_request_threshold_ms=settings.slow_request_threshold_ms)
+        metrics.registry.register_collector(collect_runtime_metrics)
+        
+        @app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+        def get_metrics():
+            return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+    
+    @app.on_event("startup")
+    def create_database_schema():
+        from data.migrations import check_schema, create_schema
+        
+        if settings.create_schema:
+            create_schema()
+        else:
+            check_schema()
+    
+    @app.on_event("startup")
+    def check_shared_state():
+        check_shared_state_slots()
+    
+    @app.on_event("startup")
+    def start_contact_writer():
+        if contact_writer:
+            contact_writer.start()
+    
+    @app.on_event("startup")
+    def start_load_tracker():
+        if load_tracker:
+            load_tracker.start()
+    
+    @app.on_event("startup")
+    def start_redistributor():
+        if redistributor:
+            redistributor.start()
+    
+    @app.on_event("shutdown")
+    def stop_redistributor():
+        if redistributor:
+            redistributor.stop()
+    
+    @app.on_event("shutdown")
+    def stop_load_tracker():
+        if load_tracker:
+            load_tracker.stop()
+    
+    @app.on_event("shutdown")
+    def stop_contact_writer():
+        if contact_writer:
+            contact_writer.stop()
+    
+    @app.on_event("shutdown")
+    async def dispose_async_engine():
+        if async_engine is not None:
+            await async_engine.dispose()
+    
+    @app.get("/")
+    def read_root():
+        return {"message": "Lead Distribution CRM API"}
+    
+    return app
 
-@app.get("/")
-def read_root():
-    return {"message": "Lead Distribution CRM API"}
+def __getattr__(name: str):
+    if name == "app":
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    uvicorn.run(create_app(), host="0.0.0.0", port=8000)
\ No newline at end of file
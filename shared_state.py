@@ -0,0 +1,193 @@
+import fcntl
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from array import array
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+LOCK_STRIPES = 64
+SLOT = struct.Struct("q")
+OPERATOR_LOAD = "operator_load"
+WEIGHT_GENERATIONS = "weight_generations"
+SEGMENT_KINDS = (OPERATOR_LOAD, WEIGHT_GENERATIONS)
+
+class CounterStore(ABC):
+    fields = 1
+    
+    @abstractmethod
+    def get(self, key: int, field: int = 0) -> int:
+        pass
+    
+    @abstractmethod
+    def add(self, key: int, delta: int = 1, field: int = 0) -> int:
+        pass
+    
+    @abstractmethod
+    def try_increment(self, key: int, limit: int) -> bool:
+        pass
+    
+    @abstractmethod
+    def update(self, key: int, change: Callable[[List[int]], List[int]]) -> List[int]:
+        pass
+    
+    @abstractmethod
+    def values(self, field: int = 0) -> Dict[int, int]:
+        pass
+    
+    def try_lead(self) -> bool:
+        return True
+    
+    def close(self) -> None:
+        pass
+
+class LocalCounterStore(CounterStore):
+    def __init__(self, fields: int = 1):
+        self.fields = fields
+        self._values: Dict[int, List[int]] = {}
+        self._locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+    
+    def get(self, key: int, field: int = 0) -> int:
+        values = self._values.get(key)
+        return values[field] if values is not None else 0
+    
+    def add(self, key: int, delta: int = 1, field: int = 0) -> int:
+        with self._locks[key % LOCK_STRIPES]:
+            values = self._slot(key)
+            values[field] = max(values[field] + delta, 0)
+            return values[field]
+    
+    def try_increment(self, key: int, limit: int) -> bool:
+        with self._locks[key % LOCK_STRIPES]:
+            values = self._slot(key)
+            if values[0] >= limit:
+                return False
+            values[0] += 1
+            return True
+    
+    def update(self, key: int, change: Callable[[List[int]], List[int]]) -> List[int]:
+        with self._locks[key % LOCK_STRIPES]:
+            values = self._slot(key)
+            values[:] = change(list(values))
+            return list(values)
+    
+    def values(self, field: int = 0) -> Dict[int, int]:
+        return {key: values[field] for key, values in list(self._values.items()) if values[field]}
+    
+    def _slot(self, key: int) -> List[int]:
+        values = self._values.get(key)
+        if values is None:
+            values = self._values[key] = [0] * self.fields
+        return values
+
+class SharedMemoryCounterStore(CounterStore):
+    def __init__(self, name: str, slots: int, lock_dir: Optional[str] = None, fields: int = 1):
+        from multiprocessing import resource_tracker, shared_memory
+        
+        size = slots * fields * SLOT.size
+        try:
+            self._segment = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            self._segment = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(self._segment._name, "shared_memory")
+        if not size <= self._segment.size < size + mmap.PAGESIZE:
+            self._segment.close()
+            raise ValueError(
+                f"Shared segment {name} does not hold {slots} slots of {fields} counters, remove it with python -m shared_state"
+            )
+        self.name = name
+        self.slots = slots
+        self.fields = fields
+        self._lock_file = open(os.path.join(lock_dir or tempfile.gettempdir(), f"{name}.lock"), "a+b")
+        self._thread_locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self._leading = False
+    
+    def get(self, key: int, field: int = 0) -> int:
+        return SLOT.unpack_from(self._segment.buf, self._offset(key, field))[0]
+    
+    def add(self, key: int, delta: int = 1, field: int = 0) -> int:
+        offset = self._offset(key, field)
+        with self._locked(key % LOCK_STRIPES):
+            value = max(SLOT.unpack_from(self._segment.buf, offset)[0] + delta, 0)
+            SLOT.pack_into(self._segment.buf, offset, value)
+            return value
+    
+    def try_increment(self, key: int, limit: int) -> bool:
+        offset = self._offset(key)
+        with self._locked(key % LOCK_STRIPES):
+            value = SLOT.unpack_from(self._segment.buf, offset)[0]
+            if value >= limit:
+                return False
+            SLOT.pack_into(self._segment.buf, offset, value + 1)
+            return True
+    
+    def update(self, key: int, change: Callable[[List[int]], List[int]]) -> List[int]:
+        offset = self._offset(key)
+        layout = struct.Struct(f"{self.fields}q")
+        with self._locked(key % LOCK_STRIPES):
+            values = change(list(layout.unpack_from(self._segment.buf, offset)))
+            layout.pack_into(self._segment.buf, offset, *values)
+            return values
+    
+    def values(self, field: int = 0) -> Dict[int, int]:
+        snapshot = array("q", bytes(self._segment.buf[:self.slots * self.fields * SLOT.size]))
+        return {key: value for key, value in enumerate(snapshot[field::self.fields]) if value}
+    
+    def try_lead(self) -> bool:
+        if not self._leading:
+            try:
+                fcntl.lockf(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB, 1, LOCK_STRIPES)
+            except OSError:
+                return False
+            self._leading = True
+        return True
+    
+    def close(self) -> None:
+        self._segment.close()
+        self._lock_file.close()
+        self._leading = False
+    
+    def _offset(self, key: int, field: int = 0) -> int:
+        if not 0 <= key < self.slots:
+            raise ValueError(
+                f"Id {key} does not fit shared segment {self.name} of {self.slots} slots, raise CRM_SHARED_STATE_SLOTS"
+            )
+        return (key * self.fields + field) * SLOT.size
+    
+    @contextmanager
+    def _locked(self, stripe: int):
+        with self._thread_locks[stripe]:
+            fcntl.lockf(self._lock_file, fcntl.LOCK_EX, 1, stripe)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self._lock_file, fcntl.LOCK_UN, 1, stripe)
+
+def segment_name(prefix: str, kind: str) -> str:
+    return f"{prefix}_{kind}"
+
+def unlink_segments(prefix: str, lock_dir: Optional[str] = None) -> list:
+    from multiprocessing import shared_memory
+    
+    removed = []
+    for kind in SEGMENT_KINDS:
+        name = segment_name(prefix, kind)
+        try:
+            segment = shared_memory.SharedMemory(name=name)
+        except FileNotFoundError:
+            continue
+        segment.close()
+        segment.unlink()
+        lock_path = os.path.join(lock_dir or tempfile.gettempdir(), f"{name}.lock")
+        if os.path.exists(lock_path):
+            os.remove(lock_path)
+        removed.append(name)
+    return removed
+
+if __name__ == "__main__":
+    import sys
+    for name in unlink_segments(sys.argv[1] if len(sys.argv) > 1 else "crm"):
+        print(f"removed {name}")
\ No newline at end of file
@@ -0,0 +1,92 @@
+import argparse
+import datetime
+import json
+import sys
+from dataclasses import asdict
+from typing import Dict, List
+from core import entities
+from app.simulation import build_scenario, recorded_stream, simulate, synthetic_stream
+
+def _pairs(values: List[str], cast) -> Dict[int, object]:
+    pairs = {}
+    for value in values:
+        key, _, item = value.partition("=")
+        pairs[int(key)] = cast(item)
+    return pairs
+
+def _proposed_weights(source_id: int, path: str) -> List[entities.OperatorSourceWeight]:
+    with open(path) as f:
+        payload = json.load(f)
+    return [
+        entities.OperatorSourceWeight(operator_id=item["operator_id"], source_id=source_id, weight=item["weight"])
+        for item in payload["weights"]
+    ]
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Replay a contact stream against operators, weights and capacities")
+    parser.add_argument("--weights", action="append", default=[], metavar="SOURCE_ID=PATH",
+                        help="proposed weights for a source in the PUT /sources/{id}/weights body format")
+    parser.add_argument("--replay-from", type=datetime.datetime.fromisoformat,
+                        help="replay contacts recorded since this time instead of a synthetic stream")
+    parser.add_argument("--replay-to", type=datetime.datetime.fromisoformat)
+    parser.add_argument("--contacts", type=int, default=1000000, help="synthetic stream size")
+    parser.add_argument("--duration", type=float, default=86400.0, help="synthetic stream length in seconds")
+    parser.add_argument("--source-share", action="append", default=[], metavar="SOURCE_ID=SHARE",
+                        help="synthetic traffic share of a source, sources with weights share equally by default")
+    parser.add_argument("--handle-time", type=float, default=1800.0, help="mean seconds until a contact is closed")
+    parser.add_argument("--operator-handle-time", action="append", default=[], metavar="OPERATOR_ID=SECONDS")
+    parser.add_argument("--empty", action="store_true", help="start with no active contacts instead of the current load")
+    parser.add_argument("--tick", type=float, default=60.0, help="simulation step in seconds")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args(argv)
+    
+    from data.database import SessionLocal
+    from data.repository import (
+        SQLContactRepository, SQLOperatorRepository, SQLOperatorSourceWeightRepository, SQLSourceRepository
+    )
+    
+    proposed = _pairs(args.weights, str)
+    db = SessionLocal()
+    try:
+        weight_repo = SQLOperatorSourceWeightRepository(db)
+        contact_repo = SQLContactRepository(db)
+        weights_by_source = {
+            source.id: weight_repo.get_weights_for_source(source.id) for source in SQLSourceRepository(db).get_all()
+        }
+        for source_id, path in proposed.items():
+            weights_by_source[source_id] = _proposed_weights(source_id, path)
+        scenario = build_scenario(
+            SQLOperatorRepository(db).get_active_operators(),
+            weights_by_source,
+            None if args.empty else contact_repo.get_active_contacts_counts()
+        )
+        if args.replay_from is not None:
+            stream = recorded_stream(contact_repo.iter_contacts(
+                entities.ContactFilter(created_from=args.replay_from, created_to=args.replay_to), batch_size=10000
+            ))
+        else:
+            shares = _pairs(args.source_share, float) or {
+                source_id: 1.0 for source_id, candidates in scenario.items() if candidates
+            }
+            stream = synthetic_stream(args.contacts, args.duration, shares, args.seed)
+    finally:
+        db.close()
+    
+    result = simulate(
+        scenario,
+        stream,
+        mean_handle_seconds=args.handle_time,
+        handle_seconds=_pairs(args.operator_handle_time, float),
+        tick_seconds=args.tick,
+        seed=args.seed
+    )
+    report = json.dumps(asdict(result), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+    else:
+        sys.stdout.write(report + "\n")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
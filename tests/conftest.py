@@ -0,0 +1,28 @@
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from data import models
+from data.database import Base
+
+SOURCE_ID = 1
+OPERATORS = 5
+MAX_ACTIVE_LEADS = 3
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'leads.db'}", connect_args={"check_same_thread": False, "timeout": 30}
+    )
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        connection.execute(insert(models.SourceModel), [{"id": SOURCE_ID, "name": "bot"}])
+        connection.execute(insert(models.OperatorModel), [
+            {"id": operator_id, "name": f"operator-{operator_id}", "status": "active", "max_active_leads": MAX_ACTIVE_LEADS}
+            for operator_id in range(1, OPERATORS + 1)
+        ])
+        connection.execute(insert(models.OperatorSourceWeightModel), [
+            {"operator_id": operator_id, "source_id": SOURCE_ID, "weight": operator_id * 10}
+            for operator_id in range(1, OPERATORS + 1)
+        ])
+    yield sessionmaker(autoflush=False, bind=engine)
+    engine.dispose()
\ No newline at end of file
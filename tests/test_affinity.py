@@ -0,0 +1,75 @@
+from app.affinity import LeadAffinityIndex
+from app.load_tracker import OperatorLoadTracker
+from app.sampler import SamplerRegistry
+from app.use_cases import ContactStatusUseCase, LeadDistributionUseCase
+from core import entities
+from data.repository import (
+    SQLContactRepository, SQLLeadRepository, SQLOperatorRepository, SQLOperatorSourceWeightRepository,
+    SQLSourceRepository
+)
+from conftest import MAX_ACTIVE_LEADS, SOURCE_ID
+
+def _contact(contact_id: int, lead_id: int, operator_id, status=entities.ContactStatus.NEW) -> entities.Contact:
+    return entities.Contact(id=contact_id, lead_id=lead_id, source_id=SOURCE_ID, operator_id=operator_id, status=status)
+
+def _distribution(db, affinity: LeadAffinityIndex, tracker: OperatorLoadTracker) -> LeadDistributionUseCase:
+    return LeadDistributionUseCase(
+        lead_repo=SQLLeadRepository(db),
+        operator_repo=SQLOperatorRepository(db),
+        source_repo=SQLSourceRepository(db),
+        weight_repo=SQLOperatorSourceWeightRepository(db),
+        contact_repo=SQLContactRepository(db),
+        load_tracker=tracker,
+        samplers=SamplerRegistry(),
+        affinity=affinity
+    )
+
+def _tracker(db) -> OperatorLoadTracker:
+    tracker = OperatorLoadTracker(SQLContactRepository(db).get_active_contacts_counts, reconcile_interval=0)
+    tracker.start()
+    return tracker
+
+def test_newer_contact_wins_and_entries_expire():
+    now = [0.0]
+    affinity = LeadAffinityIndex(ttl=10, clock=lambda: now[0])
+    affinity.remember([_contact(2, 1, 3), _contact(1, 1, 4), _contact(3, 2, None)])
+    assert affinity.get_many([1, 2]) == {1: 3}
+    affinity.remember([_contact(5, 1, 4)])
+    assert affinity.get(1) == 4
+    affinity.forget([_contact(2, 1, 3)])
+    assert affinity.get(1) == 4
+    now[0] = 10.0
+    assert affinity.get(1) is None
+    assert affinity.stats()["switches"] == 1
+    assert affinity.stats()["expirations"] == 1
+
+def test_closed_contacts_are_forgotten_and_lru_evicts():
+    affinity = LeadAffinityIndex(max_size=2)
+    affinity.remember([_contact(1, 1, 1), _contact(2, 2, 2), _contact(3, 3, 3)])
+    assert affinity.get_many([1, 2, 3]) == {2: 2, 3: 3}
+    affinity.remember([_contact(4, 2, 2, entities.ContactStatus.CLOSED)])
+    affinity.forget([_contact(2, 2, 2)])
+    assert affinity.get(2) is None
+    assert affinity.stats()["evictions"] == 1
+
+def test_returning_lead_goes_to_its_current_operator(session_factory):
+    affinity = LeadAffinityIndex()
+    db = session_factory()
+    try:
+        tracker = _tracker(db)
+        first = _distribution(db, affinity, tracker).create_contact("lead-1", SOURCE_ID)
+        following = [
+            _distribution(db, affinity, tracker).create_contact("lead-1", SOURCE_ID)
+            for _ in range(MAX_ACTIVE_LEADS - 1)
+        ]
+        batch = _distribution(db, affinity, tracker).create_contacts([("lead-1", SOURCE_ID, None)])
+        assert [contact.operator_id for contact in following] == [first.operator_id] * (MAX_ACTIVE_LEADS - 1)
+        assert batch[0].operator_id not in (None, first.operator_id)
+        assert affinity.get(first.lead_id) == batch[0].operator_id
+        
+        ContactStatusUseCase(SQLContactRepository(db), load_tracker=tracker, affinity=affinity).update_status(
+            batch[0].id, entities.ContactStatus.CLOSED
+        )
+        assert affinity.get(first.lead_id) is None
+    finally:
+        db.close()
\ No newline at end of file
@@ -0,0 +1,51 @@
+import asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from app.affinity import LeadAffinityIndex
+from app.async_use_cases import AsyncLeadDistributionUseCase
+from app.dedupe import ContactDedupeIndex
+from app.load_tracker import OperatorLoadTracker
+from app.sampler import SamplerRegistry
+from data.async_repository import AsyncSQLContactRepository, AsyncSQLLeadRepository, AsyncSQLOperatorSourceWeightRepository
+from data.repository import SQLContactRepository
+from conftest import MAX_ACTIVE_LEADS, OPERATORS, SOURCE_ID
+
+def test_async_distribution_follows_the_sync_rules(session_factory, tmp_path):
+    db = session_factory()
+    tracker = OperatorLoadTracker(SQLContactRepository(db).get_active_contacts_counts, reconcile_interval=0)
+    tracker.start()
+    affinity = LeadAffinityIndex()
+    
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'leads.db'}")
+        try:
+            async with AsyncSession(engine) as session:
+                use_case = AsyncLeadDistributionUseCase(
+                    lead_repo=AsyncSQLLeadRepository(session),
+                    weight_repo=AsyncSQLOperatorSourceWeightRepository(session),
+                    contact_repo=AsyncSQLContactRepository(session),
+                    load_tracker=tracker,
+                    samplers=SamplerRegistry(),
+                    affinity=affinity,
+                    dedupe=ContactDedupeIndex()
+                )
+                first = await use_case.create_contact("lead-1", SOURCE_ID, "hi", idempotency_key="retry-1")
+                retried = await use_case.create_contact("lead-1", SOURCE_ID, "bye", idempotency_key="retry-1")
+                returning = await use_case.create_contact("lead-1", SOURCE_ID, "again")
+                batch = await use_case.create_contacts(
+                    [(f"lead-{number}", SOURCE_ID, "hi") for number in range(2, OPERATORS * MAX_ACTIVE_LEADS + 2)]
+                )
+                return first, retried, returning, batch
+        finally:
+            await engine.dispose()
+    
+    try:
+        first, retried, returning, batch = asyncio.run(run())
+        assert retried.id == first.id
+        assert returning.operator_id == first.operator_id and returning.id != first.id
+        assert sum(contact.operator_id is None for contact in batch) == 2
+        tracker.reconcile()
+        counts = SQLContactRepository(db).get_active_contacts_counts()
+        assert counts == {operator_id: MAX_ACTIVE_LEADS for operator_id in range(1, OPERATORS + 1)}
+        assert {operator_id: tracker.get(operator_id) for operator_id in counts} == counts
+    finally:
+        db.close()
\ No newline at end of file
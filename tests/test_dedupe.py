@@ -0,0 +1,79 @@
+import random
+import threading
+from sqlalchemy import func, select
+from app.dedupe import ContactDedupeIndex, dedupe_key
+from app.sampler import SamplerRegistry
+from app.use_cases import LeadDistributionUseCase
+from data import models
+from data.repository import (
+    SQLContactRepository, SQLLeadRepository, SQLOperatorRepository, SQLOperatorSourceWeightRepository,
+    SQLSourceRepository
+)
+from conftest import SOURCE_ID
+
+THREADS = 8
+ROUNDS = 10
+
+def test_idempotency_key_is_scoped_to_the_lead():
+    assert dedupe_key("lead-1", SOURCE_ID, "hi", "retry-1") == dedupe_key("lead-1", SOURCE_ID, "bye", "retry-1")
+    assert dedupe_key("lead-1", SOURCE_ID, "hi", "retry-1") != dedupe_key("lead-2", SOURCE_ID, "hi", "retry-1")
+
+def _distribution(db, dedupe: ContactDedupeIndex) -> LeadDistributionUseCase:
+    return LeadDistributionUseCase(
+        lead_repo=SQLLeadRepository(db),
+        operator_repo=SQLOperatorRepository(db),
+        source_repo=SQLSourceRepository(db),
+        weight_repo=SQLOperatorSourceWeightRepository(db),
+        contact_repo=SQLContactRepository(db),
+        samplers=SamplerRegistry(),
+        dedupe=dedupe
+    )
+
+def test_retry_on_another_worker_finds_the_original(session_factory):
+    now = [0.0]
+    workers = [ContactDedupeIndex(window=60, clock=lambda: now[0]) for _ in range(2)]
+    db = session_factory()
+    try:
+        original = _distribution(db, workers[0]).create_contact("lead-1", SOURCE_ID, "hi", idempotency_key="retry-1")
+        now[0] = 120.0
+        retried = _distribution(db, workers[1]).create_contact("lead-1", SOURCE_ID, "hi", idempotency_key="retry-1")
+        batch = _distribution(db, workers[1]).create_contacts([("lead-1", SOURCE_ID, "hi")], ["retry-1"])
+        assert db.execute(select(func.count(models.ContactModel.id))).scalar() == 1
+    finally:
+        db.close()
+    assert retried.id == batch[0].id == original.id
+    assert retried.operator_id == original.operator_id
+    assert workers[1].stats()["fallback_hits"] == 1
+
+def test_concurrent_batches_create_each_contact_once(session_factory):
+    dedupe = ContactDedupeIndex()
+    items = [(f"lead-{number}", SOURCE_ID, "hi") for number in range(5)]
+    errors = []
+    
+    def submit(thread: int) -> None:
+        shuffled = random.Random(thread).sample(items, len(items))
+        for _ in range(ROUNDS):
+            db = session_factory()
+            try:
+                use_case = _distribution(db, dedupe)
+                if thread % 2:
+                    use_case.create_contact(*shuffled[0])
+                else:
+                    use_case.create_contacts(shuffled)
+            except Exception as error:
+                errors.append(error)
+            finally:
+                db.close()
+    
+    workers = [threading.Thread(target=submit, args=(thread,)) for thread in range(THREADS)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    
+    assert errors == []
+    db = session_factory()
+    try:
+        assert db.execute(select(func.count(models.ContactModel.id))).scalar() == len(items)
+    finally:
+        db.close()
\ No newline at end of file
@@ -0,0 +1,279 @@
+import subprocess
+import sys
+import threading
+import uuid
+from functools import partial
+from pathlib import Path
+import pytest
+from sqlalchemy import func, select
+from app.load_tracker import LOAD_FIELDS, OperatorLoadTracker
+from app.sampler import SamplerRegistry
+from app.use_cases import ContactStatusUseCase, LeadDistributionUseCase
+from core import entities
+from data import models
+from data.repository import (
+    ACTIVE_CONTACT_STATUSES, SQLContactRepository, SQLLeadRepository, SQLOperatorRepository,
+    SQLOperatorSourceWeightRepository, SQLSourceRepository
+)
+from shared_state import LocalCounterStore, SharedMemoryCounterStore, unlink_segments
+from conftest import MAX_ACTIVE_LEADS, OPERATORS, SOURCE_ID
+
+THREADS = 16
+CONTACTS_PER_THREAD = 20
+BATCH_SIZE = 5
+FOLLOWER = """
+import sys
+from app.load_tracker import LOAD_FIELDS
+from shared_state import SharedMemoryCounterStore
+store = SharedMemoryCounterStore(sys.argv[1], 16, lock_dir=sys.argv[2], fields=LOAD_FIELDS)
+print(store.try_lead())
+store.close()
+"""
+
+@pytest.fixture(params=["local", "shared_memory"])
+def store(request, tmp_path):
+    if request.param == "local":
+        yield LocalCounterStore(LOAD_FIELDS)
+        return
+    prefix = f"crm_test_{uuid.uuid4().hex[:8]}"
+    store = SharedMemoryCounterStore(f"{prefix}_operator_load", 16, lock_dir=str(tmp_path), fields=LOAD_FIELDS)
+    yield store
+    store.close()
+    unlink_segments(prefix, lock_dir=str(tmp_path))
+
+def test_reconcile_keeps_in_flight_reservations(store):
+    committed = {}
+    tracker = OperatorLoadTracker(lambda: dict(committed), reconcile_interval=0, store=store)
+    assert tracker.try_reserve(1, 3)
+    assert tracker.try_reserve(1, 3)
+    tracker.reconcile()
+    assert tracker.get(1) == 2
+    
+    committed[1] = 1
+    tracker.settle(1)
+    tracker.reconcile()
+    assert tracker.get(1) == 2
+    assert tracker.try_reserve(1, 3)
+    assert not tracker.try_reserve(1, 3)
+    
+    tracker.release(1)
+    tracker.release(1)
+    tracker.reconcile()
+    assert tracker.get(1) == 1
+
+def test_reconcile_counts_contacts_settled_during_the_query(store):
+    committed = {}
+    tracker = OperatorLoadTracker(lambda: dict(committed), reconcile_interval=0, store=store)
+    
+    def load_counts():
+        counts = dict(committed)
+        committed[1] = 1
+        tracker.settle(1)
+        return counts
+    
+    tracker._load_counts = load_counts
+    assert tracker.try_reserve(1, 1)
+    tracker.reconcile()
+    assert tracker.get(1) == 1
+    assert not tracker.try_reserve(1, 1)
+
+def test_reconcile_does_not_count_a_close_twice(store):
+    committed = {1: 2}
+    tracker = OperatorLoadTracker(lambda: dict(committed), reconcile_interval=0, store=store)
+    tracker.reconcile()
+    tracker.begin_close(1)
+    committed[1] = 1
+    tracker.reconcile()
+    tracker.end_close(1)
+    assert tracker.get(1) >= 1
+    tracker.reconcile()
+    assert tracker.get(1) == 1
+    
+    tracker.begin_close(1)
+    tracker.end_close(1, closed=False)
+    tracker.reconcile()
+    assert tracker.get(1) == 1
+
+def test_shared_memory_rejects_a_segment_with_another_layout(tmp_path):
+    prefix = f"crm_test_{uuid.uuid4().hex[:8]}"
+    store = SharedMemoryCounterStore(f"{prefix}_operator_load", 4096, lock_dir=str(tmp_path), fields=LOAD_FIELDS - 1)
+    try:
+        with pytest.raises(ValueError, match="does not hold"):
+            SharedMemoryCounterStore(f"{prefix}_operator_load", 4096, lock_dir=str(tmp_path), fields=LOAD_FIELDS)
+    finally:
+        store.close()
+        unlink_segments(prefix, lock_dir=str(tmp_path))
+
+def test_shared_memory_rejects_ids_beyond_its_slots(tmp_path):
+    prefix = f"crm_test_{uuid.uuid4().hex[:8]}"
+    store = SharedMemoryCounterStore(f"{prefix}_operator_load", 16, lock_dir=str(tmp_path), fields=LOAD_FIELDS)
+    tracker = OperatorLoadTracker(dict, reconcile_interval=0, store=store)
+    try:
+        for call in (tracker.get, tracker.release, tracker.settle, partial(tracker.try_reserve, max_active_leads=3)):
+            with pytest.raises(ValueError, match="CRM_SHARED_STATE_SLOTS"):
+                call(16)
+        assert tracker.try_reserve(15, 3)
+        assert tracker.get(15) == 1
+    finally:
+        store.close()
+        unlink_segments(prefix, lock_dir=str(tmp_path))
+
+def test_one_process_leads_shared_memory_reconciliation(tmp_path):
+    prefix = f"crm_test_{uuid.uuid4().hex[:8]}"
+    name = f"{prefix}_operator_load"
+    
+    def follower_leads() -> str:
+        return subprocess.run(
+            [sys.executable, "-c", FOLLOWER, name, str(tmp_path)],
+            cwd=Path(__file__).parent.parent, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    
+    store = SharedMemoryCounterStore(name, 16, lock_dir=str(tmp_path), fields=LOAD_FIELDS)
+    try:
+        tracker = OperatorLoadTracker(lambda: {1: 2}, reconcile_interval=0, store=store)
+        tracker.reconcile()
+        assert tracker.get(1) == 2
+        assert follower_leads() == "False"
+    finally:
+        store.close()
+        assert follower_leads() == "True"
+        unlink_segments(prefix, lock_dir=str(tmp_path))
+
+def _tracker(session_factory) -> OperatorLoadTracker:
+    def load_counts():
+        db = session_factory()
+        try:
+            return SQLContactRepository(db).get_active_contacts_counts()
+        finally:
+            db.close()
+    
+    tracker = OperatorLoadTracker(load_counts, reconcile_interval=0)
+    tracker.start()
+    return tracker
+
+def _distribution(db, tracker: OperatorLoadTracker, samplers: SamplerRegistry) -> LeadDistributionUseCase:
+    return LeadDistributionUseCase(
+        lead_repo=SQLLeadRepository(db),
+        operator_repo=SQLOperatorRepository(db),
+        source_repo=SQLSourceRepository(db),
+        weight_repo=SQLOperatorSourceWeightRepository(db),
+        contact_repo=SQLContactRepository(db),
+        load_tracker=tracker,
+        samplers=samplers
+    )
+
+def _active_counts(session_factory) -> dict:
+    db = session_factory()
+    try:
+        return dict(db.execute(
+            select(models.ContactModel.operator_id, func.count(models.ContactModel.id)).where(
+                models.ContactModel.operator_id.isnot(None),
+                models.ContactModel.status.in_(ACTIVE_CONTACT_STATUSES)
+            ).group_by(models.ContactModel.operator_id)
+        ).all())
+    finally:
+        db.close()
+
+def _run_threads(*targets) -> None:
+    threads = [threading.Thread(target=target, args=args) for target, args in targets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+def test_concurrent_contacts_never_exceed_operator_limit(session_factory):
+    tracker = _tracker(session_factory)
+    samplers = SamplerRegistry()
+    stopped = threading.Event()
+    errors = []
+    
+    def create_contacts(thread: int) -> None:
+        for number in range(CONTACTS_PER_THREAD):
+            db = session_factory()
+            try:
+                _distribution(db, tracker, samplers).create_contact(f"lead-{thread}-{number}", SOURCE_ID)
+            except Exception as error:
+                errors.append(error)
+            finally:
+                db.close()
+    
+    def reconcile() -> None:
+        while not stopped.is_set():
+            tracker.reconcile()
+    
+    reconciler = threading.Thread(target=reconcile)
+    reconciler.start()
+    _run_threads(*[(create_contacts, (thread,)) for thread in range(THREADS)])
+    stopped.set()
+    reconciler.join()
+    
+    assert errors == []
+    db = session_factory()
+    try:
+        total = db.execute(select(func.count(models.ContactModel.id))).scalar()
+    finally:
+        db.close()
+    active = _active_counts(session_factory)
+    assert total == THREADS * CONTACTS_PER_THREAD
+    assert active == {operator_id: MAX_ACTIVE_LEADS for operator_id in range(1, OPERATORS + 1)}
+    tracker.reconcile()
+    assert {operator_id: tracker.get(operator_id) for operator_id in active} == active
+
+def test_batches_closes_and_redistribution_never_exceed_operator_limit(session_factory):
+    tracker = _tracker(session_factory)
+    samplers = SamplerRegistry()
+    stopped = threading.Event()
+    errors = []
+    peaks = []
+    
+    def guarded(action):
+        db = session_factory()
+        try:
+            action(db)
+        except Exception as error:
+            errors.append(error)
+        finally:
+            db.close()
+    
+    def create_batches(thread: int) -> None:
+        for number in range(CONTACTS_PER_THREAD // BATCH_SIZE):
+            items = [(f"lead-{thread}-{number}-{item}", SOURCE_ID, None) for item in range(BATCH_SIZE)]
+            guarded(lambda db: _distribution(db, tracker, samplers).create_contacts(items))
+    
+    def close_and_redistribute() -> None:
+        def step(db):
+            contact_repo = SQLContactRepository(db)
+            assigned = [
+                contact for contact in contact_repo.list_contacts(entities.ContactFilter(), None, 1000)
+                if contact.operator_id is not None and contact.status != entities.ContactStatus.CLOSED
+            ]
+            if assigned:
+                ContactStatusUseCase(contact_repo, load_tracker=tracker).update_status(
+                    assigned[0].id, entities.ContactStatus.CLOSED
+                )
+            _distribution(db, tracker, samplers).redistribute_unassigned(None, 100)
+        
+        while not stopped.is_set():
+            guarded(step)
+    
+    def watch() -> None:
+        while not stopped.is_set():
+            peaks.append(max(_active_counts(session_factory).values(), default=0))
+            tracker.reconcile()
+    
+    background = [threading.Thread(target=target) for target in (close_and_redistribute, watch)]
+    for thread in background:
+        thread.start()
+    _run_threads(*[(create_batches, (thread,)) for thread in range(THREADS)])
+    stopped.set()
+    for thread in background:
+        thread.join()
+    
+    assert errors == []
+    assert peaks and max(peaks) <= MAX_ACTIVE_LEADS
+    active = _active_counts(session_factory)
+    assert all(count <= MAX_ACTIVE_LEADS for count in active.values())
+    tracker.reconcile()
+    assert {operator_id: tracker.get(operator_id) for operator_id in range(1, OPERATORS + 1)} == {
+        operator_id: active.get(operator_id, 0) for operator_id in range(1, OPERATORS + 1)
+    }
\ No newline at end of file
@@ -0,0 +1,38 @@
+import pytest
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.orm import sessionmaker
+from core import entities
+from data import models
+from data.migrations import check_schema, create_schema
+from data.repository import SQLOperatorSourceWeightRepository
+from conftest import SOURCE_ID
+
+WEIGHTS_INDEX = "ix_operator_source_weights_source_id_operator_id"
+
+@pytest.fixture
+def old_engine(session_factory):
+    engine = session_factory.kw["bind"]
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP INDEX {WEIGHTS_INDEX}"))
+        connection.execute(insert(models.OperatorSourceWeightModel), [{"operator_id": 1, "source_id": SOURCE_ID, "weight": 99}])
+    return engine
+
+def test_check_schema_refuses_missing_indexes(old_engine):
+    with pytest.raises(RuntimeError, match=WEIGHTS_INDEX):
+        check_schema(old_engine)
+
+def test_create_schema_restores_weights_index(old_engine):
+    applied = create_schema(old_engine)
+    assert "removed 1 duplicate operator_source_weights rows" in applied
+    assert f"created index {WEIGHTS_INDEX}" in applied
+    check_schema(old_engine)
+    assert create_schema(old_engine) == []
+    
+    db = sessionmaker(bind=old_engine)()
+    try:
+        weights = SQLOperatorSourceWeightRepository(db)
+        weights.update_weights(SOURCE_ID, [entities.OperatorSourceWeight(operator_id=1, source_id=SOURCE_ID, weight=5)])
+        assert [(weight.operator_id, weight.weight) for weight in weights.get_weights_for_source(SOURCE_ID)] == [(1, 5)]
+        assert db.execute(select(func.count(models.OperatorSourceWeightModel.id))).scalar() == 1
+    finally:
+        db.close()
\ No newline at end of file
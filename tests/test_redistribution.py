@@ -0,0 +1,124 @@
+import pytest
+from sqlalchemy import event, func, insert, select
+from app.load_tracker import OperatorLoadTracker
+from app.sampler import SamplerRegistry
+from app.use_cases import ContactStatusUseCase, LeadDistributionUseCase
+from core import entities
+from data import models
+from data.core_repository import CoreSQLContactRepository
+from data.repository import (
+    ACTIVE_CONTACT_STATUSES, SQLContactRepository, SQLLeadRepository, SQLOperatorRepository,
+    SQLOperatorSourceWeightRepository, SQLSourceRepository
+)
+from conftest import MAX_ACTIVE_LEADS, OPERATORS, SOURCE_ID
+
+CAPACITY = OPERATORS * MAX_ACTIVE_LEADS
+BLOCKED_SOURCE_ID = SOURCE_ID + 1
+
+@pytest.fixture(params=[SQLContactRepository, CoreSQLContactRepository])
+def contact_repo_class(request):
+    return request.param
+
+@pytest.fixture
+def db(session_factory):
+    db = session_factory()
+    yield db
+    db.close()
+
+@pytest.fixture
+def tracker(session_factory):
+    def load_counts():
+        db = session_factory()
+        try:
+            return SQLContactRepository(db).get_active_contacts_counts()
+        finally:
+            db.close()
+    
+    tracker = OperatorLoadTracker(load_counts, reconcile_interval=0)
+    tracker.start()
+    return tracker
+
+def _distribution(db, contact_repo_class, tracker) -> LeadDistributionUseCase:
+    return LeadDistributionUseCase(
+        lead_repo=SQLLeadRepository(db),
+        operator_repo=SQLOperatorRepository(db),
+        source_repo=SQLSourceRepository(db),
+        weight_repo=SQLOperatorSourceWeightRepository(db),
+        contact_repo=contact_repo_class(db),
+        load_tracker=tracker,
+        samplers=SamplerRegistry()
+    )
+
+def _active_counts(db) -> dict:
+    return dict(db.execute(
+        select(models.ContactModel.operator_id, func.count(models.ContactModel.id)).where(
+            models.ContactModel.operator_id.isnot(None),
+            models.ContactModel.status.in_(ACTIVE_CONTACT_STATUSES)
+        ).group_by(models.ContactModel.operator_id)
+    ).all())
+
+def test_closed_contacts_are_not_redistributed(db, contact_repo_class, tracker):
+    use_case = _distribution(db, contact_repo_class, tracker)
+    contacts = [use_case.create_contact(f"lead-{number}", SOURCE_ID) for number in range(CAPACITY + 5)]
+    unassigned = [contact for contact in contacts if contact.operator_id is None]
+    assert len(unassigned) == 5
+    statuses = ContactStatusUseCase(contact_repo_class(db), load_tracker=tracker)
+    statuses.update_statuses([contact.id for contact in unassigned[:2]], entities.ContactStatus.CLOSED)
+    assert contact_repo_class(db).count_unassigned() == 3
+    
+    freed = [contact.id for contact in contacts if contact.operator_id == 1]
+    statuses.update_statuses(freed, entities.ContactStatus.CLOSED)
+    assert use_case.redistribute_unassigned(None, 100) == (3, None)
+    
+    operators = dict(db.execute(
+        select(models.ContactModel.id, models.ContactModel.operator_id).where(
+            models.ContactModel.id.in_([contact.id for contact in unassigned])
+        )
+    ).all())
+    assert [operators[contact.id] for contact in unassigned[:2]] == [None, None]
+    assert all(operators[contact.id] is not None for contact in unassigned[2:])
+    active = _active_counts(db)
+    assert active == {operator_id: MAX_ACTIVE_LEADS for operator_id in range(1, OPERATORS + 1)}
+    assert {operator_id: tracker.get(operator_id) for operator_id in active} == active
+
+def test_blocked_source_does_not_stall_redistribution(db, contact_repo_class, tracker):
+    db.execute(insert(models.SourceModel), [{"id": BLOCKED_SOURCE_ID, "name": "no-weights"}])
+    db.commit()
+    use_case = _distribution(db, contact_repo_class, tracker)
+    blocked = [use_case.create_contact(f"blocked-{number}", BLOCKED_SOURCE_ID) for number in range(3)]
+    contacts = [use_case.create_contact(f"lead-{number}", SOURCE_ID) for number in range(CAPACITY + 1)]
+    assert all(contact.operator_id is None for contact in blocked)
+    waiting = contacts[-1]
+    assert waiting.operator_id is None
+    
+    freed = [contact.id for contact in contacts if contact.operator_id == 1]
+    statuses = ContactStatusUseCase(contact_repo_class(db), load_tracker=tracker)
+    statuses.update_statuses(freed, entities.ContactStatus.CLOSED)
+    assigned, after_id, pages = 0, None, 0
+    while True:
+        batch_assigned, after_id = use_case.redistribute_unassigned(after_id, 2)
+        assigned += batch_assigned
+        pages += 1
+        if after_id is None:
+            break
+    
+    assert (assigned, pages) == (1, 3)
+    assert contact_repo_class(db).get_by_ids([waiting.id])[waiting.id].operator_id == 1
+    assert contact_repo_class(db).count_unassigned() == len(blocked)
+
+def test_unassigned_page_matches_partial_index(db, contact_repo_class):
+    executed = []
+    
+    def capture(connection, cursor, statement, parameters, context, executemany):
+        executed.append((statement, parameters))
+    
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        contact_repo_class(db).get_unassigned_contacts(10, 100)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    statement, parameters = executed[-1]
+    statement = statement.replace("FROM contacts", "FROM contacts INDEXED BY ix_contacts_unassigned_active", 1)
+    plan = " ".join(row[-1] for row in db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters))
+    assert "TEMP B-TREE" not in plan
\ No newline at end of file
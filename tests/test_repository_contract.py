@@ -0,0 +1,208 @@
+import asyncio
+from datetime import timedelta
+import pytest
+from sqlalchemy import insert, update
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from core import entities
+from data import models
+from data import core_repository, repository
+from data.async_repository import AsyncSQLOperatorSourceWeightRepository
+from conftest import SOURCE_ID
+
+IMPLEMENTATIONS = {
+    "orm": (
+        repository.SQLLeadRepository, repository.SQLOperatorRepository, repository.SQLSourceRepository,
+        repository.SQLOperatorSourceWeightRepository, repository.SQLContactRepository
+    ),
+    "core": (
+        core_repository.CoreSQLLeadRepository, core_repository.CoreSQLOperatorRepository,
+        core_repository.CoreSQLSourceRepository, core_repository.CoreSQLOperatorSourceWeightRepository,
+        core_repository.CoreSQLContactRepository
+    )
+}
+CONTACTS = [
+    (1, 1, "new"), (2, 1, "closed"), (3, 5, "new"), (4, 5, "in_progress"), (5, 5, "new"),
+    (6, None, "new"), (7, None, "closed"), (8, 2, "closed"), (9, None, "in_progress")
+]
+
+class Repositories:
+    def __init__(self, db, classes):
+        self.leads, self.operators, self.sources, self.weights, self.contacts = (cls(db) for cls in classes)
+
+@pytest.fixture
+def seeded(session_factory):
+    db = session_factory()
+    try:
+        db.execute(insert(models.LeadModel), [
+            {"id": lead_id, "external_id": f"lead-{lead_id}"} for lead_id in (1, 2, 3)
+        ])
+        db.execute(insert(models.ContactModel), [
+            {
+                "id": contact_id, "lead_id": contact_id % 3 + 1, "source_id": SOURCE_ID,
+                "operator_id": operator_id, "status": status
+            } for contact_id, operator_id, status in CONTACTS
+        ])
+        db.execute(update(models.OperatorModel).where(models.OperatorModel.id == 4).values(status="inactive"))
+        db.execute(
+            update(models.OperatorSourceWeightModel).where(
+                models.OperatorSourceWeightModel.operator_id == 3
+            ).values(weight=0)
+        )
+        db.commit()
+    finally:
+        db.close()
+    return session_factory
+
+@pytest.fixture(params=sorted(IMPLEMENTATIONS))
+def repos(request, seeded):
+    db = seeded()
+    yield Repositories(db, IMPLEMENTATIONS[request.param])
+    db.close()
+
+def test_available_operators(repos):
+    available = sorted(repos.weights.get_available_operators(SOURCE_ID), key=lambda candidate: candidate.operator_id)
+    assert available == [
+        entities.OperatorCandidate(operator_id=1, weight=10, active_count=1, max_active_leads=3),
+        entities.OperatorCandidate(operator_id=2, weight=20, active_count=0, max_active_leads=3)
+    ]
+    source_operators = sorted(repos.weights.get_source_operators(SOURCE_ID), key=lambda candidate: candidate.operator_id)
+    assert source_operators == [
+        entities.OperatorCandidate(operator_id=operator_id, weight=operator_id * 10, max_active_leads=3)
+        for operator_id in (1, 2, 5)
+    ]
+    assert repos.weights.get_available_operators(SOURCE_ID + 1) == []
+
+def test_weights(repos):
+    weights = repos.weights.get_weights_for_source(SOURCE_ID)
+    assert sorted((weight.operator_id, weight.weight) for weight in weights) == [(1, 10), (2, 20), (3, 0), (4, 40), (5, 50)]
+    assert repos.weights.get_weights_version(SOURCE_ID) == 0
+
+def test_operators_and_sources(repos):
+    assert sorted(operator.id for operator in repos.operators.get_active_operators()) == [1, 2, 3, 5]
+    assert repos.operators.get_by_id(4).status == entities.OperatorStatus.INACTIVE
+    assert repos.operators.get_by_id(100) is None
+    assert [operator.id for operator in repos.operators.list_operators(None, 2)] == [1, 2]
+    assert [operator.id for operator in repos.operators.list_operators(2, 2)] == [3, 4]
+    assert [source.id for source in repos.sources.get_all()] == [SOURCE_ID]
+    assert repos.sources.get_by_id(SOURCE_ID).name == "bot"
+    assert repos.sources.get_by_id(SOURCE_ID + 1) is None
+
+def test_leads(repos):
+    assert repos.leads.get_by_external_id("lead-2").id == 2
+    assert repos.leads.get_by_external_id("missing") is None
+    leads = repos.leads.get_by_external_ids(["lead-1", "lead-3", "missing"])
+    assert {external_id: lead.id for external_id, lead in leads.items()} == {"lead-1": 1, "lead-3": 3}
+    assert repos.leads.get_or_create("lead-1").id == 1
+    created = repos.leads.get_or_create("lead-4")
+    assert created.id == 4 and repos.leads.get_or_create("lead-4").id == 4
+    assert [lead.id for lead in repos.leads.list_leads(1, 2)] == [2, 3]
+    assert [lead.external_id for lead in repos.leads.iter_leads(batch_size=2)] == ["lead-1", "lead-2", "lead-3", "lead-4"]
+
+def test_contact_reads(repos):
+    assert repos.contacts.get_active_contacts_counts() == {1: 1, 5: 3}
+    assert repos.contacts.get_operator_active_contacts_count(5) == 3
+    assert repos.contacts.get_operator_active_contacts_count(2) == 0
+    found = repos.contacts.get_by_ids([3, 7, 100])
+    assert sorted(found) == [3, 7]
+    assert (found[3].operator_id, found[3].status) == (5, entities.ContactStatus.NEW)
+    assert (found[7].operator_id, found[7].status) == (None, entities.ContactStatus.CLOSED)
+    assert sorted(contact.id for contact in repos.contacts.get_contacts_by_lead(1)) == [3, 6, 9]
+    closed = entities.ContactFilter(status=entities.ContactStatus.CLOSED)
+    assert [contact.id for contact in repos.contacts.list_contacts(closed, None, 10)] == [2, 7, 8]
+    assert [contact.id for contact in repos.contacts.list_contacts(entities.ContactFilter(operator_id=5), 3, 1)] == [4]
+    assert [contact.id for contact in repos.contacts.iter_contacts(entities.ContactFilter(), batch_size=4)] == list(range(1, 10))
+
+def test_unassigned_contacts(repos):
+    assert repos.contacts.count_unassigned() == 2
+    assert [contact.id for contact in repos.contacts.get_unassigned_contacts(None, 10)] == [6, 9]
+    assert [contact.id for contact in repos.contacts.get_unassigned_contacts(6, 10)] == [9]
+    assert repos.contacts.assign_operators({6: 2, 7: 2}) == [6]
+    assert repos.contacts.count_unassigned() == 1
+    assert repos.contacts.get_active_contacts_counts() == {1: 1, 2: 1, 5: 3}
+
+def test_contact_writes(repos):
+    contact = repos.contacts.create(entities.Contact(lead_id=1, source_id=SOURCE_ID, operator_id=2, message="hi"))
+    assert contact.id == 10 and contact.created_at is not None
+    contacts = repos.contacts.create_many([
+        entities.Contact(lead_id=2, source_id=SOURCE_ID, operator_id=2),
+        entities.Contact(lead_id=3, source_id=SOURCE_ID)
+    ])
+    assert [contact.id for contact in contacts] == [11, 12]
+    assert repos.contacts.get_active_contacts_counts() == {1: 1, 2: 2, 5: 3}
+    stored = repos.contacts.get_by_ids([10, 11])
+    assert repos.contacts.update_statuses([stored[10], stored[11]], entities.ContactStatus.CLOSED)
+    assert repos.contacts.get_active_contacts_counts() == {1: 1, 5: 3}
+    assert repos.contacts.get_by_ids([10])[10].message == "hi"
+
+def test_weight_writes(repos):
+    repos.weights.update_weights(SOURCE_ID, [
+        entities.OperatorSourceWeight(operator_id=1, source_id=SOURCE_ID, weight=15),
+        entities.OperatorSourceWeight(operator_id=2, source_id=SOURCE_ID, weight=20),
+        entities.OperatorSourceWeight(operator_id=3, source_id=SOURCE_ID, weight=30)
+    ])
+    weights = repos.weights.get_weights_for_source(SOURCE_ID)
+    assert sorted((weight.operator_id, weight.weight) for weight in weights) == [(1, 15), (2, 20), (3, 30)]
+    assert repos.weights.get_weights_version(SOURCE_ID) == 1
+    repos.weights.update_weights(SOURCE_ID, [
+        entities.OperatorSourceWeight(operator_id=operator_id, source_id=SOURCE_ID, weight=weight)
+        for operator_id, weight in ((1, 15), (2, 20), (3, 30))
+    ])
+    assert repos.weights.get_weights_version(SOURCE_ID) == 1
+    available = repos.weights.get_available_operators(SOURCE_ID)
+    assert sorted((candidate.operator_id, candidate.weight) for candidate in available) == [(1, 15), (2, 20), (3, 30)]
+
+def test_operator_writes(repos):
+    operator = repos.operators.get_by_id(5)
+    operator.status = entities.OperatorStatus.INACTIVE
+    operator.max_active_leads = 7
+    repos.operators.update(operator)
+    stored = repos.operators.get_by_id(5)
+    assert (stored.status, stored.max_active_leads) == (entities.OperatorStatus.INACTIVE, 7)
+    assert repos.weights.get_weights_version(SOURCE_ID) == 1
+    assert sorted(operator.id for operator in repos.operators.get_active_operators()) == [1, 2, 3]
+
+def test_lead_writes(repos):
+    lead = repos.leads.create(entities.Lead(external_id="lead-4", email="a@example.com"))
+    assert lead.id == 4 and lead.created_at is not None
+    leads = repos.leads.create_many([
+        entities.Lead(external_id="lead-2"), entities.Lead(external_id="lead-5"), entities.Lead(external_id="lead-4")
+    ])
+    assert [lead.id for lead in leads] == [2, 5, 4]
+    assert all(lead.created_at is not None for lead in leads)
+    assert repos.leads.get_by_external_id("lead-4").email == "a@example.com"
+
+def test_dedupe_key_writes(repos):
+    contacts = repos.contacts.create_many([
+        entities.Contact(lead_id=1, source_id=SOURCE_ID, operator_id=2, dedupe_key="first"),
+        entities.Contact(lead_id=2, source_id=SOURCE_ID, dedupe_key="second")
+    ])
+    created_from = contacts[0].created_at - timedelta(minutes=1)
+    found = repos.contacts.get_by_dedupe_keys(["first", "second", "missing"], created_from)
+    assert {key: contact.id for key, contact in found.items()} == {"first": 10, "second": 11}
+    assert found["first"].operator_id == 2
+    assert repos.contacts.get_by_dedupe_keys(["first"], contacts[0].created_at + timedelta(minutes=1)) == {}
+    assert repos.contacts.purge_dedupe_keys(contacts[0].created_at + timedelta(minutes=1)) == 2
+    assert repos.contacts.get_by_dedupe_keys(["first", "second"], created_from) == {}
+
+def test_async_weight_repository_runs_the_same_statements(seeded, tmp_path):
+    async def load():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'leads.db'}")
+        try:
+            async with AsyncSession(engine) as db:
+                weights = AsyncSQLOperatorSourceWeightRepository(db)
+                return await weights.get_available_operators(SOURCE_ID), await weights.get_source_operators(SOURCE_ID)
+        finally:
+            await engine.dispose()
+    
+    db = seeded()
+    try:
+        expected = Repositories(db, IMPLEMENTATIONS["orm"]).weights
+        available, source_operators = asyncio.run(load())
+        assert sorted(available, key=lambda candidate: candidate.operator_id) == sorted(
+            expected.get_available_operators(SOURCE_ID), key=lambda candidate: candidate.operator_id
+        )
+        assert sorted(source_operators, key=lambda candidate: candidate.operator_id) == sorted(
+            expected.get_source_operators(SOURCE_ID), key=lambda candidate: candidate.operator_id
+        )
+    finally:
+        db.close()
\ No newline at end of file
@@ -0,0 +1,48 @@
+import json
+import pytest
+from sqlalchemy import insert
+from api.responses import json_response
+from app import dtos
+from app.use_cases import ContactQueryUseCase, OperatorManagementUseCase
+from core import entities
+from data import models
+from data.repository import SQLContactRepository, SQLLeadRepository, SQLOperatorRepository
+from conftest import SOURCE_ID
+
+@pytest.fixture
+def db(session_factory):
+    db = session_factory()
+    db.execute(insert(models.LeadModel), [
+        {"id": 1, "external_id": "lead-1", "email": "lead@example.com"}, {"id": 2, "external_id": "lead-2", "phone": "+7 900"}
+    ])
+    db.execute(insert(models.ContactModel), [
+        {"lead_id": 1, "source_id": SOURCE_ID, "operator_id": 1, "message": "Привет \"мир\"\n", "status": "new"},
+        {"lead_id": 2, "source_id": SOURCE_ID, "operator_id": None, "message": None, "status": "closed"}
+    ])
+    db.commit()
+    yield db
+    db.close()
+
+def test_pages_match_their_response_models(db):
+    queries = ContactQueryUseCase(SQLContactRepository(db), SQLLeadRepository(db))
+    pages = [
+        (queries.list_contacts(entities.ContactFilter(), None, 1), dtos.ContactResponse, dtos.ContactPage),
+        (queries.list_leads(None, 10), dtos.LeadSummaryResponse, dtos.LeadPage),
+        (OperatorManagementUseCase(SQLOperatorRepository(db)).list_operators(None, 10), dtos.OperatorResponse, dtos.OperatorPage)
+    ]
+    for page, item_model, page_model in pages:
+        content = {"items": [item_model.row(item) for item in page.items], "next_cursor": page.next_cursor}
+        response = json_response(content)
+        assert response.status_code == 200 and response.media_type == "application/json"
+        assert json.loads(response.body) == page_model(
+            items=[item_model.from_entity(item) for item in page.items], next_cursor=page.next_cursor
+        ).model_dump(mode="json")
+    assert json.loads(json_response({"items": [], "next_cursor": None}).body) == {"items": [], "next_cursor": None}
+
+def test_contact_rows_keep_nulls_and_text(db):
+    contacts = SQLContactRepository(db).get_by_ids([1, 2])
+    body = json.loads(json_response([dtos.ContactResponse.row(contacts[1]), dtos.ContactResponse.row(contacts[2])]).body)
+    assert [(row["operator_id"], row["message"], row["status"]) for row in body] == [
+        (1, "Привет \"мир\"\n", "new"), (None, None, "closed")
+    ]
+    assert body[0]["created_at"] == dtos.ContactResponse.from_entity(contacts[1]).model_dump(mode="json")["created_at"]
\ No newline at end of file
@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+import numpy as np
+from app.simulation import build_scenario, recorded_stream, simulate, synthetic_stream
+from core import entities
+from conftest import MAX_ACTIVE_LEADS, OPERATORS, SOURCE_ID
+
+def _operators(max_active_leads: int = MAX_ACTIVE_LEADS) -> list:
+    return [
+        entities.Operator(id=operator_id, name=f"operator-{operator_id}", max_active_leads=max_active_leads)
+        for operator_id in range(1, OPERATORS + 1)
+    ]
+
+def _weights(source_id: int = SOURCE_ID) -> list:
+    return [
+        entities.OperatorSourceWeight(operator_id=operator_id, source_id=source_id, weight=operator_id * 10)
+        for operator_id in range(1, OPERATORS + 1)
+    ]
+
+def test_scenario_keeps_active_weighted_operators():
+    operators = _operators()
+    operators[3].status = entities.OperatorStatus.INACTIVE
+    weights = _weights()
+    weights[0].weight = 0
+    scenario = build_scenario(operators, {SOURCE_ID: weights}, {2: 1})
+    assert [(candidate.operator_id, candidate.active_count) for candidate in scenario[SOURCE_ID]] == [(2, 1), (3, 0), (5, 0)]
+
+def test_capacity_is_never_exceeded():
+    scenario = build_scenario(_operators(), {SOURCE_ID: _weights()}, {5: MAX_ACTIVE_LEADS})
+    stream = synthetic_stream(100, 600, {SOURCE_ID: 0.9, SOURCE_ID + 1: 0.1}, seed=1)
+    result = simulate(scenario, stream, mean_handle_seconds=1e9, seed=1)
+    assert result.assigned == (OPERATORS - 1) * MAX_ACTIVE_LEADS
+    assert result.unassigned == 100 - result.assigned
+    assert all(operator.peak_active == MAX_ACTIVE_LEADS for operator in result.operators)
+    assert result.operators[-1].assigned == 0
+    sources = {source.source_id: source for source in result.sources}
+    assert sources[SOURCE_ID + 1].unassigned == sources[SOURCE_ID + 1].contacts > 0
+    assert sum(source.contacts for source in result.sources) == 100
+
+def test_shares_follow_weights_below_capacity():
+    scenario = build_scenario(_operators(max_active_leads=10000), {SOURCE_ID: _weights()})
+    result = simulate(scenario, synthetic_stream(30000, 3600, {SOURCE_ID: 1.0}, seed=2), seed=2)
+    assert result.unassigned == 0
+    expected = np.arange(1, OPERATORS + 1) / sum(range(1, OPERATORS + 1))
+    assert np.allclose([operator.share for operator in result.operators], expected, atol=0.02)
+
+def test_recorded_stream_starts_at_the_first_contact():
+    started = datetime(2026, 1, 1, 10)
+    stream = recorded_stream([
+        entities.Contact(source_id=2, created_at=started + timedelta(seconds=90)),
+        entities.Contact(source_id=1, created_at=started)
+    ])
+    assert stream.arrivals.tolist() == [0.0, 90.0]
+    assert stream.source_ids.tolist() == [1, 2]
\ No newline at end of file
@@ -0,0 +1,69 @@
+from datetime import datetime
+import pytest
+from sqlalchemy import insert
+from app.use_cases import ContactStatsUseCase
+from core import entities
+from data import models
+from data.migrations import rebuild_contact_rollups
+from data.repository import SQLContactRepository, SQLContactStatsRepository, SQLOperatorRepository, SQLOperatorSourceWeightRepository
+from conftest import SOURCE_ID
+
+CREATED = [datetime(2026, 1, 1, 9, 59), datetime(2026, 1, 1, 10), datetime(2026, 1, 1, 10, 30), datetime(2026, 1, 1, 11)]
+
+def _stats(db) -> ContactStatsUseCase:
+    return ContactStatsUseCase(SQLContactStatsRepository(db), SQLOperatorRepository(db), SQLOperatorSourceWeightRepository(db))
+
+def _rollups(db) -> list:
+    return sorted(
+        (rollup.hour, rollup.operator_id, rollup.status, rollup.count)
+        for rollup in SQLContactStatsRepository(db).aggregate(entities.ContactFilter(), ("hour", "operator_id", "status"))
+    )
+
+def test_rollups_follow_contact_writes(session_factory):
+    db = session_factory()
+    try:
+        contacts = SQLContactRepository(db)
+        created = contacts.create_many([
+            entities.Contact(lead_id=1, source_id=SOURCE_ID, operator_id=1),
+            entities.Contact(lead_id=1, source_id=SOURCE_ID, operator_id=2),
+            entities.Contact(lead_id=2, source_id=SOURCE_ID)
+        ])
+        contacts.update_statuses([created[0]], entities.ContactStatus.CLOSED)
+        assert contacts.assign_operators({created[2].id: 3}) == [created[2].id]
+        maintained = _rollups(db)
+        
+        rebuild_contact_rollups(db.connection())
+        db.commit()
+        assert _rollups(db) == maintained
+        hour = maintained[0][0]
+        assert [(operator_id, status, count) for _, operator_id, status, count in maintained] == [
+            (1, entities.ContactStatus.CLOSED, 1), (2, entities.ContactStatus.NEW, 1), (3, entities.ContactStatus.NEW, 1)
+        ]
+        assert _stats(db).hourly(entities.ContactFilter()) == [
+            {"hour": hour, "total": 3, "unassigned": 0, "new": 2, "in_progress": 0, "closed": 1}
+        ]
+    finally:
+        db.close()
+
+@pytest.mark.parametrize("created_from, created_to, expected", [
+    (datetime(2026, 1, 1, 10), datetime(2026, 1, 1, 11), {10: 2}),
+    (datetime(2026, 1, 1, 10, 30), datetime(2026, 1, 1, 10, 45), {10: 2}),
+    (datetime(2026, 1, 1, 9, 59, 30), datetime(2026, 1, 1, 11), {9: 1, 10: 2}),
+    (datetime(2026, 1, 1, 10, 15), datetime(2026, 1, 1, 11, 0, 0, 1), {10: 2, 11: 1}),
+    (None, datetime(2026, 1, 1, 10), {9: 1})
+])
+def test_period_covers_every_overlapping_hour(session_factory, created_from, created_to, expected):
+    db = session_factory()
+    try:
+        db.execute(insert(models.LeadModel), [{"id": 1, "external_id": "lead-1"}])
+        db.execute(insert(models.ContactModel), [
+            {"lead_id": 1, "source_id": SOURCE_ID, "operator_id": 1, "status": "new", "created_at": created_at}
+            for created_at in CREATED
+        ])
+        rebuild_contact_rollups(db.connection())
+        db.commit()
+        filters = entities.ContactFilter(created_from=created_from, created_to=created_to)
+        assert {row["hour"].hour: row["total"] for row in _stats(db).hourly(filters)} == expected
+        assert _stats(db).source_distribution(SOURCE_ID, filters)["total"] == sum(expected.values())
+    finally:
+        db.close()
\ No newline at end of file
@@ -0,0 +1,81 @@
+import asyncio
+import pytest
+from sqlalchemy import insert, select
+from app.load_tracker import OperatorLoadTracker
+from app.use_cases import ContactStatusUseCase
+from core import entities
+from data import models
+from data.repository import SQLContactRepository
+from data.write_behind import AsyncWriteBehindContactRepository, ContactWriter, WriteBehindContactRepository
+from conftest import SOURCE_ID
+
+@pytest.fixture
+def tracker():
+    return OperatorLoadTracker(lambda: {}, reconcile_interval=0)
+
+@pytest.fixture
+def writer(session_factory, tracker):
+    def dropped(contact):
+        tracker.on_status_change(contact.operator_id, contact.status, entities.ContactStatus.CLOSED)
+    
+    writer = ContactWriter(session_factory, durability="none", flush_interval=30, batch_size=1000, on_drop=dropped)
+    writer.start()
+    yield writer
+    writer.stop()
+
+def test_status_update_waits_for_pending_contact(session_factory, writer, tracker):
+    db = session_factory()
+    try:
+        contact_repo = WriteBehindContactRepository(SQLContactRepository(db), writer, db.commit)
+        assert tracker.try_reserve(1, 3)
+        tracker.settle(1)
+        contact = contact_repo.create(entities.Contact(lead_id=1, source_id=SOURCE_ID, operator_id=1))
+        assert writer.stats()["pending"] == 1
+        
+        closed = ContactStatusUseCase(contact_repo, load_tracker=tracker).update_status(
+            contact.id, entities.ContactStatus.CLOSED
+        )
+        assert closed.status == entities.ContactStatus.CLOSED
+        assert tracker.get(1) == 0
+        assert db.execute(select(models.ContactModel.status).where(models.ContactModel.id == contact.id)).scalar() == "closed"
+    finally:
+        db.close()
+
+def test_dropped_contact_releases_operator(session_factory, writer, tracker):
+    db = session_factory()
+    try:
+        db.execute(insert(models.ContactModel), [{"id": 1, "lead_id": 1, "source_id": SOURCE_ID, "status": "new"}])
+        db.commit()
+        contact_repo = WriteBehindContactRepository(SQLContactRepository(db), writer, db.commit)
+        assert tracker.try_reserve(2, 3)
+        tracker.settle(2)
+        contact = contact_repo.create(entities.Contact(lead_id=1, source_id=SOURCE_ID, operator_id=2))
+        assert contact.id == 1
+        writer.wait_stored([contact.id])
+        assert writer.stats()["dropped"] == 1
+        assert tracker.get(2) == 0
+    finally:
+        db.close()
+
+def test_async_create_waits_for_a_full_queue_off_the_event_loop(session_factory):
+    writer = ContactWriter(session_factory, durability="none", max_pending=1)
+    
+    async def commit():
+        pass
+    
+    async def create_while_full():
+        contact_repo = AsyncWriteBehindContactRepository(None, writer, commit)
+        await contact_repo.create(entities.Contact(lead_id=1, source_id=SOURCE_ID))
+        blocked = asyncio.create_task(contact_repo.create(entities.Contact(lead_id=1, source_id=SOURCE_ID)))
+        ticks = 0
+        for _ in range(5):
+            await asyncio.sleep(0.01)
+            ticks += 1
+        assert not blocked.done()
+        writer.stop()
+        contact = await blocked
+        return ticks, contact
+    
+    ticks, contact = asyncio.run(create_while_full())
+    assert ticks == 5
+    assert contact.id == 2
\ No newline at end of file